@@ -24,7 +24,15 @@ from app.models.quiz import Quiz
 from app.models.question import Question
 from app.models.option import Option
 from app.models.user_answer import UserAnswer
+from app.models.user_answer_claim import UserAnswerClaim
 from app.models.user_progress import UserProgress
+from app.models.prerequisite import Prerequisite
+from app.models.review_item import ReviewItem
+from app.models.revoked_token import RevokedToken
+from app.models.user_shard import UserShard
+from app.models.lesson_body import LessonBody
+from app.models.user_course_summary import UserCourseSummary
+from app.models.user_lesson_bitmap import UserLessonBitmap
 
 # Add environment variable loading for Alembic
 import os
@@ -0,0 +1,101 @@
+"""Partition user_answers by month
+
+Revision ID: 0d68ae8b0547
+Revises: 95545df0f20d
+Create Date: 2026-10-19 18:02:11.504318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d68ae8b0547'
+down_revision: Union[str, None] = '95545df0f20d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Native RANGE partitioning (PostgreSQL). Partitioned tables need the partition key in the
+    # primary key, so it becomes (id, answered_at); ids keep coming from the same sequence.
+    op.execute("UPDATE user_answers SET answered_at = now() WHERE answered_at IS NULL")
+    op.execute("ALTER SEQUENCE user_answers_id_seq OWNED BY NONE")
+    op.drop_index('ix_user_answers_question_id', table_name='user_answers')
+    op.drop_index('ix_user_answers_id', table_name='user_answers')
+    op.rename_table('user_answers', 'user_answers_unpartitioned')
+    op.execute("ALTER TABLE user_answers_unpartitioned RENAME CONSTRAINT user_answers_pkey TO user_answers_unpartitioned_pkey")
+    op.execute("""
+        CREATE TABLE user_answers (
+            id INTEGER NOT NULL DEFAULT nextval('user_answers_id_seq'),
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            question_id INTEGER NOT NULL REFERENCES questions (id),
+            selected_option_id INTEGER REFERENCES options (id),
+            user_answer_text TEXT,
+            is_correct BOOLEAN,
+            answered_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT user_answers_pkey PRIMARY KEY (id, answered_at)
+        ) PARTITION BY RANGE (answered_at)
+    """)
+    # One partition per month from the oldest answer up to two months ahead
+    # (app.services.answer_partitions.maintain keeps creating them from then on)
+    op.execute("""
+        DO $$
+        DECLARE
+            period_start date := date_trunc('month', coalesce((SELECT min(answered_at) FROM user_answers_unpartitioned), now()))::date;
+            last_month date := (date_trunc('month', now()) + interval '2 months')::date;
+        BEGIN
+            WHILE period_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF user_answers FOR VALUES FROM (%L) TO (%L)',
+                    'user_answers_p' || to_char(period_start, 'YYYYMM'), period_start, (period_start + interval '1 month')::date
+                );
+                period_start := (period_start + interval '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE user_answers_default PARTITION OF user_answers DEFAULT")
+    op.execute("""
+        INSERT INTO user_answers (id, user_id, question_id, selected_option_id, user_answer_text, is_correct, answered_at)
+        SELECT id, user_id, question_id, selected_option_id, user_answer_text, is_correct, answered_at
+        FROM user_answers_unpartitioned
+    """)
+    op.execute("ALTER SEQUENCE user_answers_id_seq OWNED BY user_answers.id")
+    op.drop_table('user_answers_unpartitioned')
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_index(op.f('ix_user_answers_id'), 'user_answers', ['id'], unique=False)
+    op.create_index(op.f('ix_user_answers_question_id'), 'user_answers', ['question_id'], unique=False)
+    op.create_index(op.f('ix_user_answers_answered_at'), 'user_answers', ['answered_at'], unique=False)
+    op.create_index('ix_user_answers_user_id_answered_at', 'user_answers', ['user_id', 'answered_at'], unique=False)
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # Back to a single heap table; answers already moved to the archive stay in their files
+    op.execute("ALTER SEQUENCE user_answers_id_seq OWNED BY NONE")
+    op.rename_table('user_answers', 'user_answers_partitioned')
+    op.execute("ALTER TABLE user_answers_partitioned RENAME CONSTRAINT user_answers_pkey TO user_answers_partitioned_pkey")
+    op.drop_index('ix_user_answers_id', table_name='user_answers_partitioned')
+    op.drop_index('ix_user_answers_question_id', table_name='user_answers_partitioned')
+    op.drop_index('ix_user_answers_answered_at', table_name='user_answers_partitioned')
+    op.drop_index('ix_user_answers_user_id_answered_at', table_name='user_answers_partitioned')
+    op.create_table('user_answers',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('user_answers_id_seq')"), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('selected_option_id', sa.Integer(), nullable=True),
+    sa.Column('user_answer_text', sa.Text(), nullable=True),
+    sa.Column('is_correct', sa.Boolean(), nullable=True),
+    sa.Column('answered_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+    sa.ForeignKeyConstraint(['selected_option_id'], ['options.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO user_answers SELECT * FROM user_answers_partitioned")
+    op.execute("ALTER SEQUENCE user_answers_id_seq OWNED BY user_answers.id")
+    op.drop_table('user_answers_partitioned') # Drops every partition with it
+    op.create_index(op.f('ix_user_answers_id'), 'user_answers', ['id'], unique=False)
+    op.create_index(op.f('ix_user_answers_question_id'), 'user_answers', ['question_id'], unique=False)
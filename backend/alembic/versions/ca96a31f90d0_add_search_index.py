@@ -0,0 +1,91 @@
+"""Add full-text search index
+
+Revision ID: ca96a31f90d0
+Revises: bbae19610f25
+Create Date: 2026-10-19 09:12:41.318502
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca96a31f90d0'
+down_revision: Union[str, None] = 'bbae19610f25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.create_table('search_documents',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('doc_type', sa.String(length=16), nullable=False),
+        sa.Column('doc_id', sa.Integer(), nullable=False),
+        sa.Column('course_id', sa.Integer(), nullable=False),
+        sa.Column('lesson_id', sa.Integer(), nullable=True),
+        sa.Column('title', sa.Text(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=True),
+        sa.Column('tsv', postgresql.TSVECTOR(), sa.Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(body, '')), 'B')",
+            persisted=True,
+        )),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('doc_type', 'doc_id', name='uq_search_documents_doc'),
+        )
+        op.create_index('ix_search_documents_tsv', 'search_documents', ['tsv'], unique=False, postgresql_using='gin')
+        op.create_index('ix_search_documents_course_id', 'search_documents', ['course_id'], unique=False)
+        op.create_index('ix_search_documents_lesson_id', 'search_documents', ['lesson_id'], unique=False)
+        # Backfill the index from existing content
+        op.execute(
+            "INSERT INTO search_documents (doc_type, doc_id, course_id, lesson_id, title, body) "
+            "SELECT 'course', id, id, NULL, title, description FROM courses"
+        )
+        op.execute(
+            "INSERT INTO search_documents (doc_type, doc_id, course_id, lesson_id, title, body) "
+            "SELECT 'lesson', id, course_id, id, title, text_content FROM lessons"
+        )
+        op.execute(
+            "INSERT INTO search_documents (doc_type, doc_id, course_id, lesson_id, title, body) "
+            "SELECT 'question', q.id, l.course_id, l.id, q.question_text, "
+            "(SELECT string_agg(o.option_text, ' ') FROM options o WHERE o.question_id = q.id) "
+            "FROM questions q JOIN quizzes z ON z.id = q.quiz_id JOIN lessons l ON l.id = z.lesson_id"
+        )
+    elif bind.dialect.name == "sqlite":
+        # Local/testing databases use FTS5; rowid = doc_id * 3 + type code (see SQLiteSearchBackend)
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5("
+            "title, body, doc_type UNINDEXED, doc_id UNINDEXED, course_id UNINDEXED, lesson_id UNINDEXED, "
+            "tokenize = 'porter unicode61')"
+        )
+        op.execute(
+            "INSERT INTO search_documents (rowid, title, body, doc_type, doc_id, course_id, lesson_id) "
+            "SELECT id * 3, title, coalesce(description, ''), 'course', id, id, NULL FROM courses"
+        )
+        op.execute(
+            "INSERT INTO search_documents (rowid, title, body, doc_type, doc_id, course_id, lesson_id) "
+            "SELECT id * 3 + 1, title, coalesce(text_content, ''), 'lesson', id, course_id, id FROM lessons"
+        )
+        op.execute(
+            "INSERT INTO search_documents (rowid, title, body, doc_type, doc_id, course_id, lesson_id) "
+            "SELECT q.id * 3 + 2, q.question_text, "
+            "coalesce((SELECT group_concat(o.option_text, ' ') FROM options o WHERE o.question_id = q.id), ''), "
+            "'question', q.id, l.course_id, l.id "
+            "FROM questions q JOIN quizzes z ON z.id = q.quiz_id JOIN lessons l ON l.id = z.lesson_id"
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.drop_index('ix_search_documents_lesson_id', table_name='search_documents')
+        op.drop_index('ix_search_documents_course_id', table_name='search_documents')
+        op.drop_index('ix_search_documents_tsv', table_name='search_documents')
+        op.drop_table('search_documents')
+    elif bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS search_documents")
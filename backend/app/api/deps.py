@@ -1,20 +1,33 @@
 # backend/app/api/deps.py
-from typing import Generator
-from fastapi import Depends, HTTPException, status
+from typing import Generator, List, Optional
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import settings
+from app.database import SessionLocal, get_db
 from app.core.jwt import verify_token
+from app.core.revocation import revocation_list
 from app.crud import crud_user # Import crud_user
 from app.models.user import User # Import User model
+from app.services import ownership
 
 # OAuth2 scheme for token retrieval from headers
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token") # "token" is the endpoint for getting tokens
 
+# Sub-requests of POST /api/v1/batch carry the user the batch authenticated under this key
+BATCH_USER = "batch_user"
+
 def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    request: Request, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
 ) -> User:
     """Dependency to get the current authenticated user."""
+    batch_user = request.scope.get(BATCH_USER)
+    if batch_user is not None: # Authenticated once for the whole batch, with the same token
+        return batch_user
+    return authenticate(db, token)
+
+def authenticate(db: Session, token: str) -> User:
+    """The user of a bearer token; raises 401 if it is invalid, expired or revoked."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -24,6 +37,9 @@ def get_current_user(
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
+    # In-memory filter check; queries the database only for tokens that may be revoked
+    if revocation_list.is_revoked(db, (payload.get("jti"), payload.get("fam"))):
+        raise credentials_exception
     user = crud_user.get_user_by_username(db, username=username)
     if user is None:
         raise credentials_exception
@@ -45,4 +61,55 @@ def get_current_educator(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+def require_owner(db: Session, kind: str, entity_id: int, educator: User, detail: str) -> ownership.Owner:
+    """
+    Raises 404 if the course/lesson/quiz/question/option does not exist and 403 (with `detail`)
+    if it does not belong to one of the educator's courses. Resolved from the ownership cache.
+    """
+    owner = ownership.resolve(db, kind, entity_id)
+    if owner is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{kind.capitalize()} not found")
+    if owner.educator_id != educator.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+    return owner
+
+def authorize_owner(token: str, kind: str, entity_id: int, detail: str) -> ownership.Owner:
+    """
+    Authentication, the educator check and require_owner in one call with a short-lived session,
+    for async endpoints that stream (live feeds, uploads); call it through run_in_threadpool.
+    Through Depends(get_db) every request would take a threadpool token per step and hold a
+    pool connection until its teardown, so a burst of hundreds of long requests exhausts both
+    and deadlocks until the pool times out.
+    """
+    db = SessionLocal()
+    try:
+        educator = get_current_educator(get_current_active_user(authenticate(db, token)))
+        return require_owner(db, kind, entity_id, educator, detail)
+    finally:
+        db.close()
+
+
+def _parse_ids(ids: str) -> List[int]:
+    try:
+        parsed = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip())) # Unique, in order
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids is empty")
+    if len(parsed) > settings.BATCH_MAX_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.BATCH_MAX_IDS} ids at a time")
+    return parsed
+
+def batch_ids(
+    ids: Optional[str] = Query(None, description="Comma-separated IDs to fetch in one request, e.g. `1,5,9`"),
+) -> Optional[List[int]]:
+    """Dependency for listings that can also look up a batch of IDs (`?ids=1,5,9`); None without `ids`."""
+    return None if ids is None else _parse_ids(ids)
+
+def required_batch_ids(
+    ids: str = Query(..., description="Comma-separated IDs to fetch in one request, e.g. `1,5,9`"),
+) -> List[int]:
+    """Dependency for batch lookups by ID (`?ids=1,5,9`)."""
+    return _parse_ids(ids)
@@ -1,6 +1,6 @@
 # backend/app/api/endpoints/auth.py
-from datetime import timedelta
-from typing import Annotated
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
@@ -8,20 +8,24 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.core.security import verify_password
-from app.core.jwt import create_access_token
+from app.core.jwt import create_token_pair, verify_refresh_token, verify_token
+from app.core.revocation import revocation_list
 from app.config import settings
+from app.schemas.token import Token, RefreshRequest, LogoutRequest
 from app.crud import crud_user # Import crud_user to fetch user
+from app.api.deps import get_current_active_user, oauth2_scheme
+from app.models.user import User as DBUser
 
 router = APIRouter()
 
-@router.post("/token", summary="Authenticate User and Get JWT Access Token")
+@router.post("/token", response_model=Token, summary="Authenticate User and Get JWT Access Token")
 async def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Session = Depends(get_db)
 ):
     """
     Authenticates a user with a username and password,
-    and returns a JWT access token upon successful login.
+    and returns a short-lived JWT access token and a refresh token upon successful login.
     """
     user = crud_user.get_user_by_username(db, username=form_data.username)
     if not user or not verify_password(form_data.password, user.hashed_password):
@@ -36,11 +40,64 @@ async def login_for_access_token(
             detail="Inactive user",
         )
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        user=user, # Ensure the 'user' object is passed here
-        expires_delta=access_token_expires
+    return create_token_pair(user) # Starts a new refresh-token family
+
+def _expiry(payload: dict) -> datetime:
+    return datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+
+@router.post("/token/refresh", response_model=Token, summary="Rotate Refresh Token")
+def refresh_access_token(
+    request: RefreshRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token.
+    The presented refresh token is revoked; presenting it again revokes its whole family
+    (every token issued from the same login), since that means it was stolen.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    payload = verify_refresh_token(request.refresh_token, credentials_exception)
+    if revocation_list.is_revoked(db, (payload["fam"],)):
+        raise credentials_exception
+    # Rotating revokes the token; if it already was (also by a concurrent refresh with the same
+    # token), this is reuse of a rotated token: revoke the family until its last refresh token would expire
+    if not revocation_list.revoke(db, payload["jti"], "refresh", _expiry(payload), user_id=payload.get("id")):
+        revocation_list.revoke(db, payload["fam"], "family", _expiry(payload), user_id=payload.get("id"))
+        db.commit()
+        raise credentials_exception
 
-# You might consider a refresh token endpoint here later
\ No newline at end of file
+    user = crud_user.get_user_by_username(db, username=payload["sub"])
+    if not user or not user.is_active:
+        raise credentials_exception # The session is rolled back: the token is not spent
+
+    db.commit()
+    return create_token_pair(user, family_id=payload["fam"])
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT, summary="Log Out")
+def logout(
+    request: Optional[LogoutRequest] = None,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Revokes the current access token and its refresh-token family, i.e. every token of this login.
+    """
+    payload = verify_token(token, HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)) # Served from the token cache
+    if payload.get("jti"):
+        revocation_list.revoke(db, payload["jti"], "access", _expiry(payload), user_id=current_user.id)
+    family_id, expires_at = payload.get("fam"), None
+    if request and request.refresh_token:
+        refresh = verify_refresh_token(request.refresh_token, HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token"))
+        if refresh.get("id") != current_user.id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid refresh token")
+        family_id, expires_at = refresh["fam"], _expiry(refresh)
+    if family_id:
+        # Without the refresh token its expiry is unknown; keep the family revoked for the longest possible lifetime
+        expires_at = expires_at or datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        revocation_list.revoke(db, family_id, "family", expires_at, user_id=current_user.id)
+    db.commit()
\ No newline at end of file
@@ -0,0 +1,102 @@
+# backend/app/api/endpoints/batch.py
+import logging
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import Session
+from starlette.routing import Match
+
+from app.config import settings
+from app.database import BATCH_SESSION, get_read_db
+from app.schemas.batch import Batch, BatchOut
+from app.api.deps import BATCH_USER, authenticate, get_current_active_user, oauth2_scheme
+from app.models.user import User as DBUser
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = b'{"detail":"Not Found"}'
+NOT_BATCHABLE = b'{"detail":"This endpoint cannot be used in a batch"}'
+SERVER_ERROR = b'{"detail":"Internal Server Error"}'
+
+def _route(scope: dict) -> Optional[APIRoute]:
+    """The route serving a sub-request, like the router finds it (a missing or extra trailing slash is tolerated)."""
+    for path in (scope["path"], scope["path"][:-1] if scope["path"].endswith("/") else scope["path"] + "/"):
+        scope.update(path=path, raw_path=path.encode())
+        for route in scope["app"].router.routes:
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                scope.update(child_scope) # Path parameters
+                return route
+    return None
+
+async def _subrequest(request: Request, db: Session, user: DBUser, path: str) -> Tuple[int, bytes]:
+    """Runs one GET through the app's router, with the batch's session and user. Returns its status and body."""
+    url = urlsplit(path)
+    scope = {
+        "type": "http", "asgi": request.scope.get("asgi", {"version": "3.0"}), "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET", "scheme": request.scope.get("scheme", "http"), "root_path": "",
+        "server": request.scope.get("server"), "client": request.scope.get("client"),
+        "path": url.path, "query_string": url.query.encode(),
+        "headers": [(name, value) for name, value in request.scope["headers"] if name in (b"host", b"authorization")],
+        "app": request.scope["app"], "state": {},
+        # HTTPException, validation errors, ShardMoving, ...: handled as for a request of their own
+        "starlette.exception_handlers": request.scope["starlette.exception_handlers"],
+        BATCH_SESSION: db, BATCH_USER: user,
+    }
+    route = _route(scope)
+    if route is None:
+        return status.HTTP_404_NOT_FOUND, NOT_FOUND
+    # JSON reads only: no writes, streams (exports, live feeds, media) or HTML
+    if not isinstance(route, APIRoute) or "GET" not in route.methods or route.response_model is None:
+        return status.HTTP_400_BAD_REQUEST, NOT_BATCHABLE
+
+    status_code, body = status.HTTP_500_INTERNAL_SERVER_ERROR, []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+        elif message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+    try:
+        await route.handle(scope, receive, send)
+    except Exception:
+        # Only this sub-request fails; the session is rolled back for the following ones
+        logger.exception("Batch sub-request GET %s failed", path)
+        await run_in_threadpool(db.rollback)
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, SERVER_ERROR
+    return status_code, b"".join(body) or b"null"
+
+def _authenticate(db: Session, token: str) -> DBUser:
+    return get_current_active_user(authenticate(db, token))
+
+@router.post("/batch", response_model=BatchOut, summary="Run Several GET Requests at Once")
+async def run_batch(
+    batch: Batch,
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Runs up to BATCH_MAX_REQUESTS GET requests of this API in one call, one after the other, and
+    returns each one's status code and JSON body in order. They share one authentication check
+    and one database session (a read replica when configured). A failing request does not fail
+    the others. Only JSON GET endpoints can be batched: not exports, live feeds or media.
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"At most {settings.BATCH_MAX_REQUESTS} requests per batch")
+    user = await run_in_threadpool(_authenticate, db, token)
+
+    responses = []
+    for item in batch.requests:
+        status_code, body = await _subrequest(request, db, user, item.path)
+        responses.append(b'{"status":%d,"body":%s}' % (status_code, body))
+    # Bodies are already JSON: spliced in, not parsed and serialized again
+    return Response(b'{"responses":[' + b",".join(responses) + b"]}", media_type="application/json")
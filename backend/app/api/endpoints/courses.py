@@ -1,14 +1,22 @@
 # backend/app/api/endpoints/courses.py
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.schemas.course import CourseCreate, CourseOut, CourseUpdate
-from app.crud import crud_course
-from app.api.deps import get_current_active_user, get_current_educator
+from app.database import get_db, get_primary_db
+from app.schemas.course import CourseClone, CourseCreate, CourseOut, CourseUpdate
+from app.schemas.job import JobOut
+from app.schemas.lesson import LessonOrderOut, LessonOrderUpdate
+from app.schemas.user_progress import CohortCompletionOut
+from app.crud import crud_course, crud_lesson
+from app.api.deps import authorize_owner, batch_ids, get_current_active_user, get_current_educator, oauth2_scheme, require_owner
+from app.core import live
+from app.models.course import Course
 from app.models.user import User as DBUser # Alias for current_user type hint
+from app.services import completion, course_clone, exports, fieldsets, purge
 
 router = APIRouter()
 
@@ -27,11 +35,25 @@ def create_course(
 def read_courses(
     skip: int = 0,
     limit: int = 100,
+    ids: Optional[List[int]] = Depends(batch_ids),
+    fields: Optional[str] = Query(None, description="Only these fields, e.g. `id,title,lessons.id,lessons.title`"),
     db: Session = Depends(get_db)
 ):
     """
     Retrieves a list of all available courses. Accessible by any authenticated user.
+    With `ids`, retrieves those courses instead (ordered by ID, missing ones left out; no paging).
+    With `fields`, each course has only the listed fields (`lessons` alone: all lesson fields),
+    and only their columns are queried.
     """
+    if fields is not None:
+        try:
+            fieldset = fieldsets.parse(fields, CourseOut, Course)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        courses = crud_course.get_course_fields(db, fieldset, skip=skip, limit=limit, course_ids=ids)
+        return Response(fieldsets.to_json(courses), media_type="application/json")
+    if ids is not None:
+        return crud_course.get_courses_by_ids(db, ids)
     courses = crud_course.get_courses(db, skip=skip, limit=limit)
     return courses
 
@@ -58,29 +80,169 @@ def update_course(
     """
     Updates an existing course. Only accessible by the course's educator.
     """
+    require_owner(db, "course", course_id, current_educator, "Not authorized to update this course")
     db_course = crud_course.get_course(db, course_id=course_id)
-    if db_course is None:
+    if db_course is None: # Deleted since its owner was cached
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if db_course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this course")
 
     return crud_course.update_course(db=db, db_course=db_course, course_in=course_in)
 
+@router.put("/{course_id}/lesson-order", response_model=LessonOrderOut, summary="Reorder Lessons of a Course")
+def update_lesson_order(
+    course_id: int,
+    order: LessonOrderUpdate,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Applies a whole new lesson order in one statement. `lesson_ids` must list every lesson of the
+    course exactly once, first lesson first. Only accessible by the course's educator.
+    To move a single lesson, update it with `after_lesson_id` or `before_lesson_id` instead.
+    """
+    require_owner(db, "course", course_id, current_educator, "Not authorized to reorder this course")
+
+    try:
+        crud_lesson.set_lesson_order(db, course_id, order.lesson_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return LessonOrderOut(course_id=course_id, lesson_ids=order.lesson_ids)
+
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete Course")
 def delete_course(
     course_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_educator: DBUser = Depends(get_current_educator) # Only educators can delete courses
 ):
     """
     Deletes a course. Only accessible by the course's educator.
+    The course and everything under it disappear at once; the rows are purged by a background
+    job, linked in the Location header (GET /api/v1/jobs/{id} reports its progress).
     """
-    db_course = crud_course.get_course(db, course_id=course_id)
-    if db_course is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if db_course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this course")
+    require_owner(db, "course", course_id, current_educator, "Not authorized to delete this course")
 
     if not crud_course.delete_course(db=db, course_id=course_id):
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not delete course")
-    return {"message": "Course deleted successfully"}
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found") # Deleted since its owner was cached
+    job = purge.schedule_purge(background_tasks, "course", course_id, owner_id=current_educator.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Location": f"/api/v1/jobs/{job.id}"})
+
+@router.post(
+    "/{course_id}/clone", response_model=CourseOut, status_code=status.HTTP_201_CREATED, summary="Clone Course",
+    responses={status.HTTP_202_ACCEPTED: {"model": JobOut, "description": "Large course: cloning as a background job"}},
+)
+def clone_course(
+    course_id: int,
+    background_tasks: BackgroundTasks,
+    clone: CourseClone = CourseClone(),
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Copies a course with all its lessons, quizzes, questions, options and prerequisites, e.g. for a
+    new cohort. Only accessible by the course's educator; students' answers and progress are not copied.
+    Courses with more than COURSE_CLONE_INLINE_MAX_LESSONS lessons (or `background: true`) are cloned
+    in the background: the response is then 202 with the job, whose result holds the new course ID.
+    """
+    require_owner(db, "course", course_id, current_educator, "Not authorized to clone this course")
+
+    background = clone.background
+    if background is None:
+        background = course_clone.should_run_in_background(db, course_id)
+    if background:
+        job = course_clone.schedule_clone(background_tasks, course_id, current_educator.id, title=clone.title)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=JobOut.model_validate(job).model_dump(mode="json"),
+            headers={"Location": f"/api/v1/jobs/{job.id}"},
+        )
+    try:
+        result = course_clone.clone_course(db, course_id, current_educator.id, title=clone.title)
+    except course_clone.CourseNotFound:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found") # Deleted since its owner was cached
+    return crud_course.get_course(db, course_id=result["course_id"])
+
+def _csv_response(rows, header, filename: str, compress: bool) -> StreamingResponse:
+    if compress:
+        filename += ".gz"
+    return StreamingResponse(
+        exports.export_csv(rows, header, compress=compress),
+        media_type="application/gzip" if compress else "text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/{course_id}/export/answers.csv", summary="Export Course Answers as CSV")
+def export_course_answers(
+    course_id: int,
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Streams every quiz answer submitted in the course as CSV, oldest first. Only accessible by the
+    course's educator. With `gzip=true` the file is compressed on the fly (answers.csv.gz).
+    Answers already moved to the archive are not included.
+    """
+    require_owner(db, "course", course_id, current_educator, "Not authorized to export this course")
+    return _csv_response(exports.answer_rows(course_id), exports.ANSWER_COLUMNS, f"course-{course_id}-answers.csv", gzip)
+
+@router.get("/{course_id}/export/progress.csv", summary="Export Course Progress as CSV")
+def export_course_progress(
+    course_id: int,
+    gzip: bool = False,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Streams the lesson progress of every student in the course as CSV. Only accessible by the
+    course's educator. With `gzip=true` the file is compressed on the fly (progress.csv.gz).
+    """
+    require_owner(db, "course", course_id, current_educator, "Not authorized to export this course")
+    return _csv_response(exports.progress_rows(course_id), exports.PROGRESS_COLUMNS, f"course-{course_id}-progress.csv", gzip)
+
+@router.get("/{course_id}/completions", response_model=CohortCompletionOut, summary="Get Students Who Completed Lessons")
+def read_course_completions(
+    course_id: int,
+    lessons: str = Query("", description="Lesson positions in course order, 1-based, e.g. '1-10' or '1,3,5-7'. Empty for every lesson"),
+    db: Session = Depends(get_primary_db), # Fills the shared lesson lists and completion cache
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Lists the students who completed every one of the given lessons, e.g. `lessons=1-10` for
+    "who finished the first ten lessons", or by default everyone who finished the course.
+    Only accessible by the course's educator. Served from the students' completion bitmaps,
+    which may be up to COMPLETION_CACHE_TTL_SECONDS old.
+    """
+    require_owner(db, "course", course_id, current_educator, "Not authorized to view this course's progress")
+    current = completion.layout(db, course_id, fresh=True) # One lesson list query: positions as of now
+    try:
+        positions = completion.parse_positions(lessons, len(current.lesson_ids))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    user_ids, learners = completion.users_completing(db, course_id, current, positions)
+    return CohortCompletionOut(
+        course_id=course_id,
+        lesson_ids=[current.lesson_ids[position] for position in positions],
+        user_ids=user_ids,
+        learners=learners,
+    )
+
+@router.get("/{course_id}/live", summary="Live Course Activity (Server-Sent Events)")
+async def live_course_activity(
+    course_id: int,
+    last_event_id: Optional[str] = Header(None),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Streams the course's quiz answers (`answer` events) and lesson completions (`lesson_completed`
+    events) as Server-Sent Events while students work, instead of polling the progress exports.
+    Only accessible by the course's educator. A reconnect with Last-Event-ID replays the events
+    it missed; a `reset` event means too many were missed and the dashboard should reload, and a
+    `dropped` event ends the stream of a client that reads slower than events arrive.
+    """
+    await run_in_threadpool(authorize_owner, token, "course", course_id, "Not authorized to follow this course")
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return StreamingResponse(
+        live.broker.stream(live.course_topic(course_id), last_event_id=resume_from),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # No proxy buffering (nginx)
+    )
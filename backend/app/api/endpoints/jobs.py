@@ -0,0 +1,22 @@
+# backend/app/api/endpoints/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core import jobs
+from app.schemas.job import JobOut
+from app.api.deps import get_current_active_user
+from app.models.user import User as DBUser
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=JobOut, summary="Get Background Job Status")
+def read_job(
+    job_id: str,
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Retrieves the status and progress of a background job started by the current user.
+    """
+    job = jobs.get_job(job_id)
+    if job is None or job.owner_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
@@ -1,13 +1,17 @@
 # backend/app/api/endpoints/lessons.py
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import HTMLResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.config import settings
+from app.database import SessionLocal, get_db
 from app.schemas.lesson import LessonCreate, LessonOut, LessonUpdate
-from app.crud import crud_lesson, crud_course # Need crud_course to check course existence/ownership
-from app.api.deps import get_current_educator
+from app.crud import crud_lesson
+from app.services import lesson_bodies, lesson_render, media, ownership, purge
+from app.api.deps import authorize_owner, get_current_educator, oauth2_scheme, required_batch_ids, require_owner
 from app.models.user import User as DBUser
 
 router = APIRouter()
@@ -20,14 +24,25 @@ def create_lesson(
 ):
     """
     Creates a new lesson for a specific course. Only accessible by the course's educator.
+    The lesson goes at the end of the course unless `order`, `after_lesson_id` or `before_lesson_id` is given.
     """
-    course = crud_course.get_course(db, course_id=lesson.course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-    if course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to add lessons to this course")
+    require_owner(db, "course", lesson.course_id, current_educator, "Not authorized to add lessons to this course")
+
+    try:
+        return crud_lesson.create_lesson(db=db, lesson=lesson)
+    except ValueError as e: # Placement next to a lesson of another course
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    return crud_lesson.create_lesson(db=db, lesson=lesson)
+@router.get("/", response_model=List[LessonOut], summary="Get Lessons by IDs")
+def read_lessons(
+    ids: List[int] = Depends(required_batch_ids),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves several lessons by ID in one request (`?ids=1,5,9`), ordered by ID.
+    Lessons that do not exist are left out.
+    """
+    return crud_lesson.get_lessons_by_ids(db, ids)
 
 @router.get("/by-course/{course_id}", response_model=List[LessonOut], summary="Get Lessons by Course ID")
 def read_lessons_by_course(
@@ -39,8 +54,7 @@ def read_lessons_by_course(
     """
     Retrieves all lessons for a given course, ordered by their 'order' field.
     """
-    course = crud_course.get_course(db, course_id=course_id)
-    if not course:
+    if ownership.resolve(db, "course", course_id) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
     lessons = crud_lesson.get_lessons_by_course(db, course_id=course_id, skip=skip, limit=limit)
     return lessons
@@ -58,6 +72,31 @@ def read_lesson(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
     return lesson
 
+@router.get("/{lesson_id}/rendered", response_class=HTMLResponse, summary="Get Rendered Lesson Text")
+def read_rendered_lesson(
+    lesson_id: int,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Returns the lesson's markdown text rendered to sanitized HTML (raw HTML in the text is escaped).
+    Renders are cached by text and renderer, which also make up the ETag (`If-None-Match` answers 304).
+    """
+    lesson = crud_lesson.get_lesson(db, lesson_id=lesson_id)
+    if lesson is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
+    if lesson.body_sha256 is not None: # A cached render does not need the stored text
+        key, load_text = lesson.body_sha256, lambda: lesson_bodies.load(db, lesson.body_sha256)
+    elif lesson.inline_text:
+        key, load_text = lesson_render.text_key(lesson.inline_text), lambda: lesson.inline_text
+    else:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson has no text content")
+
+    headers = {"ETag": f'"{key}-{lesson_render.RENDERER}"', "Cache-Control": "public, no-cache"}
+    if if_none_match and headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return HTMLResponse(lesson_render.rendered(key, load_text), headers=headers)
+
 @router.put("/{lesson_id}", response_model=LessonOut, summary="Update Lesson")
 def update_lesson(
     lesson_id: int,
@@ -67,36 +106,116 @@ def update_lesson(
 ):
     """
     Updates an existing lesson. Only accessible by the owning course's educator.
+    `after_lesson_id` or `before_lesson_id` moves it next to another lesson of the course.
     """
+    require_owner(db, "lesson", lesson_id, current_educator, "Not authorized to update this lesson")
     db_lesson = crud_lesson.get_lesson(db, lesson_id=lesson_id)
-    if db_lesson is None:
+    if db_lesson is None: # Deleted since its owner was cached
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
 
-    # Check if the current educator owns the course associated with the lesson
-    course = crud_course.get_course(db, course_id=db_lesson.course_id)
-    if not course or course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this lesson")
-
-    return crud_lesson.update_lesson(db=db, db_lesson=db_lesson, lesson_in=lesson_in)
+    try:
+        return crud_lesson.update_lesson(db=db, db_lesson=db_lesson, lesson_in=lesson_in)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.delete("/{lesson_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete Lesson")
 def delete_lesson(
     lesson_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_educator: DBUser = Depends(get_current_educator)
 ):
     """
     Deletes a lesson. Only accessible by the owning course's educator.
+    Its rows are purged by a background job, linked in the Location header.
     """
+    require_owner(db, "lesson", lesson_id, current_educator, "Not authorized to delete this lesson")
+
+    if not crud_lesson.delete_lesson(db=db, lesson_id=lesson_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found") # Deleted since its owner was cached
+    job = purge.schedule_purge(background_tasks, "lesson", lesson_id, owner_id=current_educator.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"Location": f"/api/v1/jobs/{job.id}"})
+
+def _video_lesson(db: Session, lesson_id: int):
     db_lesson = crud_lesson.get_lesson(db, lesson_id=lesson_id)
     if db_lesson is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
+    if db_lesson.content_type != "video":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only video lessons have media")
+    return db_lesson
 
-    # Check if the current educator owns the course associated with the lesson
-    course = crud_course.get_course(db, course_id=db_lesson.course_id)
-    if not course or course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this lesson")
+def _authorize_media_upload(token: str, lesson_id: int) -> None:
+    authorize_owner(token, "lesson", lesson_id, "Not authorized to upload media for this lesson")
+    db = SessionLocal()
+    try:
+        _video_lesson(db, lesson_id)
+    finally:
+        db.close()
 
-    if not crud_lesson.delete_lesson(db=db, lesson_id=lesson_id):
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not delete lesson")
-    return {"message": "Lesson deleted successfully"}
\ No newline at end of file
+def _attach_media(lesson_id: int, sha256: str, media_type: str, size: int) -> LessonOut:
+    db = SessionLocal()
+    try:
+        db_lesson = _video_lesson(db, lesson_id) # Again: the lesson may have changed during the upload
+        return LessonOut.model_validate(crud_lesson.set_lesson_media(db, db_lesson, sha256, media_type, size))
+    finally:
+        db.close()
+
+@router.put("/{lesson_id}/media", response_model=LessonOut, summary="Upload Lesson Video")
+async def upload_lesson_media(
+    lesson_id: int,
+    request: Request,
+    content_type: str = Header(...),
+    content_length: Optional[int] = Header(None),
+    token: str = Depends(oauth2_scheme)
+):
+    """
+    Uploads the video of a video lesson, replacing any previous one. The request body is the
+    file itself (e.g. `Content-Type: video/mp4`), streamed to the media store as it arrives.
+    Only accessible by the owning course's educator.
+    """
+    await run_in_threadpool(_authorize_media_upload, token, lesson_id)
+    media_type = content_type.split(";")[0].strip().lower()
+    if not media_type.startswith("video/"):
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="Upload a video/* file")
+    if content_length is not None and content_length > settings.MEDIA_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Media files are limited to {settings.MEDIA_MAX_UPLOAD_BYTES} bytes")
+
+    try:
+        sha256, size = await media.store_upload(request.stream(), settings.MEDIA_MAX_UPLOAD_BYTES)
+    except media.UploadTooLarge as e: # Larger than announced
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e: # Empty
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return await run_in_threadpool(_attach_media, lesson_id, sha256, media_type, size)
+
+@router.get("/{lesson_id}/media", summary="Get Lesson Video")
+@router.head("/{lesson_id}/media", include_in_schema=False) # Same handler; one GET operation in the schema
+async def read_lesson_media(lesson_id: int, request: Request):
+    """
+    Serves the uploaded video of a lesson. Supports `Range` requests (seeking), `If-Range` and
+    ETag revalidation (`If-None-Match`); the ETag is the file's SHA-256.
+    """
+    found, media_file = media.cached(lesson_id)
+    if not found: # Looked up once per MEDIA_CACHE_TTL_SECONDS, not on every range request
+        media_file = await run_in_threadpool(media.resolve, lesson_id)
+    if media_file is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson has no media")
+    return media.media_response(media_file, request.method, request.headers)
+
+@router.delete("/{lesson_id}/media", status_code=status.HTTP_204_NO_CONTENT, summary="Remove Lesson Video")
+def delete_lesson_media(
+    lesson_id: int,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Removes the uploaded video of a lesson. Only accessible by the owning course's educator.
+    The file itself is removed by the media garbage collection once no lesson uses it.
+    """
+    require_owner(db, "lesson", lesson_id, current_educator, "Not authorized to remove media from this lesson")
+    db_lesson = crud_lesson.get_lesson(db, lesson_id=lesson_id)
+    if db_lesson is None or db_lesson.media_sha256 is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson has no media")
+    crud_lesson.set_lesson_media(db, db_lesson, None)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
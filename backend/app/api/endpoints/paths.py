@@ -0,0 +1,121 @@
+# backend/app/api/endpoints/paths.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.database import get_db, get_primary_db
+from app.schemas.prerequisite import (
+    PrerequisiteCreate, PrerequisiteOut, CourseLessonOrderOut, CourseOrderOut, NextLessonsOut
+)
+from app.crud import crud_prerequisite, crud_user_progress
+from app.models.lesson import Lesson
+from app.services import ownership, prerequisite_graph
+from app.api.deps import get_current_active_user, get_current_educator
+from app.models.user import User as DBUser
+
+router = APIRouter()
+
+def _get_node_owner(db: Session, node_type: str, node_id: int):
+    """Returns the owner (course and educator) of a lesson/course node, or None if the node does not exist."""
+    return ownership.resolve(db, node_type, node_id)
+
+@router.post("/prerequisites", response_model=PrerequisiteOut, status_code=status.HTTP_201_CREATED, summary="Add Prerequisite")
+def create_prerequisite(
+    prerequisite: PrerequisiteCreate,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Declares that a lesson or course requires another lesson or course to be completed first.
+    Only accessible by the educator owning the lesson/course that gets the requirement.
+    Rejected if the new edge would create a cycle.
+    """
+    owner = _get_node_owner(db, prerequisite.node_type, prerequisite.node_id)
+    if not owner:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{prerequisite.node_type.capitalize()} not found")
+    if owner.educator_id != current_educator.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to add prerequisites here")
+    if not _get_node_owner(db, prerequisite.required_type, prerequisite.required_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Required {prerequisite.required_type} not found")
+
+    try:
+        return crud_prerequisite.create_prerequisite(db=db, prerequisite=prerequisite)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@router.get("/prerequisites/{node_type}/{node_id}", response_model=List[PrerequisiteOut], summary="Get Prerequisites of a Lesson or Course")
+def read_prerequisites(
+    node_type: str,
+    node_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the direct prerequisites declared on a lesson or course.
+    """
+    if node_type not in ("lesson", "course"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown node type")
+    return crud_prerequisite.get_prerequisites_for_node(db, node_type=node_type, node_id=node_id)
+
+@router.delete("/prerequisites/{prerequisite_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Remove Prerequisite")
+def delete_prerequisite(
+    prerequisite_id: int,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Removes a prerequisite. Only accessible by the educator owning the lesson/course that has it.
+    """
+    db_prerequisite = crud_prerequisite.get_prerequisite(db, prerequisite_id=prerequisite_id)
+    if db_prerequisite is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Prerequisite not found")
+    owner = _get_node_owner(db, db_prerequisite.node_type, db_prerequisite.node_id)
+    if not owner or owner.educator_id != current_educator.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to remove this prerequisite")
+
+    crud_prerequisite.delete_prerequisite(db=db, prerequisite_id=prerequisite_id)
+    return {"message": "Prerequisite deleted successfully"}
+
+@router.get("/courses/order", response_model=CourseOrderOut, summary="Get Course Order")
+def read_course_order(
+    db: Session = Depends(get_primary_db) # Fills the shared prerequisite graph cache
+):
+    """
+    Retrieves the courses involved in prerequisites in dependency order (prerequisite courses first).
+    """
+    return CourseOrderOut(course_ids=prerequisite_graph.get_graph(db).course_order(db))
+
+@router.get("/courses/{course_id}/order", response_model=CourseLessonOrderOut, summary="Get Lesson Order of a Course")
+def read_course_lesson_order(
+    course_id: int,
+    db: Session = Depends(get_primary_db) # Fills the shared prerequisite graph cache
+):
+    """
+    Retrieves the lessons of a course in an order that respects their prerequisites.
+    Ties are broken by the lessons' `order` field.
+    """
+    if ownership.resolve(db, "course", course_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return CourseLessonOrderOut(course_id=course_id, lesson_ids=prerequisite_graph.get_graph(db).lesson_order(db, course_id))
+
+@router.get("/me/next", response_model=NextLessonsOut, summary="Get Lessons Available Next")
+def read_my_next_lessons(
+    course_id: Optional[int] = None,
+    db: Session = Depends(get_primary_db), # Fills the shared prerequisite graph cache
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Retrieves the lessons the current user can take next: not completed yet and with every
+    prerequisite satisfied. Limited to `course_id` if given, otherwise to the courses the user has started.
+    """
+    completed = crud_user_progress.get_completed_lesson_ids(db, current_user.id)
+    graph = prerequisite_graph.get_graph(db)
+    if course_id is not None:
+        course_ids = [course_id]
+    else:
+        started = crud_user_progress.get_started_lesson_ids(db, current_user.id)
+        course_ids = sorted({
+            lesson_course_id for (lesson_course_id,) in
+            db.query(Lesson.course_id).filter(Lesson.id.in_(started)).distinct()
+        }) if started else []
+    return NextLessonsOut(lesson_ids=graph.next_lessons(db, course_ids, completed))
@@ -1,14 +1,18 @@
 # backend/app/api/endpoints/progress.py
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.schemas.user_progress import UserProgressOut
+from app.database import get_db, get_primary_db
+from app.schemas.user_progress import CourseCompletionOut, CourseSummaryOut, UserProgressOut
 from app.schemas.user_answer import UserAnswerCreate, UserAnswerOut
+from app.schemas.review_item import ReviewItemOut, ReviewSubmit
 from app.crud import crud_user_progress, crud_user_answer, crud_lesson, crud_quiz, crud_question
+from app.services import completion, dashboard, grading, ownership, prerequisite_graph, review_scheduler
 from app.api.deps import get_current_active_user
+from app.core import live
 from app.models.user import User as DBUser
 
 router = APIRouter()
@@ -21,12 +25,22 @@ def mark_lesson_complete(
 ):
     """
     Marks a specific lesson as completed for the current user.
-    If a quiz exists for the lesson, ensure it's completed first.
+    The lesson's prerequisites must be completed, and if a quiz exists for the lesson, it must be completed first.
     """
     lesson = crud_lesson.get_lesson(db, lesson_id=lesson_id)
     if not lesson:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
 
+    # Prerequisites are checked against the cached graph and the user's completed
+    # lessons, read in one query from the user's shard.
+    completed = crud_user_progress.get_completed_lesson_ids(db, current_user.id)
+    missing = prerequisite_graph.get_graph(db).missing_requirements(db, lesson.id, lesson.course_id, completed)
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please complete the prerequisites of this lesson first."
+        )
+
     # Optional: Check if there's an associated quiz and if it's completed
     quiz = crud_quiz.get_quiz_by_lesson_id(db, lesson_id=lesson_id)
     if quiz:
@@ -44,9 +58,15 @@ def mark_lesson_complete(
                 # if user_answer.is_correct is not True:
                 #     raise HTTPException(...)
 
-    return crud_user_progress.create_or_update_user_progress(
+    progress = crud_user_progress.create_or_update_user_progress(
         db=db, user_id=current_user.id, lesson_id=lesson_id, is_completed=True
     )
+    # Committed: tell the educator's live feed (GET /courses/{id}/live)
+    live.broker.publish(live.course_topic(lesson.course_id), "lesson_completed", {
+        "user_id": current_user.id, "username": current_user.username, "lesson_id": lesson_id,
+        "completed_at": progress.completed_at,
+    })
+    return progress
 
 @router.get("/me", response_model=List[UserProgressOut], summary="Get Current User's Progress")
 def get_my_progress(
@@ -60,6 +80,32 @@ def get_my_progress(
     """
     return crud_user_progress.get_user_progress_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
 
+@router.get("/me/dashboard", response_model=List[CourseSummaryOut], summary="Get Current User's Learning Dashboard")
+def get_my_dashboard(
+    db: Session = Depends(get_primary_db), # Rewrites stale summaries and fills the shared lesson lists
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Summarizes every course the current user has worked on, most recent activity first:
+    completion, the next incomplete lesson and the quiz score. Served from per-course summaries
+    kept up to date as lessons are completed and answers submitted.
+    """
+    return dashboard.get_dashboard(db, user_id=current_user.id)
+
+@router.get("/me/courses/{course_id}", response_model=CourseCompletionOut, summary="Get Current User's Completion of a Course")
+def get_my_course_completion(
+    course_id: int,
+    db: Session = Depends(get_primary_db), # Rewrites a stale bitmap and fills the shared lesson lists
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    The lessons of a course the current user has completed, the completion percent and the next
+    lesson to take, read from the user's completion bitmap of the course.
+    """
+    if ownership.resolve(db, "course", course_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    return completion.course_completion(db, user_id=current_user.id, course_id=course_id)
+
 @router.post("/answers/", response_model=UserAnswerOut, status_code=status.HTTP_201_CREATED, summary="Submit Quiz Answer")
 def submit_answer(
     answer: UserAnswerCreate,
@@ -68,20 +114,24 @@ def submit_answer(
 ):
     """
     Submits an answer to a quiz question for the current user.
-    Will automatically grade MCQ answers.
+    Answers are graded automatically: MCQ by option, TrueFalse and ShortAnswer by the question's answer spec.
     """
     # Ensure the question exists and belongs to a quiz within a lesson
     question = crud_question.get_question(db, question_id=answer.question_id)
     if not question:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
 
-    # Optional: Check if user already answered this question and prevent re-submission
-    existing_answer = crud_user_answer.get_user_answer_for_question(db, current_user.id, answer.question_id)
-    if existing_answer:
+    # Re-submissions are rejected by the insert itself (one answer per user and question),
+    # so concurrent double-submits cannot both get through
+    db_answer = crud_user_answer.create_user_answer(db=db, user_answer=answer, user_id=current_user.id)
+    if db_answer is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="You have already answered this question.")
-
-
-    return crud_user_answer.create_user_answer(db=db, user_answer=answer, user_id=current_user.id)
+    # Committed: tell the educator's live feed (GET /courses/{id}/live)
+    live.broker.publish(live.course_topic(question.quiz.lesson.course_id), "answer", {
+        "user_id": current_user.id, "username": current_user.username, "question_id": question.id,
+        "lesson_id": question.quiz.lesson_id, "is_correct": db_answer.is_correct, "answered_at": db_answer.answered_at,
+    })
+    return db_answer
 
 @router.get("/answers/me", response_model=List[UserAnswerOut], summary="Get Current User's Answers")
 def get_my_answers(
@@ -93,4 +143,58 @@ def get_my_answers(
     """
     Retrieves all answers submitted by the current authenticated user.
     """
-    return crud_user_answer.get_user_answers_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
\ No newline at end of file
+    return crud_user_answer.get_user_answers_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@router.get("/answers/me/history", response_model=List[UserAnswerOut], summary="Get Current User's Answer History")
+def get_my_answer_history(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    question_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Retrieves the current user's answers in chronological order, optionally within [since, until).
+    Answers moved to the archive are included transparently.
+    """
+    return crud_user_answer.get_user_answer_history(
+        db, user_id=current_user.id, since=since, until=until, question_id=question_id, skip=skip, limit=limit
+    )
+
+@router.get("/reviews/due", response_model=List[ReviewItemOut], summary="Get Current User's Due Reviews")
+def get_my_due_reviews(
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Retrieves the questions the current user should review now, most overdue first.
+    Schedules follow the SM-2 spaced-repetition algorithm over the user's graded answers.
+    """
+    return review_scheduler.get_due_reviews(db, user_id=current_user.id, limit=limit)
+
+@router.post("/reviews/{question_id}", response_model=ReviewItemOut, summary="Submit Review Answer")
+def submit_review(
+    question_id: int,
+    review: ReviewSubmit,
+    db: Session = Depends(get_db),
+    current_user: DBUser = Depends(get_current_active_user)
+):
+    """
+    Answers a question again as a review. The answer is graded and reschedules the question,
+    but it does not replace the original quiz answer.
+    """
+    question = crud_question.get_question(db, question_id=question_id)
+    if not question:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
+
+    is_correct = grading.grade_answer(question, review.selected_option_id, review.user_answer_text)
+    if is_correct is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This answer cannot be graded automatically.")
+
+    item = review_scheduler.record_answer(db, current_user.id, question_id, is_correct)
+    db.commit()
+    db.refresh(item)
+    return ReviewItemOut.model_validate(item).model_copy(update={"is_correct": is_correct})
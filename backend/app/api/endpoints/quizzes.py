@@ -1,14 +1,17 @@
 # backend/app/api/endpoints/quizzes.py
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.schemas.quiz import QuizCreate, QuizOut, QuizUpdate
 from app.schemas.question import QuestionCreate, QuestionOut, QuestionWithAnswersOut, OptionCreate, QuestionUpdate
-from app.crud import crud_quiz, crud_lesson, crud_question
-from app.api.deps import get_current_educator
+from app.schemas.option import OptionUpdate, OptionWithCorrectnessOut
+from app.schemas.job import JobOut
+from app.services import regrade
+from app.crud import crud_quiz, crud_question
+from app.api.deps import get_current_educator, require_owner, required_batch_ids
 from app.models.user import User as DBUser
 
 router = APIRouter()
@@ -23,11 +26,7 @@ def create_quiz(
     Creates a new quiz for a specific lesson. Only accessible by the lesson's course educator.
     A lesson can only have one quiz.
     """
-    lesson = crud_lesson.get_lesson(db, lesson_id=quiz.lesson_id)
-    if not lesson:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lesson not found")
-    if lesson.course.educator_id != current_educator.id: # Access course through lesson relationship
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to create quiz for this lesson")
+    require_owner(db, "lesson", quiz.lesson_id, current_educator, "Not authorized to create quiz for this lesson")
 
     existing_quiz = crud_quiz.get_quiz_by_lesson_id(db, lesson_id=quiz.lesson_id)
     if existing_quiz:
@@ -35,6 +34,17 @@ def create_quiz(
 
     return crud_quiz.create_quiz(db=db, quiz=quiz)
 
+@router.get("/", response_model=List[QuizOut], summary="Get Quizzes by IDs (Student View)")
+def read_quizzes(
+    ids: List[int] = Depends(required_batch_ids),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves several quizzes by ID in one request (`?ids=1,5,9`), ordered by ID, with their
+    questions (without correct answers). Quizzes that do not exist are left out.
+    """
+    return crud_quiz.get_quizzes_by_ids(db, ids)
+
 @router.get("/{quiz_id}", response_model=QuizOut, summary="Get Quiz by ID (Student View)")
 def read_quiz(
     quiz_id: int,
@@ -58,11 +68,10 @@ def read_quiz_with_answers(
     Retrieves a specific quiz by its ID, including questions with correct answers.
     Accessible only by the quiz's owning course educator.
     """
+    require_owner(db, "quiz", quiz_id, current_educator, "Not authorized to view answers for this quiz")
     quiz = crud_quiz.get_quiz(db, quiz_id=quiz_id)
-    if quiz is None:
+    if quiz is None: # Deleted since its owner was cached
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    if quiz.lesson.course.educator_id != current_educator.id: # Access course through lesson relationship
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to view answers for this quiz")
 
     # Dynamically set the response model for questions to include answers
     quiz_out_with_answers = QuizOut.model_validate(quiz.model_dump())
@@ -86,11 +95,10 @@ def update_quiz(
     """
     Updates an existing quiz. Only accessible by the lesson's course educator.
     """
+    require_owner(db, "quiz", quiz_id, current_educator, "Not authorized to update this quiz")
     db_quiz = crud_quiz.get_quiz(db, quiz_id=quiz_id)
-    if db_quiz is None:
+    if db_quiz is None: # Deleted since its owner was cached
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    if db_quiz.lesson.course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this quiz")
 
     return crud_quiz.update_quiz(db=db, db_quiz=db_quiz, quiz_in=quiz_in)
 
@@ -103,14 +111,10 @@ def delete_quiz(
     """
     Deletes a quiz. Only accessible by the lesson's course educator.
     """
-    db_quiz = crud_quiz.get_quiz(db, quiz_id=quiz_id)
-    if db_quiz is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    if db_quiz.lesson.course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this quiz")
+    require_owner(db, "quiz", quiz_id, current_educator, "Not authorized to delete this quiz")
 
     if not crud_quiz.delete_quiz(db=db, quiz_id=quiz_id):
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not delete quiz")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found") # Deleted since its owner was cached
     return {"message": "Quiz deleted successfully"}
 
 # --- Question Endpoints ---
@@ -124,11 +128,7 @@ def create_question_for_quiz(
     """
     Adds a new question to a quiz. Only accessible by the quiz's owning educator.
     """
-    db_quiz = crud_quiz.get_quiz(db, quiz_id=quiz_id)
-    if not db_quiz:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Quiz not found")
-    if db_quiz.lesson.course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to add questions to this quiz")
+    require_owner(db, "quiz", quiz_id, current_educator, "Not authorized to add questions to this quiz")
 
     # Override quiz_id from path
     question.quiz_id = quiz_id
@@ -138,19 +138,26 @@ def create_question_for_quiz(
 def update_question(
     question_id: int,
     question_in: QuestionUpdate,
+    response: Response,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_educator: DBUser = Depends(get_current_educator)
 ):
     """
     Updates an existing question. Only accessible by the owning quiz's educator.
+    Changing the question type or answer spec regrades existing answers in the background;
+    the job ID is returned in the `X-Regrade-Job` header.
     """
+    require_owner(db, "question", question_id, current_educator, "Not authorized to update this question")
     db_question = crud_question.get_question(db, question_id=question_id)
-    if db_question is None:
+    if db_question is None: # Deleted since its owner was cached
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
-    if db_question.quiz.lesson.course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update this question")
 
-    return crud_question.update_question(db=db, db_question=db_question, question_in=question_in)
+    db_question = crud_question.update_question(db=db, db_question=db_question, question_in=question_in)
+    if question_in.model_fields_set & {"question_type", "answer_spec"}:
+        job = regrade.schedule_regrade(background_tasks, question_id, owner_id=current_educator.id)
+        response.headers["X-Regrade-Job"] = job.id
+    return db_question
 
 @router.delete("/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete Question")
 def delete_question(
@@ -161,14 +168,88 @@ def delete_question(
     """
     Deletes a question. Only accessible by the owning quiz's educator.
     """
-    db_question = crud_question.get_question(db, question_id=question_id)
-    if db_question is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found")
-    if db_question.quiz.lesson.course.educator_id != current_educator.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this question")
+    require_owner(db, "question", question_id, current_educator, "Not authorized to delete this question")
 
     if not crud_question.delete_question(db=db, question_id=question_id):
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not delete question")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Question not found") # Deleted since its owner was cached
     return {"message": "Question deleted successfully"}
 
-# TODO: Add endpoints for managing options under a question if needed for advanced editing
\ No newline at end of file
+@router.post("/questions/{question_id}/regrade", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED, summary="Regrade Question Answers")
+def regrade_question(
+    question_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Recomputes the grade of every submitted answer to a question against its current answer key.
+    Runs in the background; poll `GET /api/v1/jobs/{job_id}` for progress.
+    """
+    require_owner(db, "question", question_id, current_educator, "Not authorized to regrade this question")
+
+    return regrade.schedule_regrade(background_tasks, question_id, owner_id=current_educator.id)
+
+# --- Option Endpoints ---
+# Changing options changes the answer key, so each write queues a regrade of the
+# question's answers and returns the job ID in the `X-Regrade-Job` header.
+@router.post("/questions/{question_id}/options", response_model=OptionWithCorrectnessOut, status_code=status.HTTP_201_CREATED, summary="Add Option to Question")
+def create_option_for_question(
+    question_id: int,
+    option: OptionCreate,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Adds an answer option to a question. Only accessible by the owning quiz's educator.
+    """
+    require_owner(db, "question", question_id, current_educator, "Not authorized to add options to this question")
+
+    db_option = crud_question.create_option(db=db, option=option, question_id=question_id)
+    response.headers["X-Regrade-Job"] = regrade.schedule_regrade(background_tasks, question_id, owner_id=current_educator.id).id
+    return db_option
+
+@router.put("/options/{option_id}", response_model=OptionWithCorrectnessOut, summary="Update Option")
+def update_option(
+    option_id: int,
+    option_in: OptionUpdate,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Updates an answer option, e.g. to change which option is correct. Only accessible by the owning quiz's educator.
+    """
+    require_owner(db, "option", option_id, current_educator, "Not authorized to update this option")
+    db_option = crud_question.get_option(db, option_id=option_id)
+    if db_option is None: # Deleted since its owner was cached
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Option not found")
+
+    db_option = crud_question.update_option(db=db, db_option=db_option, option_in=option_in)
+    if "is_correct" in option_in.model_fields_set:
+        job = regrade.schedule_regrade(background_tasks, db_option.question_id, owner_id=current_educator.id)
+        response.headers["X-Regrade-Job"] = job.id
+    return db_option
+
+@router.delete("/options/{option_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete Option")
+def delete_option(
+    option_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_educator: DBUser = Depends(get_current_educator)
+):
+    """
+    Deletes an answer option. Only accessible by the owning quiz's educator.
+    """
+    require_owner(db, "option", option_id, current_educator, "Not authorized to delete this option")
+    db_option = crud_question.get_option(db, option_id=option_id)
+    if db_option is None: # Deleted since its owner was cached
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Option not found")
+
+    question_id = db_option.question_id
+    if not crud_question.delete_option(db=db, option_id=option_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Option not found") # Deleted since its owner was cached
+    job = regrade.schedule_regrade(background_tasks, question_id, owner_id=current_educator.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT, headers={"X-Regrade-Job": job.id}, background=background_tasks)
@@ -0,0 +1,27 @@
+# backend/app/api/endpoints/search.py
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.search import SearchResults
+from app.services import search
+
+router = APIRouter()
+
+@router.get("/search", response_model=SearchResults, summary="Search Courses, Lessons and Questions")
+def search_content(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[Literal["course", "lesson", "question"]]] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search across course titles/descriptions, lesson titles/text and quiz questions.
+    Results are ordered by relevance and include highlighted titles and snippets.
+    Use `types` to restrict the search to some document types.
+    """
+    hits = search.search(db, q, doc_types=types or search.DOC_TYPES, limit=limit, offset=skip)
+    return SearchResults(query=q, hits=hits)
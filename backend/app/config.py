@@ -4,10 +4,76 @@ from typing import Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Optional read replicas, comma-separated URLs. GET requests read from them (see app/database.py)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_STICKY_SECONDS: int = 5 # After a write, the writer reads from the primary this long
+    REPLICA_RETRY_SECONDS: int = 30 # A failed replica is tried again after this long
+    # Extra databases for user_answers and user_progress, as comma-separated name=url pairs.
+    # Users are placed on them by consistent hashing of user_id (see app/services/sharding.py)
+    USER_SHARDS: str = ""
+    SHARD_DIRECTORY_TTL_SECONDS: int = 5 # How long a worker trusts its cached user placements
+    # How long a worker trusts its snapshot of the prerequisite graph and the courses' lesson
+    # lists (see app/services/prerequisite_graph.py); its own writes invalidate it at once
+    PREREQUISITE_GRAPH_TTL_SECONDS: int = 5
+    # How long a worker trusts a compiled answer key (see app/services/grading.py); its own
+    # question and option writes invalidate it at once
+    GRADING_CACHE_TTL_SECONDS: int = 30
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
+    # PEM keys, only needed when ALGORITHM is asymmetric (RS256, ES256, ...)
+    JWT_PRIVATE_KEY: Optional[str] = None
+    JWT_PUBLIC_KEY: Optional[str] = None
+    # Verified access tokens kept in memory per worker (0 disables the cache)
+    JWT_TOKEN_CACHE_SIZE: int = 10_000
+
+    # Answer storage: monthly partitions older than the retention window are moved
+    # to compressed NDJSON files in ANSWER_ARCHIVE_DIR (see app/services/answer_partitions.py)
+    ANSWER_RETENTION_MONTHS: int = 24
+    ANSWER_ARCHIVE_DIR: str = "archive/user_answers"
+
+    # Batch reads: IDs per `?ids=` lookup, and sub-requests per POST /api/v1/batch
+    BATCH_MAX_IDS: int = 100
+    BATCH_MAX_REQUESTS: int = 20
+
+    # Course clones with more lessons than this run as a background job (see app/services/course_clone.py)
+    COURSE_CLONE_INLINE_MAX_LESSONS: int = 100
+    # Deleted lessons removed per transaction by the background purge (see app/services/purge.py)
+    PURGE_BATCH_LESSONS: int = 100
+
+    # Live course feed (see app/core/live.py): events kept per course for slow or reconnecting
+    # subscribers, and how often an idle stream gets a keepalive comment
+    LIVE_FEED_BUFFER_EVENTS: int = 256
+    LIVE_FEED_KEEPALIVE_SECONDS: int = 15
+
+    # Lesson texts of at least LESSON_BODY_MIN_BYTES are stored compressed with LESSON_BODY_CODEC
+    # ("zstd" or "zlib"), once per content; decompressed texts are cached up to
+    # LESSON_BODY_CACHE_BYTES per worker (see app/services/lesson_bodies.py)
+    LESSON_BODY_MIN_BYTES: int = 1024
+    LESSON_BODY_CODEC: str = "zstd"
+    LESSON_BODY_CACHE_BYTES: int = 64 * 1024 * 1024
+
+    # Lesson texts rendered to HTML (see app/services/lesson_render.py), cached up to
+    # RENDER_CACHE_MEMORY_BYTES per worker and in RENDER_CACHE_DIR; files not read for
+    # RENDER_CACHE_MAX_AGE_DAYS are removed by its garbage collection
+    RENDER_CACHE_DIR: str = "render_cache"
+    RENDER_CACHE_MEMORY_BYTES: int = 32 * 1024 * 1024
+    RENDER_CACHE_MAX_AGE_DAYS: int = 30
+
+    # Lesson media (see app/services/media.py), stored content-addressed in MEDIA_DIR. With
+    # MEDIA_ACCEL_REDIRECT set (e.g. "/_media"), nginx sends the files: an `internal` location
+    # with that prefix must alias MEDIA_DIR
+    MEDIA_DIR: str = "media"
+    MEDIA_MAX_UPLOAD_BYTES: int = 4 * 1024 ** 3
+    MEDIA_ACCEL_REDIRECT: str = ""
+    MEDIA_CACHE_TTL_SECONDS: int = 30 # How long a worker trusts its cached lesson -> file lookups
+
+    # Lesson completion bitmaps (see app/services/completion.py): the bitmaps of up to
+    # COMPLETION_CACHE_COURSES courses are kept per worker for cohort queries, each trusted for
+    # COMPLETION_CACHE_TTL_SECONDS (writes made by the worker itself show at once)
+    COMPLETION_CACHE_COURSES: int = 32
+    COMPLETION_CACHE_TTL_SECONDS: int = 30
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
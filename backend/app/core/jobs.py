@@ -0,0 +1,76 @@
+# backend/app/core/jobs.py
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+# In-process registry for long-running background jobs (regrades, clones, purges).
+# Jobs run via FastAPI BackgroundTasks in the worker that accepted the request,
+# so status lives in memory; only the most recent jobs are kept.
+MAX_JOBS = 1000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    owner_id: Optional[int] = None
+    status: str = "pending" # pending, running, succeeded, failed
+    total: Optional[int] = None # Units of work, when known up front
+    done: int = 0
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def advance(self, amount: int = 1) -> None:
+        with _lock:
+            self.done += amount
+
+    @property
+    def elapsed_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+    @property
+    def throughput(self) -> Optional[float]:
+        elapsed = self.elapsed_seconds
+        return self.done / elapsed if elapsed else None
+
+
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def create_job(kind: str, owner_id: Optional[int] = None, total: Optional[int] = None) -> Job:
+    job = Job(id=uuid.uuid4().hex, kind=kind, owner_id=owner_id, total=total)
+    with _lock:
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_JOBS:
+            _jobs.popitem(last=False)
+    return job
+
+def get_job(job_id: str) -> Optional[Job]:
+    with _lock:
+        return _jobs.get(job_id)
+
+def run_job(job: Job, func: Callable[..., Optional[Dict[str, Any]]], *args, **kwargs) -> None:
+    """Runs `func(job, *args, **kwargs)` and records its outcome on the job."""
+    job.status = "running"
+    job.started_at = time.time()
+    try:
+        job.result = func(job, *args, **kwargs) or {}
+        job.status = "succeeded"
+    except Exception as e:
+        job.error = f"{type(e).__name__}: {e}"
+        job.status = "failed"
+        logger.exception("Background job %s (%s) failed", job.id, job.kind)
+    finally:
+        job.finished_at = time.time()
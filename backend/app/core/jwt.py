@@ -1,6 +1,11 @@
 # backend/app/core/jwt.py
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from app.config import settings # Our configuration with SECRET_KEY and ALGORITHM
@@ -16,9 +21,15 @@ class TokenData(BaseModel):
     is_educator: Optional[bool] = None
     is_active: Optional[bool] = None
 
-def create_access_token(user: DBUser, expires_delta: Optional[timedelta] = None):
-    """Creates a JWT access token."""
+def create_access_token(user: DBUser, expires_delta: Optional[timedelta] = None, family_id: Optional[str] = None):
+    """
+    Creates a JWT access token. `jti` identifies the token and `fam` the refresh-token family
+    it was issued with, so either can be revoked (see app.core.revocation).
+    """
     to_encode = {
+        "type": "access",
+        "jti": uuid.uuid4().hex,
+        "fam": family_id or uuid.uuid4().hex,
         "sub": user.username,
         "id": user.id,
         "email": user.email,
@@ -31,18 +42,116 @@ def create_access_token(user: DBUser, expires_delta: Optional[timedelta] = None)
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, signing_key(), algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_refresh_token(user: DBUser, family_id: str):
+    """
+    Creates a refresh token. Each refresh rotates it: the presented token is revoked and a new
+    one of the same family is issued. Presenting a rotated token again revokes the whole family.
+    """
+    to_encode = {
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family_id,
+        "sub": user.username,
+        "id": user.id,
+        "exp": datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    }
+    return jwt.encode(to_encode, signing_key(), algorithm=settings.ALGORITHM)
+
+def create_token_pair(user: DBUser, family_id: Optional[str] = None) -> dict:
+    """Access and refresh token of one family (a new family on login)."""
+    family_id = family_id or uuid.uuid4().hex
+    return {
+        "access_token": create_access_token(user, family_id=family_id),
+        "refresh_token": create_refresh_token(user, family_id),
+        "token_type": "bearer",
+    }
+
+# Asymmetric algorithms (RS*, PS*, ES*) sign with JWT_PRIVATE_KEY and verify with
+# JWT_PUBLIC_KEY; HMAC algorithms (HS*) use SECRET_KEY for both.
+def _is_asymmetric() -> bool:
+    return settings.ALGORITHM[:2] in ("RS", "PS", "ES")
+
+def signing_key() -> str:
+    return settings.JWT_PRIVATE_KEY if _is_asymmetric() else settings.SECRET_KEY
+
+def verification_key() -> str:
+    return settings.JWT_PUBLIC_KEY if _is_asymmetric() else settings.SECRET_KEY
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already verified token payloads, keyed by the SHA-256 of the token.
+    An entry is only served until the token's `exp`; after that the token goes through
+    `jwt.decode` again, which rejects it. Failed verifications are never cached.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        if self.maxsize <= 0:
+            return None
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def put(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if self.maxsize <= 0 or not isinstance(expires_at, (int, float)):
+            return # Tokens without an expiry are not cached
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, float(expires_at))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+token_cache = VerifiedTokenCache(settings.JWT_TOKEN_CACHE_SIZE)
+
 def verify_token(token: str, credentials_exception: HTTPException):
-    """Verifies a JWT token and returns the payload."""
+    """Verifies a JWT token and returns the payload. Repeated tokens are served from `token_cache`."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return dict(payload) # Callers get their own copy of the cached payload
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, verification_key(), algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub") # 'sub' is the subject, usually username
-        if username is None:
+        if username is None or payload.get("type", "access") != "access": # Refresh tokens are not bearer tokens
             raise credentials_exception
         # Optionally, extract scopes/roles
         # token_data = TokenData(username=username, scopes=payload.get("scopes", []))
+        token_cache.put(token, dict(payload))
         return payload # Return full payload for now, can be refined to TokenData
     except JWTError:
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+def verify_refresh_token(token: str, credentials_exception: HTTPException):
+    """Verifies a refresh token and returns the payload (not cached: used once per rotation)."""
+    try:
+        payload = jwt.decode(token, verification_key(), algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    if payload.get("type") != "refresh" or not payload.get("jti") or not payload.get("fam"):
+        raise credentials_exception
+    return payload
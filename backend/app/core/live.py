@@ -0,0 +1,143 @@
+# backend/app/core/live.py
+"""
+In-process pub/sub for live course activity (GET /api/v1/courses/{id}/live, Server-Sent Events).
+
+Built for thousands of subscribers per topic in one worker:
+
+  * an event is encoded to its SSE frame once, however many subscribers get it;
+  * each topic keeps the last LIVE_FEED_BUFFER_EVENTS frames in a ring shared by all its
+    subscribers. A subscriber is just a cursor (the last event ID it sent); publishing appends
+    to the ring and resolves one future that every idle subscriber awaits, so the cost of a
+    publish does not grow with subscribers that are busy writing;
+  * a subscriber that catches up sends everything after its cursor as one chunk;
+  * backpressure: a subscriber whose cursor falls off the end of the ring (its client reads
+    slower than events arrive) is dropped. It gets a final `dropped` event and its stream ends;
+    the client reconnects and reloads. Nothing is queued per subscriber, so a stuck client
+    costs no broker memory.
+
+Publishers may run in any thread (sync endpoints run in the threadpool): `publish` hands the
+frame to the event loop with one `call_soon_threadsafe`. Topics without subscribers cost
+nothing. Like app/core/jobs.py this is per worker: subscribers only see events published by
+the worker they are connected to.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Hashable, Optional
+
+from app.config import settings
+
+
+class _Topic:
+    __slots__ = ("frames", "evicted", "waiter", "subscribers")
+
+    def __init__(self, size: int, evicted: int):
+        self.frames: "deque[tuple[int, bytes]]" = deque(maxlen=size) # (event ID, encoded frame)
+        # Events up to this ID are not in the ring: they fell off it, or were published before the topic existed
+        self.evicted = evicted
+        self.waiter: Optional[asyncio.Future] = None # Resolved by the next publish
+        self.subscribers = 0
+
+
+class Broker:
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._topics: Dict[Hashable, _Topic] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_id = 0 # Event IDs are unique in the process, across topics
+        self._ids_lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    def subscriber_count(self, key: Hashable) -> int:
+        topic = self._topics.get(key)
+        return topic.subscribers if topic else 0
+
+    # --- Publishing (any thread) ---
+
+    def publish(self, key: Hashable, event: str, data: Dict[str, Any]) -> None:
+        """Sends an event to the topic's subscribers. Call after the change is committed."""
+        loop = self._loop
+        if key not in self._topics or loop is None or loop.is_closed():
+            return # Nobody is listening
+        with self._ids_lock:
+            self._last_id += 1
+            event_id = self._last_id
+        frame = f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n".encode()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(key, event_id, frame)
+        else:
+            loop.call_soon_threadsafe(self._deliver, key, event_id, frame)
+
+    def _deliver(self, key: Hashable, event_id: int, frame: bytes) -> None:
+        topic = self._topics.get(key)
+        if topic is None:
+            return
+        if len(topic.frames) == topic.frames.maxlen:
+            topic.evicted = topic.frames[0][0]
+        topic.frames.append((event_id, frame))
+        self.published += 1
+        waiter, topic.waiter = topic.waiter, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    # --- Subscribing (event loop) ---
+
+    async def stream(self, key: Hashable, last_event_id: Optional[int] = None,
+                     keepalive_seconds: Optional[float] = None) -> AsyncIterator[bytes]:
+        """
+        SSE chunks for one subscriber until it disconnects or is dropped. With `last_event_id`
+        (the Last-Event-ID header of a reconnect) the events after it are replayed if still in
+        the ring; otherwise the client is told to reload with a `reset` event.
+        """
+        self._loop = asyncio.get_running_loop()
+        keepalive_seconds = keepalive_seconds or settings.LIVE_FEED_KEEPALIVE_SECONDS
+        topic = self._topics.get(key)
+        if topic is None:
+            topic = self._topics[key] = _Topic(self.buffer_size, evicted=self._last_id)
+        topic.subscribers += 1
+        try:
+            newest = topic.frames[-1][0] if topic.frames else topic.evicted
+            if last_event_id is None:
+                cursor = newest
+                yield b"retry: 3000\n\n" # Reconnect delay for EventSource clients
+            elif last_event_id < topic.evicted or last_event_id > self._last_id:
+                # Missed events (or the worker restarted since): reload, then follow the feed
+                cursor = newest
+                yield b"event: reset\ndata: {}\n\n"
+            else:
+                cursor = last_event_id
+            while True:
+                if cursor < topic.evicted:
+                    self.dropped += 1
+                    yield b"event: dropped\ndata: {}\n\n"
+                    return
+                if topic.frames and topic.frames[-1][0] > cursor:
+                    # Walk back from the newest frame: a subscriber that keeps up needs only one
+                    chunk = [frame for _, frame in itertools.takewhile(lambda entry: entry[0] > cursor, reversed(topic.frames))]
+                    cursor = topic.frames[-1][0]
+                    yield b"".join(reversed(chunk))
+                    continue
+                if topic.waiter is None:
+                    topic.waiter = self._loop.create_future()
+                # asyncio.wait does not cancel the shared future on timeout
+                done, _ = await asyncio.wait((topic.waiter,), timeout=keepalive_seconds)
+                if not done:
+                    yield b": keepalive\n\n" # Keeps proxies from closing an idle stream
+        finally:
+            topic.subscribers -= 1
+            if topic.subscribers == 0 and self._topics.get(key) is topic:
+                del self._topics[key]
+
+
+broker = Broker(settings.LIVE_FEED_BUFFER_EVENTS)
+
+
+def course_topic(course_id: int) -> tuple:
+    return ("course", course_id)
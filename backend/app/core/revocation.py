@@ -0,0 +1,182 @@
+# backend/app/core/revocation.py
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.revoked_token import RevokedToken
+
+# Every authenticated request checks its token ID (jti) and token family (fam) against the
+# revoked_tokens table. To keep that off the database, each worker holds a Bloom filter of all
+# revoked IDs: a negative answer is exact, and only a "maybe" (a revoked token, or a rare false
+# positive) is confirmed with a query. Workers pick up rows revoked elsewhere by reloading
+# incrementally (revoked_at past the last one seen, minus an overlap for transactions that
+# committed late) at most every REFRESH_SECONDS, and rebuild the filter from the unexpired
+# rows every REBUILD_SECONDS or when it outgrows its capacity. A rebuild reads the rows without
+# holding the lock and swaps the new filter in, so other requests are not held up meanwhile.
+
+REFRESH_SECONDS = 5
+RELOAD_OVERLAP = timedelta(minutes=1)
+REBUILD_SECONDS = 3600
+INITIAL_CAPACITY = 100_000
+ERROR_RATE = 0.0001
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings, using double hashing of one BLAKE2b digest."""
+
+    def __init__(self, capacity: int, error_rate: float = ERROR_RATE):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)) # Bits
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        if item in self:
+            return # Reloads overlap, so items arrive more than once
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    def __init__(self):
+        self._filter: Optional[BloomFilter] = None
+        self._last_seen: Optional[datetime] = None # Latest revoked_at loaded
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+        self._rebuilding: Optional[List[str]] = None # While a rebuild runs: IDs revoked by this worker meanwhile
+        self._lock = threading.Lock()
+
+    # --- Loading ---
+
+    def _build(self, db: Session) -> Tuple[BloomFilter, Optional[datetime]]:
+        """A filter of the unexpired revocations, and the latest revoked_at among them."""
+        unexpired = RevokedToken.expires_at > datetime.now(timezone.utc)
+        count = db.execute(select(func.count(RevokedToken.id)).where(unexpired)).scalar()
+        bloom = BloomFilter(max(INITIAL_CAPACITY, 2 * count))
+        last_seen = None
+        rows = db.execute(select(RevokedToken.jti, RevokedToken.revoked_at).where(unexpired).execution_options(yield_per=10_000))
+        for row in rows:
+            bloom.add(row.jti)
+            if last_seen is None or row.revoked_at > last_seen:
+                last_seen = row.revoked_at
+        return bloom, last_seen
+
+    def _rebuild(self, db: Session) -> None:
+        """
+        Builds a new filter without holding the lock, so requests keep checking against the
+        current one meanwhile, then swaps it in. Only the thread that set `_rebuilding` calls this.
+        """
+        try:
+            bloom, last_seen = self._build(db)
+        except BaseException:
+            with self._lock:
+                self._rebuilding = None
+            raise
+        with self._lock:
+            for jti in self._rebuilding: # Revoked here after the rows were read, maybe not committed yet
+                bloom.add(jti)
+            self._rebuilding = None
+            self._filter, self._last_seen = bloom, last_seen
+            self._built_at = time.monotonic()
+            self._load_new(db) # Rows committed elsewhere while the filter was being built
+
+    def _load_new(self, db: Session) -> None:
+        query = select(RevokedToken.jti, RevokedToken.revoked_at)
+        if self._last_seen is not None:
+            query = query.where(RevokedToken.revoked_at > self._last_seen - RELOAD_OVERLAP)
+        for row in db.execute(query).all():
+            self._filter.add(row.jti)
+            if self._last_seen is None or row.revoked_at > self._last_seen:
+                self._last_seen = row.revoked_at
+        self._refreshed_at = time.monotonic()
+
+    def _sync(self, db: Session) -> None:
+        now = time.monotonic()
+        if self._filter is not None and now - self._refreshed_at < REFRESH_SECONDS:
+            return
+        with self._lock:
+            if self._filter is None: # First use: there is nothing to check against until it is loaded
+                self._filter, self._last_seen = self._build(db)
+                self._built_at = self._refreshed_at = time.monotonic()
+                return
+            rebuild = self._rebuilding is None and now - self._built_at >= REBUILD_SECONDS
+            if not rebuild and now - self._refreshed_at >= REFRESH_SECONDS:
+                self._load_new(db)
+                # Keep the false-positive rate at ERROR_RATE
+                rebuild = self._rebuilding is None and self._filter.count > self._filter.capacity
+            if rebuild:
+                self._rebuilding = []
+        if rebuild:
+            self._rebuild(db)
+
+    # --- Queries ---
+
+    def is_revoked(self, db: Session, token_ids: Iterable[Optional[str]]) -> bool:
+        """True if any of the IDs (a token's jti and its family) has been revoked."""
+        self._sync(db)
+        candidates = [token_id for token_id in token_ids if token_id and token_id in self._filter]
+        if not candidates:
+            return False # No query on the common path
+        return db.execute(
+            select(RevokedToken.id).where(
+                RevokedToken.jti.in_(candidates), RevokedToken.expires_at > datetime.now(timezone.utc)
+            ).limit(1)
+        ).first() is not None
+
+    def revoke(self, db: Session, jti: str, token_type: str, expires_at: datetime, user_id: Optional[int] = None) -> bool:
+        """
+        Records a revocation; the caller commits. Takes effect in this worker at once, in the others
+        within REFRESH_SECONDS. Returns False if the ID was already revoked, also by a concurrent
+        transaction: a single INSERT ... ON CONFLICT DO NOTHING decides, so exactly one caller wins.
+        """
+        inserted = db.execute(
+            dialect_insert(db, RevokedToken.__table__)
+            .values(jti=jti, token_type=token_type, user_id=user_id, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            .returning(RevokedToken.id)
+        ).first() is not None
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+            if self._rebuilding is not None:
+                self._rebuilding.append(jti)
+        return inserted
+
+
+revocation_list = RevocationList()
+
+def purge_expired(db: Session) -> int:
+    """Deletes revocations of tokens that have expired anyway; returns the number of rows removed."""
+    result = db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    # Run from cron, e.g. `python -m app.core.revocation` in backend/
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Purged {purge_expired(session)} expired revocations")
+    finally:
+        session.close()
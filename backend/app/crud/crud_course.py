@@ -1,36 +1,54 @@
 # backend/app/crud/crud_course.py
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from app.models.course import Course
 from app.schemas.course import CourseCreate, CourseUpdate
+from app.services import search, prerequisite_graph, ownership, media, purge, fieldsets
+from app.crud import crud_prerequisite, writes
 
 def get_course(db: Session, course_id: int):
     return db.query(Course).filter(Course.id == course_id).first()
 
 def get_courses(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Course).offset(skip).limit(limit).all()
+    return db.query(Course).order_by(Course.id).offset(skip).limit(limit).all()
+
+def get_courses_by_ids(db: Session, course_ids: List[int]):
+    # Ordered by ID; missing (or deleted) IDs are left out
+    return db.query(Course).filter(Course.id.in_(course_ids)).order_by(Course.id).all()
+
+def get_course_fields(db: Session, fieldset: fieldsets.FieldSet, skip: int = 0, limit: int = 100,
+                      course_ids: Optional[List[int]] = None):
+    # Same rows as get_courses (get_courses_by_ids with `course_ids`), but only the requested
+    # columns (see app/services/fieldsets.py)
+    if course_ids is not None:
+        return fieldsets.fetch(db, fieldset, where=[Course.id.in_(course_ids)], order_by=[Course.id])
+    return fieldsets.fetch(db, fieldset, order_by=[Course.id], skip=skip, limit=limit)
 
 def get_courses_by_educator(db: Session, educator_id: int, skip: int = 0, limit: int = 100):
     return db.query(Course).filter(Course.educator_id == educator_id).offset(skip).limit(limit).all()
 
 def create_course(db: Session, course: CourseCreate, educator_id: int):
-    db_course = Course(**course.model_dump(), educator_id=educator_id)
-    db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    with writes.transaction(db):
+        db_course = writes.insert_returning(db, Course, {**course.model_dump(), "educator_id": educator_id})
+        search.index_course(db, db_course)
     return db_course
 
 def update_course(db: Session, db_course: Course, course_in: CourseUpdate):
-    for key, value in course_in.model_dump(exclude_unset=True).items():
-        setattr(db_course, key, value)
-    db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
+    with writes.transaction(db):
+        writes.update_returning(db, db_course, course_in.model_dump(exclude_unset=True))
+        search.index_course(db, db_course)
     return db_course
 
 def delete_course(db: Session, course_id: int):
-    db_course = db.query(Course).filter(Course.id == course_id).first()
-    if db_course:
-        db.delete(db_course)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    # Only marks the course and its subtree; app.services.purge removes the rows in the background
+    with writes.transaction(db):
+        lesson_ids = purge.soft_delete_course(db, course_id)
+        if lesson_ids is None:
+            return False
+        search.remove_course(db, course_id)
+        crud_prerequisite.delete_prerequisites_for_nodes(db, "course", [course_id])
+        crud_prerequisite.delete_prerequisites_for_nodes(db, "lesson", lesson_ids)
+    prerequisite_graph.invalidate() # Drops edges and cached lesson lists
+    ownership.invalidate_course(course_id) # The course and everything under it
+    media.invalidate(*lesson_ids)
+    return True
@@ -2,32 +2,76 @@
 from sqlalchemy.orm import Session
 from app.models.lesson import Lesson
 from app.schemas.lesson import LessonCreate, LessonUpdate
+from typing import List, Optional
+from app.services import search, prerequisite_graph, ownership, lesson_bodies, lesson_order, lesson_render, media, purge
+from app.crud import crud_prerequisite, writes
 
 def get_lesson(db: Session, lesson_id: int):
     return db.query(Lesson).filter(Lesson.id == lesson_id).first()
 
 def get_lessons_by_course(db: Session, course_id: int, skip: int = 0, limit: int = 100):
-    return db.query(Lesson).filter(Lesson.course_id == course_id).order_by(Lesson.order).offset(skip).limit(limit).all()
+    lessons = db.query(Lesson).filter(Lesson.course_id == course_id).order_by(Lesson.order, Lesson.id).offset(skip).limit(limit).all()
+    lesson_bodies.prefetch(db, lessons) # Stored texts of the whole page in one query
+    return lessons
+
+def get_lessons_by_ids(db: Session, lesson_ids: List[int]):
+    # Ordered by ID; missing (or deleted) IDs are left out
+    lessons = db.query(Lesson).filter(Lesson.id.in_(lesson_ids)).order_by(Lesson.id).all()
+    lesson_bodies.prefetch(db, lessons)
+    return lessons
 
 def create_lesson(db: Session, lesson: LessonCreate):
-    db_lesson = Lesson(**lesson.model_dump())
-    db.add(db_lesson)
-    db.commit()
-    db.refresh(db_lesson)
+    values = lesson.model_dump(mode="json", exclude={"after_lesson_id", "before_lesson_id"}) # URLs as plain strings
+    with writes.transaction(db):
+        if values["order"] is None:
+            values["order"] = lesson_order.position(db, lesson.course_id, lesson.after_lesson_id, lesson.before_lesson_id)
+        lesson_render.prerender(values["text_content"]) # Rendered before anyone can read it
+        lesson_bodies.prepare(db, values) # Long texts go to lesson_bodies, compressed
+        db_lesson = writes.insert_returning(db, Lesson, values)
+        search.index_lesson(db, db_lesson)
+    prerequisite_graph.invalidate_course(db_lesson.course_id)
     return db_lesson
 
 def update_lesson(db: Session, db_lesson: Lesson, lesson_in: LessonUpdate):
-    for key, value in lesson_in.model_dump(exclude_unset=True).items():
-        setattr(db_lesson, key, value)
-    db.add(db_lesson)
-    db.commit()
-    db.refresh(db_lesson)
+    update_data = lesson_in.model_dump(mode="json", exclude_unset=True, exclude={"after_lesson_id", "before_lesson_id"})
+    if update_data.get("order", 0) is None:
+        del update_data["order"] # Every lesson has a position
+    with writes.transaction(db):
+        if lesson_in.after_lesson_id is not None or lesson_in.before_lesson_id is not None:
+            update_data["order"] = lesson_order.position(
+                db, db_lesson.course_id, lesson_in.after_lesson_id, lesson_in.before_lesson_id, moving_id=db_lesson.id
+            )
+        lesson_render.prerender(update_data.get("text_content")) # Readers of the edited lesson find it rendered
+        lesson_bodies.prepare(db, update_data)
+        writes.update_returning(db, db_lesson, update_data)
+        search.index_lesson(db, db_lesson)
+    if "order" in update_data: # Ordering feeds the cached learning path
+        prerequisite_graph.invalidate_course(db_lesson.course_id)
+    return db_lesson
+
+def set_lesson_order(db: Session, course_id: int, lesson_ids: List[int]):
+    """Applies a whole new order; `lesson_ids` lists every lesson of the course. Raises ValueError otherwise."""
+    with writes.transaction(db):
+        lesson_order.apply_order(db, course_id, lesson_ids)
+    prerequisite_graph.invalidate_course(course_id)
+
+def set_lesson_media(db: Session, db_lesson: Lesson, sha256: Optional[str], media_type: Optional[str] = None,
+                     size: Optional[int] = None):
+    """Points the lesson at a stored media file, or at none with `sha256=None`."""
+    with writes.transaction(db):
+        writes.update_returning(db, db_lesson, {"media_sha256": sha256, "media_type": media_type, "media_size": size})
+    media.invalidate(db_lesson.id)
     return db_lesson
 
 def delete_lesson(db: Session, lesson_id: int):
-    db_lesson = db.query(Lesson).filter(Lesson.id == lesson_id).first()
-    if db_lesson:
-        db.delete(db_lesson)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    # Only marks the lesson and its quiz; app.services.purge removes the rows in the background
+    with writes.transaction(db):
+        course_id = purge.soft_delete_lesson(db, lesson_id)
+        if course_id is None:
+            return False
+        search.remove_lesson(db, lesson_id)
+        crud_prerequisite.delete_prerequisites_for_nodes(db, "lesson", [lesson_id])
+    prerequisite_graph.invalidate() # Drops edges and cached lesson lists
+    ownership.invalidate_course(course_id) # Also drops the lesson's quiz, questions and options
+    media.invalidate(lesson_id)
+    return True
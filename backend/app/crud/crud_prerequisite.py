@@ -0,0 +1,48 @@
+# backend/app/crud/crud_prerequisite.py
+from typing import Iterable
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.models.prerequisite import Prerequisite
+from app.schemas.prerequisite import PrerequisiteCreate
+from app.services import prerequisite_graph
+from app.crud import writes
+
+def get_prerequisite(db: Session, prerequisite_id: int):
+    return db.query(Prerequisite).filter(Prerequisite.id == prerequisite_id).first()
+
+def get_prerequisites_for_node(db: Session, node_type: str, node_id: int):
+    return db.query(Prerequisite).filter(
+        Prerequisite.node_type == node_type, Prerequisite.node_id == node_id
+    ).all()
+
+def create_prerequisite(db: Session, prerequisite: PrerequisiteCreate):
+    source = prerequisite_graph.source_node(prerequisite.node_type, prerequisite.node_id)
+    target = prerequisite_graph.target_node(prerequisite.required_type, prerequisite.required_id)
+    with writes.transaction(db):
+        # The cached graph may miss edges written by other workers or concurrent requests: check
+        # against the edges read under the lock, which makes edge creations take turns
+        writes.lock_writers(db, Prerequisite)
+        if prerequisite_graph.PrerequisiteGraph.load(db).would_create_cycle(db, source, target):
+            raise ValueError("Prerequisite would create a cycle")
+        db_prerequisite = writes.insert_returning(db, Prerequisite, prerequisite.model_dump())
+    prerequisite_graph.invalidate()
+    return db_prerequisite
+
+def delete_prerequisite(db: Session, prerequisite_id: int):
+    db_prerequisite = db.query(Prerequisite).filter(Prerequisite.id == prerequisite_id).first()
+    if db_prerequisite:
+        db.delete(db_prerequisite)
+        db.commit()
+        prerequisite_graph.invalidate()
+        return True
+    return False
+
+def delete_prerequisites_for_nodes(db: Session, node_type: str, node_ids: Iterable[int]):
+    """Removes every edge from or to the given nodes. Runs in the caller's transaction."""
+    node_ids = list(node_ids)
+    if not node_ids:
+        return
+    db.query(Prerequisite).filter(or_(
+        and_(Prerequisite.node_type == node_type, Prerequisite.node_id.in_(node_ids)),
+        and_(Prerequisite.required_type == node_type, Prerequisite.required_id.in_(node_ids)),
+    )).delete(synchronize_session=False)
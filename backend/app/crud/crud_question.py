@@ -1,8 +1,12 @@
 # backend/app/crud/crud_question.py
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models.question import Question
 from app.models.option import Option
 from app.schemas.question import QuestionCreate, QuestionUpdate, OptionCreate
+from app.schemas.option import OptionUpdate
+from app.services import search, grading, ownership
+from app.crud import crud_user_answer, writes
 
 def get_question(db: Session, question_id: int):
     return db.query(Question).filter(Question.id == question_id).first()
@@ -14,60 +18,72 @@ def create_question(db: Session, question: QuestionCreate):
     question_dict = question.model_dump()
     options_data = question_dict.pop("options", []) # Extract options if present
 
-    db_question = Question(**question_dict)
-    db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    with writes.transaction(db):
+        db_question = writes.insert_returning(db, Question, question_dict)
 
-    # Add options if provided (only for MCQ typically)
-    if db_question.question_type == "MCQ" and options_data:
-        for opt_data in options_data:
-            db_option = Option(question_id=db_question.id, **opt_data)
-            db.add(db_option)
-        db.commit()
-        db.refresh(db_question) # Refresh again to load new options relationship
+        # Add options if provided (only for MCQ typically)
+        db_options = []
+        if db_question.question_type == "MCQ" and options_data:
+            db_options = writes.insert_many_returning(db, Option, [
+                {"question_id": db_question.id, **opt_data} for opt_data in options_data
+            ])
+        set_committed_value(db_question, "options", db_options) # The question's options are exactly these
 
+        search.index_question(db, db_question)
     return db_question
 
 def update_question(db: Session, db_question: Question, question_in: QuestionUpdate):
-    for key, value in question_in.model_dump(exclude_unset=True).items():
-        setattr(db_question, key, value)
-    db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    with writes.transaction(db):
+        writes.update_returning(db, db_question, question_in.model_dump(exclude_unset=True))
+        search.index_question(db, db_question)
+    grading.invalidate(db_question.id)
     return db_question
 
 def delete_question(db: Session, question_id: int):
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if db_question:
+        owner = ownership.resolve(db, "question", question_id)
+        search.remove_question(db, question_id)
+        crud_user_answer.delete_answers_for_questions(db, [question_id]) # Sharded, not cascaded
         db.delete(db_question)
         db.commit()
+        grading.invalidate(question_id)
+        if owner:
+            ownership.invalidate_course(owner.course_id) # Also drops the question's options
         return True
     return False
 
 # CRUD for Options (can be separate or part of question CRUD)
 def create_option(db: Session, option: OptionCreate, question_id: int):
-    db_option = Option(**option.model_dump(), question_id=question_id)
-    db.add(db_option)
-    db.commit()
-    db.refresh(db_option)
+    with writes.transaction(db):
+        db_option = writes.insert_returning(db, Option, {**option.model_dump(), "question_id": question_id})
+        db_question = get_question(db, question_id) # Loaded after the insert, so its options include the new one
+        set_committed_value(db_option, "question", db_question)
+        search.index_question(db, db_question)
+    grading.invalidate(question_id)
     return db_option
 
 def get_option(db: Session, option_id: int):
     return db.query(Option).filter(Option.id == option_id).first()
 
-def update_option(db: Session, db_option: Option, option_in: OptionCreate): # Re-use OptionCreate for update if no dedicated update schema
-    for key, value in option_in.model_dump(exclude_unset=True).items():
-        setattr(db_option, key, value)
-    db.add(db_option)
-    db.commit()
-    db.refresh(db_option)
+def update_option(db: Session, db_option: Option, option_in: OptionUpdate):
+    with writes.transaction(db):
+        writes.update_returning(db, db_option, option_in.model_dump(exclude_unset=True))
+        search.index_question(db, db_option.question) # The question's options include this (same) object
+    grading.invalidate(db_option.question_id)
     return db_option
 
 def delete_option(db: Session, option_id: int):
     db_option = db.query(Option).filter(Option.id == option_id).first()
     if db_option:
+        db_question = db_option.question
+        crud_user_answer.clear_selected_option(db, option_id) # Sharded, not nulled by the ORM
         db.delete(db_option)
+        db.flush()
+        db.refresh(db_question)
+        search.index_question(db, db_question)
         db.commit()
+        grading.invalidate(db_question.id)
+        ownership.invalidate("option", option_id)
         return True
     return False
\ No newline at end of file
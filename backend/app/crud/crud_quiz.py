@@ -1,34 +1,42 @@
 # backend/app/crud/crud_quiz.py
+from typing import List
 from sqlalchemy.orm import Session
 from app.models.quiz import Quiz
 from app.schemas.quiz import QuizCreate, QuizUpdate
+from app.services import search, ownership
+from app.crud import crud_user_answer, writes
 
 def get_quiz(db: Session, quiz_id: int):
     return db.query(Quiz).filter(Quiz.id == quiz_id).first()
 
+def get_quizzes_by_ids(db: Session, quiz_ids: List[int]):
+    # Ordered by ID; missing (or deleted) IDs are left out
+    return db.query(Quiz).filter(Quiz.id.in_(quiz_ids)).order_by(Quiz.id).all()
+
 def get_quiz_by_lesson_id(db: Session, lesson_id: int):
     # A lesson should typically only have one quiz
     return db.query(Quiz).filter(Quiz.lesson_id == lesson_id).first()
 
 def create_quiz(db: Session, quiz: QuizCreate):
-    db_quiz = Quiz(**quiz.model_dump())
-    db.add(db_quiz)
-    db.commit()
-    db.refresh(db_quiz)
+    with writes.transaction(db):
+        db_quiz = writes.insert_returning(db, Quiz, quiz.model_dump())
     return db_quiz
 
 def update_quiz(db: Session, db_quiz: Quiz, quiz_in: QuizUpdate):
-    for key, value in quiz_in.model_dump(exclude_unset=True).items():
-        setattr(db_quiz, key, value)
-    db.add(db_quiz)
-    db.commit()
-    db.refresh(db_quiz)
+    with writes.transaction(db):
+        writes.update_returning(db, db_quiz, quiz_in.model_dump(exclude_unset=True))
     return db_quiz
 
 def delete_quiz(db: Session, quiz_id: int):
     db_quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     if db_quiz:
+        owner = ownership.resolve(db, "quiz", quiz_id)
+        question_ids = [question.id for question in db_quiz.questions]
+        search.remove_quiz_questions(db, question_ids)
+        crud_user_answer.delete_answers_for_questions(db, question_ids) # Sharded, not cascaded
         db.delete(db_quiz)
         db.commit()
+        if owner:
+            ownership.invalidate_course(owner.course_id) # Also drops the quiz's questions and options
         return True
     return False
\ No newline at end of file
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash # We'll create this soon!
+from app.services import sharding
+from app.crud import writes
 
 def get_user(db: Session, user_id: int):
     return db.query(User).filter(User.id == user_id).first()
@@ -18,28 +20,28 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
 
 def create_user(db: Session, user: UserCreate):
     hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password,
-        is_educator=user.is_educator
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    with writes.transaction(db):
+        db_user = writes.insert_returning(db, User, dict(
+            username=user.username,
+            email=user.email,
+            hashed_password=hashed_password,
+            is_educator=user.is_educator
+        ))
+        sharding.assign(db, db_user.id) # Placement is hashed from the new ID
     return db_user
 
 def update_user(db: Session, db_user: User, user_in: UserUpdate):
     # Update fields that are provided in user_in
+    values = {}
     for key, value in user_in.model_dump(exclude_unset=True).items():
-        if key == "password" and value:
-            setattr(db_user, "hashed_password", get_password_hash(value))
+        if key == "password":
+            if value:
+                values["hashed_password"] = get_password_hash(value)
         else:
-            setattr(db_user, key, value)
+            values[key] = value
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    with writes.transaction(db):
+        writes.update_returning(db, db_user, values)
     return db_user
 
 def delete_user(db: Session, user_id: int):
@@ -1,53 +1,145 @@
 # backend/app/crud/crud_user_answer.py
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy import delete, insert, literal, select, update
 from sqlalchemy.orm import Session
+from app.database import dialect_insert
 from app.models.user_answer import UserAnswer
+from app.models.user_answer_claim import UserAnswerClaim
 from app.schemas.user_answer import UserAnswerCreate
 from app.models.question import Question # For grading logic
-from app.models.option import Option # For grading logic
+from app.services import answer_partitions, dashboard, grading, review_scheduler, sharding
 
-def get_user_answer(db: Session, user_answer_id: int):
-    return db.query(UserAnswer).filter(UserAnswer.id == user_answer_id).first()
+# Answers live on the user's shard (see app.services.sharding); `db` is always the primary
+# session and each function opens the shard session it needs.
+
+def get_user_answer(db: Session, user_answer_id: int, user_id: int):
+    # IDs are unique per shard only, so the lookup needs the user
+    with sharding.user_session(db, user_id) as shard:
+        return shard.query(UserAnswer).filter(UserAnswer.id == user_answer_id, UserAnswer.user_id == user_id).first()
 
 def get_user_answers_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(UserAnswer).filter(UserAnswer.user_id == user_id).offset(skip).limit(limit).all()
+    # Includes answers in older periods and archives (see get_user_answer_history)
+    return get_user_answer_history(db, user_id, skip=skip, limit=limit)
+
+def get_user_answer_history(
+    db: Session, user_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None,
+    question_id: Optional[int] = None, skip: int = 0, limit: int = 100
+) -> List[UserAnswer]:
+    """
+    A user's answers in chronological order across every storage period: archived files first
+    (they are always older), then the live partitions. Archived rows are returned as transient
+    UserAnswer objects that are not attached to the session.
+    """
+    history = []
+    skipped = 0
+    # A user moved between shards can have archived periods in more than one shard's archive
+    archive_dirs = [sharding.archive_dir(name) for name in sharding.shard_names()]
+    for row in answer_partitions.read_archived_answers(user_id, since, until, question_id, archive_dirs=archive_dirs):
+        if skipped < skip:
+            skipped += 1
+            continue
+        if len(history) == limit:
+            return history
+        history.append(UserAnswer(**row))
+    with sharding.user_session(db, user_id) as shard:
+        rows = answer_partitions.read_live_answers(
+            shard, user_id, since, until, question_id, skip=skip - skipped, limit=limit - len(history)
+        )
+        ids = [row["id"] for row in rows]
+        if ids:
+            # Load the live rows as ORM objects, keeping the chronological order
+            loaded = {answer.id: answer for answer in shard.query(UserAnswer).filter(UserAnswer.id.in_(ids)).all()}
+            history.extend(loaded.get(row["id"]) or UserAnswer(**row) for row in rows)
+    return history
 
 def get_user_answer_for_question(db: Session, user_id: int, question_id: int):
-    return db.query(UserAnswer).filter(
-        UserAnswer.user_id == user_id,
-        UserAnswer.question_id == question_id
-    ).first()
+    with sharding.user_session(db, user_id) as shard:
+        answer = shard.query(UserAnswer).filter(
+            UserAnswer.user_id == user_id,
+            UserAnswer.question_id == question_id
+        ).first()
+    if answer is None:
+        # Not in the hot table: look in older periods and the archive
+        older = get_user_answer_history(db, user_id, question_id=question_id, limit=1)
+        answer = older[0] if older else None
+    return answer
+
+def _insert_answer_once(shard: Session, user_id: int, question_id: int, values: dict) -> Optional[dict]:
+    """
+    Inserts the answer only if the user has not answered the question yet, decided by the
+    unique (user_id, question_id) key of user_answer_claims. Returns the new row, or None.
+    """
+    claims, answers = UserAnswerClaim.__table__, UserAnswer.__table__
+    claim = (
+        dialect_insert(shard, claims).values(user_id=user_id, question_id=question_id)
+        .on_conflict_do_nothing().returning(claims.c.user_id, claims.c.question_id)
+    )
+    if shard.get_bind().dialect.name == "postgresql":
+        # One statement: WITH claimed AS (INSERT claim ... ON CONFLICT DO NOTHING RETURNING ...)
+        # INSERT INTO user_answers SELECT ... FROM claimed RETURNING *
+        claimed = claim.cte("claimed")
+        statement = insert(answers).add_cte(claimed).from_select(
+            ["user_id", "question_id", *values],
+            select(claimed.c.user_id, claimed.c.question_id,
+                   *[literal(value, answers.c[key].type) for key, value in values.items()]),
+        ).returning(*answers.c)
+        return shard.execute(statement).mappings().first()
+    # SQLite has no data-modifying CTEs: claim, then insert, in one transaction
+    if shard.execute(claim).first() is None:
+        return None
+    return shard.execute(
+        insert(answers).values(user_id=user_id, question_id=question_id, **values).returning(*answers.c)
+    ).mappings().one()
 
-def create_user_answer(db: Session, user_answer: UserAnswerCreate, user_id: int):
+def create_user_answer(db: Session, user_answer: UserAnswerCreate, user_id: int) -> Optional[UserAnswer]:
+    """Grades and stores an answer. Returns None if the user already answered the question."""
     # Retrieve the question to determine grading logic
     question = db.query(Question).filter(Question.id == user_answer.question_id).first()
     if not question:
         raise ValueError("Question not found")
 
-    is_correct = None # Default to None, indicating not yet graded or irrelevant for type
-
-    if question.question_type == "MCQ":
-        if user_answer.selected_option_id:
-            selected_option = db.query(Option).filter(
-                Option.id == user_answer.selected_option_id,
-                Option.question_id == question.id
-            ).first()
-            if selected_option:
-                is_correct = selected_option.is_correct
-    elif question.question_type == "TrueFalse":
-        # Assuming 'True' or 'False' as text_content
-        # You might need a more sophisticated logic here, e.g., an 'answer' field on Question
-        pass # Placeholder for grading True/False
-    elif question.question_type == "ShortAnswer":
-        pass # Short answer grading is usually manual or regex-based, not automated here
-
-    db_user_answer = UserAnswer(
-        user_id=user_id,
-        question_id=user_answer.question_id,
-        selected_option_id=user_answer.selected_option_id,
-        user_answer_text=user_answer.user_answer_text,
-        is_correct=is_correct # Set based on automatic grading
-    )
-    db.add(db_user_answer)
-    db.commit()
-    db.refresh(db_user_answer)
-    return db_user_answer
\ No newline at end of file
+    # Graded by the grader registered for the question type (see app.services.grading)
+    is_correct = grading.grade_answer(question, user_answer.selected_option_id, user_answer.user_answer_text)
+
+    with sharding.user_session(db, user_id, write=True) as shard:
+        row = _insert_answer_once(shard, user_id, user_answer.question_id, {
+            "selected_option_id": user_answer.selected_option_id,
+            "user_answer_text": user_answer.user_answer_text,
+            "is_correct": is_correct, # Set based on automatic grading
+        })
+        if row is None:
+            shard.rollback()
+            return None
+        dashboard.record_answer(db, shard, user_id, user_answer.question_id, is_correct) # Same shard transaction
+        if shard is not db:
+            shard.commit() # The answer first: the review schedule below is derived from it
+        # The first graded answer also starts the question's review schedule
+        review_scheduler.record_answer(db, user_id, user_answer.question_id, is_correct)
+        db.commit()
+    return UserAnswer(**row) # Built from the RETURNING row: no refresh query
+
+def delete_answers_for_questions(db: Session, question_ids: Iterable[int]):
+    """
+    Removes every user's answers to the given questions from all shards, and subtracts them from
+    the dashboard summaries. The caller commits "main".
+    """
+    question_ids = list(question_ids)
+    if question_ids:
+        question_courses = dashboard.question_courses(db, question_ids) # Before the questions themselves are deleted
+
+        def work(shard: Session):
+            dashboard.forget_answers(shard, question_courses)
+            for answers in answer_partitions.live_answer_tables(shard): # Every live period, not just the hot table
+                shard.execute(delete(answers).where(answers.c.question_id.in_(question_ids)))
+            shard.execute(delete(UserAnswerClaim).where(UserAnswerClaim.question_id.in_(question_ids)))
+
+        sharding.gather(db, work, commit=True)
+
+def clear_selected_option(db: Session, option_id: int):
+    """Detaches answers in every live period from a deleted option on all shards. The caller commits "main"."""
+    def work(shard: Session):
+        for answers in answer_partitions.live_answer_tables(shard):
+            shard.execute(update(answers).where(answers.c.selected_option_id == option_id).values(selected_option_id=None))
+
+    sharding.gather(db, work, commit=True)
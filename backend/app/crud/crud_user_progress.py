@@ -3,52 +3,97 @@ from sqlalchemy.orm import Session
 from app.models.user_progress import UserProgress
 from app.schemas.user_progress import UserProgressUpdate
 from datetime import datetime
-from sqlalchemy import and_
+from typing import Iterable, Set
+from sqlalchemy import and_, case, delete, func, select
+from app.database import dialect_insert
+from app.services import completion, dashboard, sharding
+from app.crud import writes
 
-def get_user_progress(db: Session, user_progress_id: int):
-    return db.query(UserProgress).filter(UserProgress.id == user_progress_id).first()
+# Progress rows live on the user's shard (see app.services.sharding); `db` is always the
+# primary session and each function opens the shard session it needs.
+
+def get_user_progress(db: Session, user_progress_id: int, user_id: int):
+    # IDs are unique per shard only, so the lookup needs the user
+    with sharding.user_session(db, user_id) as shard:
+        return shard.query(UserProgress).filter(
+            UserProgress.id == user_progress_id, UserProgress.user_id == user_id
+        ).first()
 
 def get_user_progress_for_lesson(db: Session, user_id: int, lesson_id: int):
-    return db.query(UserProgress).filter(
-        and_(UserProgress.user_id == user_id, UserProgress.lesson_id == lesson_id)
-    ).first()
+    with sharding.user_session(db, user_id) as shard:
+        return shard.query(UserProgress).filter(
+            and_(UserProgress.user_id == user_id, UserProgress.lesson_id == lesson_id)
+        ).first()
 
 def get_user_progress_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100):
-    return db.query(UserProgress).filter(UserProgress.user_id == user_id).offset(skip).limit(limit).all()
+    with sharding.user_session(db, user_id) as shard:
+        return shard.query(UserProgress).filter(UserProgress.user_id == user_id).order_by(UserProgress.id).offset(skip).limit(limit).all()
+
+def get_completed_lesson_ids(db: Session, user_id: int) -> Set[int]:
+    with sharding.user_session(db, user_id) as shard:
+        return set(shard.execute(
+            select(UserProgress.lesson_id).where(UserProgress.user_id == user_id, UserProgress.is_completed.is_(True))
+        ).scalars())
+
+def get_started_lesson_ids(db: Session, user_id: int) -> Set[int]:
+    with sharding.user_session(db, user_id) as shard:
+        return set(shard.execute(select(UserProgress.lesson_id).where(UserProgress.user_id == user_id)).scalars())
 
 def create_or_update_user_progress(db: Session, user_id: int, lesson_id: int, is_completed: bool = False):
-    db_progress = get_user_progress_for_lesson(db, user_id, lesson_id)
-    if db_progress:
-        # Update existing progress
-        db_progress.is_completed = is_completed
-        if is_completed and not db_progress.completed_at: # Set completion time only if just completed
-            db_progress.completed_at = datetime.now()
-        elif not is_completed: # If marked incomplete, clear completed_at
-            db_progress.completed_at = None
-    else:
-        # Create new progress
-        db_progress = UserProgress(
+    """
+    One INSERT ... ON CONFLICT (user_id, lesson_id) DO UPDATE ... RETURNING, so concurrent
+    double-submits end in the same single row. A repeated completion keeps the first completed_at.
+    The course's completion bitmap and dashboard summary are updated in the same transaction.
+    """
+    progress = UserProgress.__table__
+    with sharding.user_session(db, user_id, write=True) as shard:
+        course_id = dashboard.lock_course(db, shard, user_id, lesson_id)
+        statement = dialect_insert(shard, progress).values(
             user_id=user_id,
             lesson_id=lesson_id,
             is_completed=is_completed,
             completed_at=datetime.now() if is_completed else None
         )
-        db.add(db_progress)
-
-    db.commit()
-    db.refresh(db_progress)
-    return db_progress
+        statement = statement.on_conflict_do_update(
+            index_elements=[progress.c.user_id, progress.c.lesson_id],
+            set_={
+                "is_completed": statement.excluded.is_completed,
+                # Set completion time only if just completed; marking incomplete clears it
+                "completed_at": case(
+                    (statement.excluded.is_completed, func.coalesce(progress.c.completed_at, statement.excluded.completed_at)),
+                    else_=None,
+                ),
+                "last_accessed_at": func.now(), # Column onupdate defaults do not apply to ON CONFLICT
+            },
+        ).returning(*progress.c)
+        row = shard.execute(statement).mappings().one()
+        completed = completion.record_progress(db, shard, user_id, course_id, lesson_id, is_completed)
+        dashboard.record_progress(shard, user_id, course_id, completed)
+        shard.commit()
+    completion.remember(user_id, course_id, completed)
+    return UserProgress(**row) # Built from the RETURNING row: no refresh query
 
 def update_user_progress(db: Session, db_progress: UserProgress, progress_in: UserProgressUpdate):
     # This function assumes you already have the db_progress object
     # and only allows updating the `is_completed` status.
-    db_progress.is_completed = progress_in.is_completed
+    values = {"is_completed": progress_in.is_completed}
     if progress_in.is_completed and not db_progress.completed_at:
-        db_progress.completed_at = datetime.now()
+        values["completed_at"] = datetime.now()
     elif not progress_in.is_completed:
-        db_progress.completed_at = None
+        values["completed_at"] = None
+
+    with sharding.user_session(db, db_progress.user_id, write=True) as shard, writes.transaction(shard):
+        course_id = dashboard.lock_course(db, shard, db_progress.user_id, db_progress.lesson_id)
+        writes.update_returning(shard, db_progress, values)
+        completed = completion.record_progress(db, shard, db_progress.user_id, course_id, db_progress.lesson_id, progress_in.is_completed)
+        dashboard.record_progress(shard, db_progress.user_id, course_id, completed)
+    completion.remember(db_progress.user_id, course_id, completed)
+    return db_progress
 
-    db.add(db_progress)
-    db.commit()
-    db.refresh(db_progress)
-    return db_progress
\ No newline at end of file
+def delete_progress_for_lessons(db: Session, lesson_ids: Iterable[int]):
+    """Removes every user's progress on the given lessons from all shards. The caller commits "main"."""
+    lesson_ids = list(lesson_ids)
+    if lesson_ids:
+        sharding.gather(db, lambda shard: shard.execute(
+            delete(UserProgress).where(UserProgress.lesson_id.in_(lesson_ids)).execution_options(synchronize_session=False)
+        ), commit=True)
\ No newline at end of file
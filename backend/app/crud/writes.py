@@ -0,0 +1,110 @@
+# backend/app/crud/writes.py
+"""
+Shared write path of the crud modules.
+
+* `insert_returning` / `update_returning` write one row and fill the object from the
+  statement's RETURNING clause, instead of a commit followed by `db.refresh` (a second
+  SELECT that, through the joined relationships, reloads the whole course/quiz graph).
+* `transaction` groups writes: nested blocks join the outermost one, which commits once.
+  It commits with `expire_on_commit=False` by default, so serializing the response after
+  the commit does not load every object again.
+* `lock_writers` serializes the writers of a table whose checks read more than the rows they write.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import false, func, inspect, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+_DEPTH = "write_transaction_depth" # Key in Session.info
+
+
+@contextmanager
+def transaction(db: Session, expire_on_commit: bool = False):
+    """
+    Runs the block in one transaction. Inside an enclosing `transaction` it only joins it;
+    the outermost block commits when it ends (or rolls back on an exception).
+    Pass `expire_on_commit=True` when objects must be reloaded after the commit.
+    """
+    depth = db.info.get(_DEPTH, 0)
+    db.info[_DEPTH] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            previous = db.expire_on_commit
+            db.expire_on_commit = expire_on_commit
+            try:
+                db.commit()
+            finally:
+                db.expire_on_commit = previous
+    except BaseException:
+        if depth == 0:
+            db.rollback()
+        raise
+    finally:
+        db.info[_DEPTH] = depth
+
+def in_transaction(db: Session) -> bool:
+    """True inside a `transaction` block: crud functions then leave the commit to it."""
+    return db.info.get(_DEPTH, 0) > 0
+
+
+def lock_writers(db: Session, model: type) -> None:
+    """
+    Holds a lock that other `lock_writers(db, model)` callers wait for, until the current
+    transaction ends. Reads made after it see everything the previous holder committed.
+    PostgreSQL uses a transaction-level advisory lock keyed on the table name; SQLite takes
+    its database write lock with an UPDATE that matches no row.
+    """
+    table = inspect(model).local_table
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(func.hashtext(table.name))))
+    else:
+        column = next(iter(table.primary_key.columns))
+        db.execute(update(table).where(false()).values({column: column}))
+
+def _set_empty_collections(obj: Any, children: Dict[str, List[Any]]) -> None:
+    # A row that was just inserted has no children yet (other than the given ones), so its
+    # collections are set as loaded instead of being lazy loaded during serialization
+    for name, relationship in inspect(type(obj)).relationships.items():
+        if relationship.uselist and relationship.lazy != "noload":
+            set_committed_value(obj, name, children.get(name, []))
+
+def insert_returning(db: Session, model: type, values: Dict[str, Any], children: Optional[Dict[str, List[Any]]] = None):
+    """INSERTs one row and returns it as a persistent object built from RETURNING (server defaults included)."""
+    obj = db.scalars(insert(model).values(**values).returning(model)).unique().one()
+    _set_empty_collections(obj, children or {})
+    return obj
+
+def insert_many_returning(db: Session, model: type, rows: Iterable[Dict[str, Any]]) -> List[Any]:
+    """INSERTs several rows of one table (batched where the driver allows) and returns them in input order."""
+    rows = list(rows)
+    if not rows:
+        return []
+    objs = db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows).unique().all()
+    for obj in objs:
+        _set_empty_collections(obj, {})
+    return objs
+
+def update_returning(db: Session, obj: Any, values: Dict[str, Any]):
+    """
+    UPDATEs the object's row with `values` and refreshes its columns from RETURNING, so
+    `onupdate` columns such as `updated_at` are current without another SELECT.
+    Loaded relationships are kept.
+    """
+    if not values:
+        return obj
+    mapper = inspect(obj).mapper
+    table = mapper.local_table
+    keys = {column: mapper.get_property_by_column(column).key for column in table.columns}
+    statement = (
+        update(table)
+        .where(*[column == getattr(obj, keys[column]) for column in mapper.primary_key])
+        .values({column: values[key] for column, key in keys.items() if key in values})
+        .returning(*table.columns)
+    )
+    row = db.execute(statement).one()
+    for column, value in zip(table.columns, row):
+        set_committed_value(obj, keys[column], value)
+    return obj
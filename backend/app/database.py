@@ -1,5 +1,14 @@
 # backend/app/database.py
-from sqlalchemy import create_engine
+import hashlib
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -23,10 +32,146 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base for declarative models
 Base = declarative_base()
 
-# Dependency to get a database session
-def get_db():
-    db = SessionLocal()
+# INSERT with ON CONFLICT support for the session's database (PostgreSQL or SQLite)
+def dialect_insert(db, table):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upserts are not supported on '{dialect}'")
+
+# --- Read replicas ---
+# With DATABASE_REPLICA_URLS set, `get_db` gives GET/HEAD requests a session on a healthy
+# replica (round robin) and everything else a session on the primary. Two things keep reads
+# on the primary:
+#   * read-your-writes: after a successful write the caller is sticky to the primary for
+#     REPLICA_STICKY_SECONDS, tracked per bearer token in this worker and with a cookie
+#     across workers (set by the middleware in app/main.py through `mark_write`);
+#   * failover: a replica that fails its ping, or fails with a disconnect during a request,
+#     is skipped for REPLICA_RETRY_SECONDS.
+# Locally, two SQLite files (a copy of the database as the "replica") are enough to try it.
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+STICKY_COOKIE = "primary_until"
+_HEALTH_CHECK_SECONDS = 10 # A healthy replica is pinged at most this often
+
+
+class ReplicaPool:
+    def __init__(self, urls: List[str]):
+        self.engines = [create_engine(url, pool_pre_ping=True) for url in urls]
+        self._checked_at = [0.0] * len(self.engines)
+        self._down_until = [0.0] * len(self.engines)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def mark_down(self, engine) -> None:
+        for index, candidate in enumerate(self.engines):
+            if candidate is engine:
+                self._down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+    def _is_healthy(self, index: int) -> bool:
+        now = time.monotonic()
+        if now < self._down_until[index]:
+            return False
+        if now - self._checked_at[index] < _HEALTH_CHECK_SECONDS:
+            return True
+        try:
+            with self.engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except DBAPIError:
+            self._down_until[index] = now + settings.REPLICA_RETRY_SECONDS
+            return False
+        self._checked_at[index] = now
+        return True
+
+    def choose(self):
+        """A healthy replica engine, or None when all are down (reads then go to the primary)."""
+        if not self.engines:
+            return None
+        with self._lock:
+            start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._is_healthy(index):
+                return self.engines[index]
+        return None
+
+replicas = ReplicaPool([url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()])
+
+# Callers (by bearer token) that wrote recently: token hash -> monotonic time the stickiness ends
+_sticky: Dict[str, float] = {}
+_sticky_lock = threading.Lock()
+
+def _caller_key(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization")
+    return hashlib.sha256(authorization.encode()).hexdigest() if authorization else None
+
+def _is_sticky(request: Request) -> bool:
+    try:
+        if float(request.cookies.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _caller_key(request)
+    return key is not None and _sticky.get(key, 0) > time.monotonic()
+
+def mark_write(request: Request, response: Response) -> None:
+    """Makes the caller of a successful write read from the primary for REPLICA_STICKY_SECONDS."""
+    if not replicas.engines:
+        return
+    key = _caller_key(request)
+    if key is not None:
+        now = time.monotonic()
+        with _sticky_lock:
+            if len(_sticky) > 100_000: # Drop expired entries once the map grows
+                for expired in [k for k, until in _sticky.items() if until <= now]:
+                    del _sticky[expired]
+            _sticky[key] = now + settings.REPLICA_STICKY_SECONDS
+    response.set_cookie(
+        STICKY_COOKIE, f"{time.time() + settings.REPLICA_STICKY_SECONDS:.3f}",
+        max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="lax",
+    )
+
+def read_session():
+    """A session on a healthy replica (the primary if none), for read-only work outside requests, e.g. exports."""
+    engine = replicas.choose()
+    if engine is None:
+        return SessionLocal()
+    db = SessionLocal(bind=engine)
+    db.info["replica"] = engine
+    return db
+
+def _run(db):
     try:
         yield db # Provide the session to the FastAPI endpoint
+    except DBAPIError as e:
+        if e.connection_invalidated and db.info.get("replica") is not None:
+            replicas.mark_down(db.info["replica"]) # Fail over for the following requests
+        raise
     finally:
-        db.close() # Ensure the session is closed after the request
\ No newline at end of file
+        db.close() # Ensure the session is closed after the request
+
+# Sub-requests of POST /api/v1/batch carry the batch's session in their scope under this key
+# (see app/api/endpoints/batch.py)
+BATCH_SESSION = "batch_session"
+
+# Dependency to get a database session (a replica for reads when configured)
+def get_db(request: Request):
+    batch_db = request.scope.get(BATCH_SESSION)
+    if batch_db is not None:
+        yield batch_db # Shared by the whole batch, which closes it
+    elif request.method in READ_METHODS and not _is_sticky(request):
+        yield from _run(read_session())
+    else:
+        yield from _run(SessionLocal())
+
+# Dependency for POST endpoints that only read (POST /api/v1/batch): routed like a GET, and
+# not counted as a write by the stickiness middleware
+def get_read_db(request: Request):
+    request.state.read_only = True
+    yield from _run(SessionLocal() if _is_sticky(request) else read_session())
+
+# Dependency for read endpoints that must see the primary, e.g. ones filling process-wide caches
+def get_primary_db():
+    yield from _run(SessionLocal())
\ No newline at end of file
@@ -1,8 +1,11 @@
 # backend/app/main.py
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.endpoints import auth, users, courses, lessons, quizzes, progress # Import your routers
+from app.database import READ_METHODS, mark_write
+from app.services.sharding import ShardMoving
+from app.api.endpoints import auth, users, courses, lessons, quizzes, progress, search, paths, jobs, batch # Import your routers
 
 # Create the FastAPI app instance
 app = FastAPI(
@@ -31,6 +34,25 @@ app.add_middleware(
     allow_headers=["*"], # Allows all headers, including Authorization
 )
 
+# Read-your-writes: after a successful write, the caller's reads go to the primary for a
+# few seconds instead of a read replica (see app/database.py)
+@app.middleware("http")
+async def replica_stickiness(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in READ_METHODS and response.status_code < 400 and not getattr(request.state, "read_only", False):
+        mark_write(request, response)
+    return response
+
+# A user's answers and progress are read-only for a few seconds while the rebalancer
+# moves them to another shard (see app/services/sharding.py)
+@app.exception_handler(ShardMoving)
+async def shard_moving_handler(request: Request, exc: ShardMoving):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Your data is being moved, please retry in a few seconds."},
+        headers={"Retry-After": "5"},
+    )
+
 # Include API routers
 app.include_router(auth.router, prefix="/api/v1", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
@@ -38,6 +60,10 @@ app.include_router(courses.router, prefix="/api/v1/courses", tags=["Courses"])
 app.include_router(lessons.router, prefix="/api/v1/lessons", tags=["Lessons"])
 app.include_router(quizzes.router, prefix="/api/v1/quizzes", tags=["Quizzes"])
 app.include_router(progress.router, prefix="/api/v1/progress", tags=["Progress"])
+app.include_router(search.router, prefix="/api/v1", tags=["Search"])
+app.include_router(paths.router, prefix="/api/v1/paths", tags=["Learning Paths"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
+app.include_router(batch.router, prefix="/api/v1", tags=["Batch"])
 
 @app.get("/api/v1/health", summary="Health Check")
 async def health_check():
@@ -1,11 +1,12 @@
 # backend/app/models/course.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from app.models.user import User # Import User model for relationship
+from app.models.soft_delete import SoftDelete
 
-class Course(Base):
+class Course(SoftDelete, Base):
     __tablename__ = "courses"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -17,7 +18,14 @@ class Course(Base):
 
     # Relationships
     educator = relationship("User", back_populates="courses", lazy="joined")
-    lessons = relationship("Lesson", back_populates="course", cascade="all, delete-orphan", lazy="joined")
+    lessons = relationship("Lesson", back_populates="course", cascade="all, delete-orphan", lazy="joined",
+                           order_by="[Lesson.order, Lesson.id]", passive_deletes=True)
+
+    __table_args__ = (
+        # Deleted courses waiting for the purge
+        Index('ix_courses_deleted_at', 'deleted_at', postgresql_where=text('deleted_at IS NOT NULL'),
+              sqlite_where=text('deleted_at IS NOT NULL')),
+    )
 
     def __repr__(self):
         return f"<Course(id={self.id}, title='{self.title}', educator_id={self.educator_id})>"
\ No newline at end of file
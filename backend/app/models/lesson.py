@@ -1,28 +1,54 @@
 # backend/app/models/lesson.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, BigInteger, Integer, Float, String, Text, ForeignKey, DateTime, Index, text
+from sqlalchemy.orm import object_session, relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from app.models.course import Course # Import Course model for relationship
+from app.models.soft_delete import SoftDelete
 
-class Lesson(Base):
+class Lesson(SoftDelete, Base):
     __tablename__ = "lessons"
 
     id = Column(Integer, primary_key=True, index=True)
-    course_id = Column(Integer, ForeignKey("courses.id"), nullable=False)
+    course_id = Column(Integer, ForeignKey("courses.id", ondelete="CASCADE"), nullable=False)
     title = Column(String, index=True, nullable=False)
     # 'text', 'video', 'quiz', 'link' - allows for future extensibility
     content_type = Column(String, nullable=False)
     content_url = Column(String, nullable=True) # For video links, external articles
-    text_content = Column(Text, nullable=True) # For inline text content
-    order = Column(Integer, default=0, nullable=False) # Order within a course
+    # Inline text content. Long texts are stored compressed in lesson_bodies instead and only
+    # their hash is kept here; read both through `text_content` (see app/services/lesson_bodies.py)
+    inline_text = Column("text_content", Text, nullable=True)
+    body_sha256 = Column(String(64), ForeignKey("lesson_bodies.sha256"), nullable=True)
+    # Self-hosted video: SHA-256 of the file in the media store (see app/services/media.py)
+    media_sha256 = Column(String(64), nullable=True)
+    media_type = Column(String, nullable=True) # e.g. video/mp4
+    media_size = Column(BigInteger, nullable=True) # Bytes
+    # Position within the course, fractional so a lesson can be moved between two neighbours
+    # without renumbering the others (see app/services/lesson_order.py)
+    order = Column(Float, default=0, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     course = relationship("Course", back_populates="lessons", lazy="joined")
-    quizzes = relationship("Quiz", back_populates="lesson", cascade="all, delete-orphan", lazy="joined")
-    user_progress = relationship("UserProgress", back_populates="lesson", cascade="all, delete-orphan", lazy="selectin") # Use selectin for efficient loading of many-to-many-like relationship
+    quizzes = relationship("Quiz", back_populates="lesson", cascade="all, delete-orphan", lazy="joined", passive_deletes=True)
+    # Progress rows may be on another shard: never loaded from here, deleted through crud_user_progress
+    user_progress = relationship("UserProgress", back_populates="lesson", lazy="noload")
+
+    __table_args__ = (
+        Index('ix_lessons_course_id_order', 'course_id', 'order', 'id'),
+        Index('ix_lessons_body_sha256', 'body_sha256'), # Finds unreferenced bodies
+        # Deleted lessons waiting for the purge
+        Index('ix_lessons_deleted_at', 'deleted_at', postgresql_where=text('deleted_at IS NOT NULL'),
+              sqlite_where=text('deleted_at IS NOT NULL')),
+    )
+
+    @property
+    def text_content(self):
+        if self.body_sha256 is None:
+            return self.inline_text
+        from app.services import lesson_bodies # Imports this module
+        return lesson_bodies.load(object_session(self), self.body_sha256)
 
     def __repr__(self):
         return f"<Lesson(id={self.id}, title='{self.title}', course_id={self.course_id})>"
\ No newline at end of file
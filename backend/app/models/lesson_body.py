@@ -0,0 +1,19 @@
+# backend/app/models/lesson_body.py
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LessonBody(Base):
+    __tablename__ = "lesson_bodies"
+
+    # Long lesson texts, stored once per content and compressed (see app/services/lesson_bodies.py).
+    # Rows never change: lessons with the same text, e.g. in cloned courses, share one.
+    sha256 = Column(String(64), primary_key=True) # Of the UTF-8 text
+    codec = Column(String, nullable=False) # 'zstd' or 'zlib'
+    size = Column(Integer, nullable=False) # Bytes of UTF-8 text before compression
+    data = deferred(Column(LargeBinary, nullable=False)) # Compressed text
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<LessonBody(sha256='{self.sha256}', codec='{self.codec}', size={self.size})>"
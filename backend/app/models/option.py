@@ -9,7 +9,7 @@ class Option(Base):
     __tablename__ = "options"
 
     id = Column(Integer, primary_key=True, index=True)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
     option_text = Column(String, nullable=False)
     is_correct = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -17,7 +17,7 @@ class Option(Base):
 
     # Relationships
     question = relationship("Question", back_populates="options", lazy="joined")
-    user_answers = relationship("UserAnswer", back_populates="selected_option", lazy="selectin") # For linking user answers to specific options
+    user_answers = relationship("UserAnswer", back_populates="selected_option", lazy="noload") # Sharded: see crud_user_answer
 
     def __repr__(self):
         return f"<Option(id={self.id}, text='{self.option_text[:30]}...', is_correct={self.is_correct})>"
\ No newline at end of file
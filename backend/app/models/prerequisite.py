@@ -0,0 +1,27 @@
+# backend/app/models/prerequisite.py
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Prerequisite(Base):
+    __tablename__ = "prerequisites"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # The lesson or course that has the requirement ('lesson' or 'course')
+    node_type = Column(String, nullable=False)
+    node_id = Column(Integer, nullable=False)
+    # The lesson or course that must be completed first ('lesson' or 'course')
+    required_type = Column(String, nullable=False)
+    required_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Edges point at either table, so there are no foreign keys; crud_lesson/crud_course
+    # delete the edges of removed lessons and courses.
+    __table_args__ = (
+        UniqueConstraint('node_type', 'node_id', 'required_type', 'required_id', name='uq_prerequisite_edge'),
+        Index('ix_prerequisites_node', 'node_type', 'node_id'),
+        Index('ix_prerequisites_required', 'required_type', 'required_id'),
+    )
+
+    def __repr__(self):
+        return f"<Prerequisite(id={self.id}, {self.node_type}:{self.node_id} requires {self.required_type}:{self.required_id})>"
@@ -1,25 +1,31 @@
 # backend/app/models/question.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from app.models.quiz import Quiz # Import Quiz model
+from app.models.soft_delete import SoftDelete
 
-class Question(Base):
+class Question(SoftDelete, Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
     question_text = Column(Text, nullable=False)
     # e.g., 'MCQ', 'TrueFalse', 'ShortAnswer'
     question_type = Column(String, nullable=False, default="MCQ")
+    # Answer key for non-MCQ graders (see app.services.grading), e.g.
+    # {"correct_answer": true} or {"accepted_answers": ["paris"], "max_edit_distance": 1}
+    answer_spec = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     quiz = relationship("Quiz", back_populates="questions", lazy="joined")
-    options = relationship("Option", back_populates="question", cascade="all, delete-orphan", lazy="joined") # For MCQ
-    user_answers = relationship("UserAnswer", back_populates="question", cascade="all, delete-orphan", lazy="selectin")
+    options = relationship("Option", back_populates="question", cascade="all, delete-orphan", lazy="joined",
+                           passive_deletes=True) # For MCQ
+    # Answers may be on another shard: never loaded from here, deleted through crud_user_answer
+    user_answers = relationship("UserAnswer", back_populates="question", lazy="noload")
 
     def __repr__(self):
         return f"<Question(id={self.id}, text='{self.question_text[:30]}...', quiz_id={self.quiz_id})>"
\ No newline at end of file
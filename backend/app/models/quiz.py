@@ -4,12 +4,13 @@ from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 from app.models.lesson import Lesson # Import Lesson model
+from app.models.soft_delete import SoftDelete
 
-class Quiz(Base):
+class Quiz(SoftDelete, Base):
     __tablename__ = "quizzes"
 
     id = Column(Integer, primary_key=True, index=True)
-    lesson_id = Column(Integer, ForeignKey("lessons.id"), nullable=False, unique=True) # One quiz per lesson
+    lesson_id = Column(Integer, ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False, unique=True) # One quiz per lesson
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -17,7 +18,7 @@ class Quiz(Base):
 
     # Relationships
     lesson = relationship("Lesson", back_populates="quizzes", lazy="joined")
-    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan", lazy="joined")
+    questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan", lazy="joined", passive_deletes=True)
 
     def __repr__(self):
         return f"<Quiz(id={self.id}, title='{self.title}', lesson_id={self.lesson_id})>"
\ No newline at end of file
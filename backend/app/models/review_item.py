@@ -0,0 +1,29 @@
+# backend/app/models/review_item.py
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class ReviewItem(Base):
+    __tablename__ = "review_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    # SM-2 state
+    easiness = Column(Float, nullable=False, default=2.5) # Easiness factor, never below 1.3
+    interval_days = Column(Integer, nullable=False, default=0) # Days until the next review
+    repetitions = Column(Integer, nullable=False, default=0) # Successful reviews in a row
+    lapses = Column(Integer, nullable=False, default=0) # Times the item was forgotten
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    # due_at + interval: past this point an unreviewed item counts as forgotten (see reschedule_overdue)
+    lapse_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    last_reviewed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # One schedule per (user, question); the due queue is served from (user_id, due_at)
+    __table_args__ = (
+        UniqueConstraint('user_id', 'question_id', name='uq_review_items_user_question'),
+        Index('ix_review_items_user_due', 'user_id', 'due_at'),
+    )
+
+    def __repr__(self):
+        return f"<ReviewItem(id={self.id}, user_id={self.user_id}, question_id={self.question_id}, due_at={self.due_at})>"
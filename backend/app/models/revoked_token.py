@@ -0,0 +1,18 @@
+# backend/app/models/revoked_token.py
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # Workers reload their revocation filter incrementally by revoked_at (see app.core.revocation)
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(64), nullable=False, unique=True, index=True) # Token ID, or token family ID for token_type 'family'
+    token_type = Column(String(16), nullable=False) # 'access', 'refresh' or 'family'
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True) # After this the token is rejected anyway
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<RevokedToken(id={self.id}, jti='{self.jti}', token_type='{self.token_type}')>"
@@ -0,0 +1,22 @@
+# backend/app/models/soft_delete.py
+from sqlalchemy import Column, DateTime, event
+from sqlalchemy.orm import Session, with_loader_criteria
+
+# Courses, lessons, quizzes and questions are deleted in two steps (see app/services/purge.py):
+# deleting marks the row and everything under it with `deleted_at`, a background purge
+# removes the rows later. Until then every ORM SELECT, relationship loads included, skips
+# marked rows. Core statements on the tables (`Lesson.__table__`) filter for themselves.
+
+INCLUDE_DELETED = "include_deleted" # Execution option that shows marked rows, e.g. to the purge
+
+
+class SoftDelete:
+    deleted_at = Column(DateTime(timezone=True), nullable=True) # Set when deleted, until the row is purged
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _hide_deleted(execute_state):
+    if execute_state.is_select and not execute_state.execution_options.get(INCLUDE_DELETED, False):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(SoftDelete, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+        )
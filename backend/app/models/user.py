@@ -18,7 +18,7 @@ class User(Base):
 
     # Relationships (define these as we add other models)
     courses = relationship("Course", back_populates="educator", lazy="joined") # Educator's courses
-    progress = relationship("UserProgress", back_populates="user", lazy="joined") # Student's progress
+    progress = relationship("UserProgress", back_populates="user", lazy="noload") # Student's progress, on the user's shard: use crud_user_progress
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}', is_educator={self.is_educator})>"
\ No newline at end of file
@@ -1,5 +1,5 @@
 # backend/app/models/user_answer.py
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -12,16 +12,21 @@ class UserAnswer(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False, index=True)
     selected_option_id = Column(Integer, ForeignKey("options.id"), nullable=True) # For MCQ answers
     user_answer_text = Column(Text, nullable=True) # For ShortAnswer or other text-based answers
     is_correct = Column(Boolean, nullable=True) # True/False/None (if not yet graded)
-    answered_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key: on PostgreSQL the table is range-partitioned by month on answered_at
+    answered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
 
-    # Relationships
-    user = relationship("User", lazy="joined")
-    question = relationship("Question", back_populates="user_answers", lazy="joined")
-    selected_option = relationship("Option", back_populates="user_answers", lazy="joined")
+    __table_args__ = (
+        Index('ix_user_answers_user_id_answered_at', 'user_id', 'answered_at'),
+    )
+
+    # Relationships. Loaded only on access: answers may live on a shard without these tables
+    user = relationship("User", lazy="select")
+    question = relationship("Question", back_populates="user_answers", lazy="select")
+    selected_option = relationship("Option", back_populates="user_answers", lazy="select")
 
     def __repr__(self):
         return f"<UserAnswer(id={self.id}, user_id={self.user_id}, question_id={self.question_id}, is_correct={self.is_correct})>"
\ No newline at end of file
@@ -0,0 +1,17 @@
+# backend/app/models/user_answer_claim.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class UserAnswerClaim(Base):
+    __tablename__ = "user_answer_claims"
+
+    # One row per question a user has answered. user_answers cannot carry this unique key itself:
+    # on PostgreSQL it is partitioned by answered_at, and unique keys must include the partition key.
+    # Claims are never archived, so an answer stays "given" after its period moved to the archive.
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    answered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<UserAnswerClaim(user_id={self.user_id}, question_id={self.question_id})>"
@@ -0,0 +1,24 @@
+# backend/app/models/user_course_summary.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, BigInteger
+from sqlalchemy.sql import func
+from app.database import Base
+
+class UserCourseSummary(Base):
+    __tablename__ = "user_course_summaries"
+
+    # One row per course a user has worked on, kept up to date by the progress and answer writes
+    # (see app/services/dashboard.py). Lives on the user's shard next to user_progress; the
+    # primary key serves the dashboard's "all rows of a user" read.
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    lessons_completed = Column(Integer, nullable=False, default=0)
+    next_lesson_id = Column(Integer, nullable=True) # First incomplete lesson in course order; no FK, lessons can be purged
+    # Checksum of the course's lesson list the two columns above were computed for: when lessons
+    # are added, removed or reordered it no longer matches and the row is recomputed on read
+    lessons_checksum = Column(BigInteger, nullable=True)
+    questions_answered = Column(Integer, nullable=False, default=0)
+    questions_correct = Column(Integer, nullable=False, default=0)
+    last_activity_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<UserCourseSummary(user_id={self.user_id}, course_id={self.course_id}, completed={self.lessons_completed})>"
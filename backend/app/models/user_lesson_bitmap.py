@@ -0,0 +1,24 @@
+# backend/app/models/user_lesson_bitmap.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, BigInteger, LargeBinary, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class UserLessonBitmap(Base):
+    __tablename__ = "user_lesson_bitmaps"
+
+    # The lessons a user completed in one course as a bitmap: bit i is the i-th lesson in course
+    # order (see app/services/completion.py). Lives on the user's shard next to user_progress,
+    # which stays the source of truth; written in the same transaction as the progress.
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    course_id = Column(Integer, ForeignKey("courses.id"), primary_key=True)
+    completed = Column(LargeBinary, nullable=False) # Little-endian bytes, one bit per lesson
+    # Checksum of the course's lesson list the bits were set for: when lessons are added, removed
+    # or reordered it no longer matches and the bitmap is recomputed from user_progress
+    lessons_checksum = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    # Cohort queries read every bitmap of a course
+    __table_args__ = (Index("ix_user_lesson_bitmaps_course_id", "course_id"),)
+
+    def __repr__(self):
+        return f"<UserLessonBitmap(user_id={self.user_id}, course_id={self.course_id})>"
@@ -1,5 +1,5 @@
 # backend/app/models/user_progress.py
-from sqlalchemy import Column, Integer, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Boolean, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -17,14 +17,14 @@ class UserProgress(Base):
     last_accessed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Ensure unique constraint for user_id and lesson_id
-    # This prevents a user from having multiple progress entries for the same lesson
-    # You can add this directly to the table args or via migration later
-    # __table_args__ = (UniqueConstraint('user_id', 'lesson_id', name='_user_lesson_uc'),)
+    # This prevents a user from having multiple progress entries for the same lesson,
+    # and is the conflict target of the upsert in crud_user_progress (also serves per-user lookups)
+    __table_args__ = (UniqueConstraint('user_id', 'lesson_id', name='uq_user_progress_user_lesson'),)
 
 
-    # Relationships
-    user = relationship("User", back_populates="progress", lazy="joined")
-    lesson = relationship("Lesson", back_populates="user_progress", lazy="joined")
+    # Relationships. Loaded only on access: progress may live on a shard without these tables
+    user = relationship("User", back_populates="progress", lazy="select")
+    lesson = relationship("Lesson", back_populates="user_progress", lazy="select")
 
     def __repr__(self):
         return f"<UserProgress(id={self.id}, user_id={self.user_id}, lesson_id={self.lesson_id}, completed={self.is_completed})>"
\ No newline at end of file
@@ -0,0 +1,17 @@
+# backend/app/models/user_shard.py
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+class UserShard(Base):
+    __tablename__ = "user_shards"
+
+    # Which shard holds a user's answers and progress. Users without a row are on "main".
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(String(64), nullable=False, index=True)
+    moving = Column(Boolean, nullable=False, default=False) # Writes are refused while the rebalancer copies the user
+    moved_from = Column(String(64), nullable=True) # Shard still holding a copy of the user's rows until the rebalancer deletes it
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UserShard(user_id={self.user_id}, shard='{self.shard}', moving={self.moving})>"
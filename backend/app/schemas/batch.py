@@ -0,0 +1,26 @@
+# backend/app/schemas/batch.py
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, List
+
+# One GET request of a batch
+class BatchRequest(BaseModel):
+    # Path and query string of a GET endpoint, e.g. "/api/v1/courses/1" or "/api/v1/lessons/?ids=3,4"
+    path: str = Field(..., max_length=2048)
+
+    @field_validator("path")
+    @classmethod
+    def api_path(cls, value: str) -> str:
+        if not value.startswith("/api/v1/"):
+            raise ValueError("path must start with /api/v1/")
+        return value
+
+# Schema for POST /api/v1/batch
+class Batch(BaseModel):
+    requests: List[BatchRequest] = Field(..., min_length=1)
+
+class BatchResponse(BaseModel):
+    status: int # The status code the request would have had on its own
+    body: Any = None # Its JSON body
+
+class BatchOut(BaseModel):
+    responses: List[BatchResponse] # In the order of the requests
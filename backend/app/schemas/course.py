@@ -11,7 +11,7 @@ class LessonOut(BaseModel):
     course_id: int
     title: str
     content_type: str
-    order: int
+    order: float
     created_at: datetime
     # Add other fields as needed for a summarized lesson view
     # For full lesson details, you might need a separate endpoint.
@@ -41,4 +41,9 @@ class CourseOut(CourseBase):
     lessons: List[LessonOut] = [] # Nested lessons (summary)
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Schema for cloning a course (all fields optional)
+class CourseClone(BaseModel):
+    title: Optional[str] = Field(None, min_length=5, max_length=255) # Defaults to "<title> (copy)"
+    background: Optional[bool] = None # Force (true) or prevent (false) running as a job; by size if unset
@@ -0,0 +1,18 @@
+# backend/app/schemas/job.py
+from pydantic import BaseModel
+from typing import Optional, Literal, Dict, Any
+
+# Schema for background job status output
+class JobOut(BaseModel):
+    id: str
+    kind: str
+    status: Literal["pending", "running", "succeeded", "failed"]
+    total: Optional[int] = None
+    done: int = 0
+    elapsed_seconds: Optional[float] = None
+    throughput: Optional[float] = None # Units of work per second
+    result: Dict[str, Any] = {}
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
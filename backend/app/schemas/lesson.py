@@ -1,5 +1,5 @@
 # backend/app/schemas/lesson.py
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, model_validator
 from typing import Optional, Literal, List
 from datetime import datetime
 
@@ -18,19 +18,32 @@ class LessonBase(BaseModel):
     content_type: Literal["text", "video", "quiz", "link"]
     content_url: Optional[HttpUrl] = None # Pydantic's HttpUrl for URL validation
     text_content: Optional[str] = None
-    order: int = Field(0, ge=0) # Order defaults to 0, must be >= 0
+    # Position within the course (fractional, >= 0); a new lesson without one goes at the end
+    order: Optional[float] = Field(None, ge=0)
+
+# Places a lesson next to another one of its course instead of giving an `order` value
+class LessonPlacement(BaseModel):
+    after_lesson_id: Optional[int] = None
+    before_lesson_id: Optional[int] = None
+
+    @model_validator(mode="after")
+    def one_placement(self):
+        given = [name for name in ("order", "after_lesson_id", "before_lesson_id") if getattr(self, name, None) is not None]
+        if len(given) > 1:
+            raise ValueError(f"Give only one of {', '.join(given)}")
+        return self
 
 # Schema for Lesson creation (requires course_id)
-class LessonCreate(LessonBase):
+class LessonCreate(LessonPlacement, LessonBase):
     course_id: int # Explicitly required during creation
 
 # Schema for Lesson update
-class LessonUpdate(LessonBase):
+class LessonUpdate(LessonPlacement, LessonBase):
     title: Optional[str] = Field(None, min_length=3, max_length=255)
     content_type: Optional[Literal["text", "video", "quiz", "link"]] = None
     content_url: Optional[HttpUrl] = None
     text_content: Optional[str] = None
-    order: Optional[int] = Field(None, ge=0)
+    order: Optional[float] = Field(None, ge=0)
 
 
 # Schema for Lesson output
@@ -39,11 +52,22 @@ class LessonOut(LessonBase):
     course_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    # Uploaded video, served by GET /lessons/{id}/media (None when there is none)
+    media_type: Optional[str] = None
+    media_size: Optional[int] = None
     quizzes: List[QuizOut] = [] # Nested quizzes (summary)
 
     class Config:
         from_attributes = True
 
+# Schema for replacing the whole lesson order of a course
+class LessonOrderUpdate(BaseModel):
+    lesson_ids: List[int] # Every lesson of the course, first lesson first
+
+class LessonOrderOut(BaseModel):
+    course_id: int
+    lesson_ids: List[int]
+
 # Update the forward declaration in course.py if you haven't already.
 # We defined it here as a top-level schema to avoid circular imports.
 # Pydantic v2 handles circular imports better if you define them correctly.
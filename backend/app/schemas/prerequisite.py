@@ -0,0 +1,36 @@
+# backend/app/schemas/prerequisite.py
+from pydantic import BaseModel
+from typing import Literal, List, Optional
+from datetime import datetime
+
+# Base Prerequisite Schema
+class PrerequisiteBase(BaseModel):
+    node_type: Literal["lesson", "course"] # What has the requirement
+    node_id: int
+    required_type: Literal["lesson", "course"] # What must be completed first
+    required_id: int
+
+# Schema for Prerequisite creation
+class PrerequisiteCreate(PrerequisiteBase):
+    pass
+
+# Schema for Prerequisite output
+class PrerequisiteOut(PrerequisiteBase):
+    id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Topologically ordered lesson IDs of a course
+class CourseLessonOrderOut(BaseModel):
+    course_id: int
+    lesson_ids: List[int] = []
+
+# Topologically ordered course IDs (prerequisite courses first)
+class CourseOrderOut(BaseModel):
+    course_ids: List[int] = []
+
+# Lessons the current user can take next
+class NextLessonsOut(BaseModel):
+    lesson_ids: List[int] = []
@@ -1,8 +1,11 @@
 # backend/app/schemas/question.py
-from pydantic import BaseModel, Field
+import re
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Literal, List
 from datetime import datetime
 
+from app.services.grading import is_backtracking_pattern
+
 # Forward declaration for OptionOut and UserAnswerOut
 class OptionOut(BaseModel):
     id: int
@@ -24,6 +27,29 @@ class UserAnswerOut(BaseModel):
     class Config:
         from_attributes = True
 
+# Answer key used to grade TrueFalse and ShortAnswer questions
+class AnswerSpec(BaseModel):
+    correct_answer: Optional[bool] = None # TrueFalse
+    accepted_answers: List[str] = [] # ShortAnswer: any of these is correct after normalization
+    pattern: Optional[str] = None # ShortAnswer: regex a correct answer must fully match
+    case_sensitive: bool = False
+    ignore_punctuation: bool = True
+    collapse_whitespace: bool = True
+    max_edit_distance: int = Field(0, ge=0, le=5) # Typos tolerated against accepted_answers
+
+    @field_validator("pattern")
+    @classmethod
+    def pattern_must_compile(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"Invalid regular expression: {e}")
+            if is_backtracking_pattern(value):
+                raise ValueError("Regular expression repeats a group that contains a repetition, e.g. (a+)+; "
+                                 "it can take exponential time on some answers")
+        return value
+
 # Base Question Schema
 class QuestionBase(BaseModel):
     question_text: str = Field(..., min_length=5)
@@ -38,11 +64,13 @@ class OptionCreate(BaseModel):
 class QuestionCreate(QuestionBase):
     quiz_id: int
     options: Optional[List[OptionCreate]] = None # For MCQ type questions
+    answer_spec: Optional[AnswerSpec] = None # For TrueFalse/ShortAnswer questions
 
 # Schema for Question update
 class QuestionUpdate(QuestionBase):
     question_text: Optional[str] = Field(None, min_length=5)
     question_type: Optional[Literal["MCQ", "TrueFalse", "ShortAnswer"]] = None
+    answer_spec: Optional[AnswerSpec] = None
     # Note: Updating options usually involves separate endpoints or more complex logic
     # For simplicity, we won't include options directly in QuestionUpdate
 
@@ -64,6 +92,7 @@ class QuestionWithAnswersOut(QuestionBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     options: List[OptionWithCorrectnessOut] = [] # Educator view of options
+    answer_spec: Optional[AnswerSpec] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
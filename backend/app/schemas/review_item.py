@@ -0,0 +1,22 @@
+# backend/app/schemas/review_item.py
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+# Schema for submitting a review of a due question
+class ReviewSubmit(BaseModel):
+    selected_option_id: Optional[int] = None # For MCQ
+    user_answer_text: Optional[str] = None # For TrueFalse/ShortAnswer
+
+# Schema for ReviewItem output
+class ReviewItemOut(BaseModel):
+    question_id: int
+    due_at: datetime
+    interval_days: int
+    repetitions: int
+    easiness: float = Field(..., ge=1.3)
+    last_reviewed_at: Optional[datetime] = None
+    is_correct: Optional[bool] = None # Only set in the response to a review submission
+
+    class Config:
+        from_attributes = True
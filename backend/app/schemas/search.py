@@ -0,0 +1,19 @@
+# backend/app/schemas/search.py
+from pydantic import BaseModel
+from typing import Optional, Literal, List
+
+# A single ranked search hit (course, lesson or question)
+class SearchHit(BaseModel):
+    doc_type: Literal["course", "lesson", "question"]
+    doc_id: int
+    course_id: int
+    lesson_id: Optional[int] = None
+    title: str
+    title_highlight: str # HTML: the escaped title with matched terms wrapped in <mark>...</mark>
+    snippet: str # HTML: best-matching fragment of the body, escaped and highlighted the same way
+    score: float # Higher is more relevant
+
+# Schema for search output
+class SearchResults(BaseModel):
+    query: str
+    hits: List[SearchHit] = []
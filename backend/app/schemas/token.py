@@ -0,0 +1,17 @@
+# backend/app/schemas/token.py
+from pydantic import BaseModel
+from typing import Optional
+
+# Schema for the token endpoints
+class Token(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+
+# Schema for exchanging (rotating) a refresh token
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+# Schema for logging out; the refresh token's whole family is revoked when given
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
@@ -1,6 +1,6 @@
 # backend/app/schemas/user_progress.py
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 # Base UserProgress Schema
@@ -20,4 +20,34 @@ class UserProgressOut(UserProgressBase):
     last_accessed_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Schema for one course of the "my learning" dashboard (see app/services/dashboard.py)
+class CourseSummaryOut(BaseModel):
+    course_id: int
+    course_title: str
+    lessons_completed: int
+    lessons_total: int
+    completion_percent: float
+    next_lesson_id: Optional[int] = None # None once every lesson is completed
+    next_lesson_title: Optional[str] = None
+    questions_answered: int
+    questions_correct: int
+    quiz_score_percent: Optional[float] = None # None before the first answer
+    last_activity_at: datetime
+
+# Schema for one user's completion of one course (see app/services/completion.py)
+class CourseCompletionOut(BaseModel):
+    course_id: int
+    lessons_total: int
+    lessons_completed: int
+    completion_percent: float
+    next_lesson_id: Optional[int] = None # None once every lesson is completed
+    completed_lesson_ids: List[int] # In course order
+
+# Schema for the users who completed a set of lessons of a course
+class CohortCompletionOut(BaseModel):
+    course_id: int
+    lesson_ids: List[int] # The lessons asked for, in course order
+    user_ids: List[int]
+    learners: int # Users with a completion bitmap of the course
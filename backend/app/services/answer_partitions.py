@@ -0,0 +1,338 @@
+# backend/app/services/answer_partitions.py
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import date, datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Column, MetaData, Table, select, text, union_all
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import FromClause
+
+from app.config import settings
+from app.models.user_answer import UserAnswer
+
+# user_answers is stored in monthly periods named user_answers_pYYYYMM.
+#   PostgreSQL: native RANGE partitions of the partitioned user_answers table
+#               (created by migration 0d68ae8b0547, extended ahead of time by `maintain`).
+#   SQLite:     table-per-period fallback. user_answers holds the current month and
+#               `maintain` moves finished months into their own period tables.
+# Periods older than the retention window are archived to gzip NDJSON files and dropped.
+
+PARTITION_PREFIX = "user_answers_p"
+_PARTITION_RE = re.compile(r"^user_answers_p(\d{4})(\d{2})$")
+ANSWER_COLUMNS = ("id", "user_id", "question_id", "selected_option_id", "user_answer_text", "is_correct", "answered_at")
+_COLUMN_LIST = ", ".join(ANSWER_COLUMNS)
+
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month.year:04d}{month.month:02d}"
+
+def _parse_partition(name: str) -> Optional[date]:
+    match = _PARTITION_RE.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+# --- Dialect-specific partition management ---
+
+class PostgresPartitions:
+    def list(self, db: Session) -> List[Tuple[str, date]]:
+        rows = db.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'user_answers'"
+        )).scalars().all()
+        return sorted((name, month) for name in rows if (month := _parse_partition(name)))
+
+    def live_tables(self, db: Session) -> List[str]:
+        return ["user_answers"] # The partitioned parent already covers every period
+
+    def maintain(self, db: Session, now: datetime, months_ahead: int = 2) -> None:
+        current = month_start(now)
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF user_answers "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+        db.commit()
+
+    def drop(self, db: Session, name: str) -> None:
+        db.execute(text(f"ALTER TABLE user_answers DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+
+
+class SQLitePartitions:
+    def list(self, db: Session) -> List[Tuple[str, date]]:
+        rows = db.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'user_answers_p%'"
+        )).scalars().all()
+        return sorted((name, month) for name in rows if (month := _parse_partition(name)))
+
+    def live_tables(self, db: Session) -> List[str]:
+        return ["user_answers"] + [name for name, _ in self.list(db)]
+
+    def maintain(self, db: Session, now: datetime, months_ahead: int = 2) -> None:
+        """Moves rows of finished months out of the hot table, one period table per month."""
+        current = month_start(now)
+        months = db.execute(text(
+            "SELECT DISTINCT strftime('%Y-%m', answered_at) FROM user_answers WHERE answered_at < :current"
+        ), {"current": current.isoformat()}).scalars().all()
+        for label in months:
+            month = date(int(label[:4]), int(label[5:7]), 1)
+            name = partition_name(month)
+            bounds = {"start": month.isoformat(), "end": add_months(month, 1).isoformat()}
+            db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} AS SELECT {_COLUMN_LIST} FROM user_answers WHERE 0"))
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{name}_user_question ON {name} (user_id, question_id)"))
+            db.execute(text(
+                f"INSERT INTO {name} ({_COLUMN_LIST}) SELECT {_COLUMN_LIST} FROM user_answers "
+                "WHERE answered_at >= :start AND answered_at < :end"
+            ), bounds)
+            db.execute(text("DELETE FROM user_answers WHERE answered_at >= :start AND answered_at < :end"), bounds)
+            db.commit() # One transaction per month keeps each move atomic and short
+
+    def drop(self, db: Session, name: str) -> None:
+        db.execute(text(f"DROP TABLE {name}"))
+        db.commit()
+
+
+_PARTITIONS = {
+    "postgresql": PostgresPartitions(),
+    "sqlite": SQLitePartitions(),
+}
+
+def get_partitions(db: Session):
+    dialect = db.get_bind().dialect.name
+    partitions = _PARTITIONS.get(dialect)
+    if partitions is None:
+        raise NotImplementedError(f"Answer partitioning is not supported on '{dialect}'")
+    return partitions
+
+
+# --- Archive files ---
+# One file per period: user_answers_pYYYYMM.ndjson.gz, where every user's rows form their
+# own gzip member (gzip allows concatenated members). The sidecar .index.json maps
+# user_id -> [offset, length] so reading one user's history decompresses only their member.
+
+def _archive_paths(name: str, archive_dir: str) -> Tuple[str, str]:
+    base = os.path.join(archive_dir, name)
+    return base + ".ndjson.gz", base + ".index.json"
+
+def _serialize(row: dict) -> dict:
+    return {key: (value.isoformat() if isinstance(value, datetime) else value) for key, value in row.items()}
+
+def write_archive(db: Session, name: str, month: date, archive_dir: str) -> int:
+    """Streams one period into its archive file; returns the number of rows written."""
+    os.makedirs(archive_dir, exist_ok=True)
+    data_path, index_path = _archive_paths(name, archive_dir)
+    result = db.execute(
+        text(f"SELECT {_COLUMN_LIST} FROM {name} ORDER BY user_id, answered_at, id").execution_options(
+            stream_results=True, yield_per=10_000
+        )
+    ).mappings()
+    users: Dict[int, List[int]] = {}
+    rows_written = 0
+    with open(data_path + ".tmp", "wb") as data_file:
+        current_user, buffer = None, []
+
+        def flush():
+            if buffer:
+                offset = data_file.tell()
+                data_file.write(gzip.compress(b"".join(buffer)))
+                users[current_user] = [offset, data_file.tell() - offset]
+
+        for row in result:
+            if row["user_id"] != current_user:
+                flush()
+                current_user, buffer = row["user_id"], []
+            buffer.append(json.dumps(_serialize(dict(row)), separators=(",", ":")).encode() + b"\n")
+            rows_written += 1
+        flush()
+    with open(index_path + ".tmp", "w") as index_file:
+        json.dump({"period": month.isoformat(), "rows": rows_written, "users": users}, index_file)
+    # Data first, index last: an index only ever points at a complete data file
+    os.replace(data_path + ".tmp", data_path)
+    os.replace(index_path + ".tmp", index_path)
+    _archive_index_cache.clear()
+    return rows_written
+
+
+class _ArchiveIndexCache:
+    """Loaded archive indexes per directory, reloaded when a directory changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, Tuple[int, Dict[str, dict]]] = {} # archive_dir -> (mtime, indexes)
+
+    def clear(self):
+        with self._lock:
+            self._dirs.clear()
+
+    def get(self, archive_dir: str) -> Dict[str, dict]:
+        try:
+            mtime = os.stat(archive_dir).st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        with self._lock:
+            cached = self._dirs.get(archive_dir)
+            if cached is None or cached[0] != mtime:
+                indexes = {}
+                for filename in os.listdir(archive_dir):
+                    if filename.endswith(".index.json"):
+                        with open(os.path.join(archive_dir, filename)) as index_file:
+                            indexes[filename[:-len(".index.json")]] = json.load(index_file)
+                cached = self._dirs[archive_dir] = (mtime, indexes)
+            return cached[1]
+
+_archive_index_cache = _ArchiveIndexCache()
+
+def read_archived_answers(user_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                          question_id: Optional[int] = None, archive_dir: Optional[str] = None,
+                          archive_dirs: Optional[List[str]] = None) -> Iterator[dict]:
+    """
+    Yields a user's archived answers (oldest period first), reading only that user's gzip members.
+    `archive_dirs` reads several archives at once (one per shard) in period order.
+    """
+    archive_dirs = archive_dirs or [archive_dir or settings.ANSWER_ARCHIVE_DIR]
+    periods = sorted(
+        (name, directory, index)
+        for directory in archive_dirs for name, index in _archive_index_cache.get(directory).items()
+    )
+    for name, archive_dir, index in periods:
+        month = date.fromisoformat(index["period"])
+        if since and add_months(month, 1) <= since.date():
+            continue
+        if until and month > until.date():
+            continue
+        location = index["users"].get(str(user_id))
+        if location is None:
+            continue
+        data_path, _ = _archive_paths(name, archive_dir)
+        with open(data_path, "rb") as data_file:
+            data_file.seek(location[0])
+            member = gzip.decompress(data_file.read(location[1]))
+        for line in member.splitlines():
+            row = json.loads(line)
+            row["answered_at"] = datetime.fromisoformat(row["answered_at"])
+            if question_id is not None and row["question_id"] != question_id:
+                continue
+            if since and row["answered_at"].replace(tzinfo=None) < since.replace(tzinfo=None):
+                continue
+            if until and row["answered_at"].replace(tzinfo=None) >= until.replace(tzinfo=None):
+                continue
+            yield row
+
+
+# --- Reads across live periods ---
+
+def read_live_answers(db: Session, user_id: int, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                      question_id: Optional[int] = None, skip: int = 0, limit: Optional[int] = None) -> List[dict]:
+    """A user's answers from every live period (hot table and, on SQLite, period tables)."""
+    conditions = ["user_id = :user_id"]
+    params = {"user_id": user_id}
+    if question_id is not None:
+        conditions.append("question_id = :question_id")
+        params["question_id"] = question_id
+    if since is not None:
+        conditions.append("answered_at >= :since")
+        params["since"] = since
+    if until is not None:
+        conditions.append("answered_at < :until")
+        params["until"] = until
+    where = " AND ".join(conditions)
+    union = " UNION ALL ".join(
+        f"SELECT {_COLUMN_LIST} FROM {table} WHERE {where}" for table in get_partitions(db).live_tables(db)
+    )
+    query = f"SELECT * FROM ({union}) answers ORDER BY answered_at, id"
+    if limit is not None:
+        query += " LIMIT :limit OFFSET :skip"
+        params.update(limit=limit, skip=skip)
+    rows = [dict(row) for row in db.execute(text(query), params).mappings()]
+    for row in rows:
+        if isinstance(row["answered_at"], str): # SQLite returns raw text for textual queries
+            row["answered_at"] = datetime.fromisoformat(row["answered_at"])
+    return rows
+
+
+# --- Statements across live periods ---
+# Regrades, deletes, exports and rebuilds must reach every live answer. On PostgreSQL that is
+# the partitioned user_answers table; on SQLite the finished months are tables of their own,
+# so writes run once per table in `live_answer_tables` and reads select from `live_answers`.
+
+_period_tables: Dict[str, Table] = {}
+_period_tables_lock = threading.Lock()
+
+def _answer_table(name: str) -> Table:
+    if name == UserAnswer.__tablename__:
+        return UserAnswer.__table__
+    with _period_tables_lock:
+        table = _period_tables.get(name)
+        if table is None:
+            table = _period_tables[name] = Table(name, MetaData(), *(
+                Column(column.name, column.type, primary_key=column.primary_key) for column in UserAnswer.__table__.columns
+            ))
+        return table
+
+def live_answer_tables(db: Session) -> List[Table]:
+    """The live answer tables (hot table and, on SQLite, period tables), all with UserAnswer's columns."""
+    return [_answer_table(name) for name in get_partitions(db).live_tables(db)]
+
+def live_answers(db: Session) -> FromClause:
+    """Every live answer as one FROM clause with UserAnswer's columns: the table itself, or a UNION ALL of the periods."""
+    tables = live_answer_tables(db)
+    if len(tables) == 1:
+        return tables[0]
+    return union_all(*(select(*table.c) for table in tables)).subquery("user_answers")
+
+
+# --- Maintenance job ---
+
+def archive_expired(db: Session, now: Optional[datetime] = None, retention_months: Optional[int] = None,
+                    archive_dir: Optional[str] = None) -> List[dict]:
+    """Archives and drops every period that ended before the retention window."""
+    now = now or datetime.now(timezone.utc)
+    retention_months = settings.ANSWER_RETENTION_MONTHS if retention_months is None else retention_months
+    archive_dir = archive_dir or settings.ANSWER_ARCHIVE_DIR
+    partitions = get_partitions(db)
+    cutoff = add_months(month_start(now), -retention_months)
+    archived = []
+    for name, month in partitions.list(db):
+        if month >= cutoff:
+            continue
+        rows = write_archive(db, name, month, archive_dir)
+        partitions.drop(db, name)
+        archived.append({"partition": name, "rows": rows})
+    return archived
+
+
+def maintain(db: Session, now: Optional[datetime] = None, archive_dir: Optional[str] = None) -> List[dict]:
+    """Nightly: create upcoming partitions (or roll finished months on SQLite), then archive expired ones."""
+    now = now or datetime.now(timezone.utc)
+    get_partitions(db).maintain(db, now)
+    return archive_expired(db, now, archive_dir=archive_dir)
+
+
+if __name__ == "__main__":
+    # Run from cron, e.g. `python -m app.services.answer_partitions` in backend/.
+    # Every user shard has its own partitions and archive directory.
+    from app.database import SessionLocal
+    from app.services import sharding
+
+    session = SessionLocal()
+    try:
+        for shard_name in sharding.shard_names():
+            with sharding.shard_session(session, shard_name) as shard:
+                for entry in maintain(shard, archive_dir=sharding.archive_dir(shard_name)):
+                    print(f"[{shard_name}] Archived {entry['rows']} answers from {entry['partition']}")
+    finally:
+        session.close()
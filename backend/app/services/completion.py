@@ -0,0 +1,334 @@
+# backend/app/services/completion.py
+"""
+Lesson completion as one bitmap per (user, course).
+
+  * Bit i of `user_lesson_bitmaps.completed` is set when the user completed the i-th lesson of
+    the course in course order, i.e. (order, id) as lessons are listed. A course of 100 lessons
+    takes 13 bytes per user instead of up to 100 user_progress rows.
+  * The row is written by the progress writes in app.crud.crud_user_progress, in the same shard
+    transaction: INSERT ... ON CONFLICT locks (or creates) the row, then one bit is set or
+    cleared. user_progress stays the source of truth. Each row keeps the checksum of the lesson
+    list its bits were set for; a row whose course's lessons were added, removed or reordered
+    since (or a new row) is recomputed from user_progress while the row is locked. Layouts come
+    from the prerequisite graph's lesson lists, at most PREREQUISITE_GRAPH_TTL_SECONDS old; a
+    row written for a different list makes the writer reload the course's list before deciding
+    which of the two is stale, and cohort queries always start from a reloaded list.
+  * Completion counts are popcounts, the next lesson is the lowest clear bit, and cohort
+    questions such as "who completed lessons 1-10" are one AND per user against a mask.
+  * Cohort queries read every bitmap of the course on all shards. Each worker keeps the bitmaps
+    of COMPLETION_CACHE_COURSES courses for COMPLETION_CACHE_TTL_SECONDS; progress written by
+    the worker itself updates its cached bitmaps at once. Stale rows found by a cohort load are
+    recomputed for the answer and rewritten by the user's next read or write.
+  * `python -m app.services.completion rebuild` recomputes every row from user_progress, e.g.
+    once after the table was added.
+"""
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, dialect_insert
+from app.models.course import Course
+from app.models.user_lesson_bitmap import UserLessonBitmap
+from app.models.user_progress import UserProgress
+from app.services import prerequisite_graph, sharding
+
+bitmaps = UserLessonBitmap.__table__
+
+
+def checksum(lessons: Sequence[Tuple[int, int]]) -> int:
+    """Changes when a lesson is added, removed or moved: CRC-32 of the lesson IDs in course order."""
+    return zlib.crc32(array("q", [lesson_id for _, lesson_id in lessons]).tobytes())
+
+
+class Layout(NamedTuple):
+    """Which lesson each bit stands for, for the course's current lesson list."""
+    lesson_ids: Tuple[int, ...] # Position -> lesson ID
+    positions: Dict[int, int] # Lesson ID -> position
+    order: Tuple[int, ...] # Lesson IDs in dependency order (prerequisites first), for the next lesson
+    checksum: int
+
+def layout(db: Session, course_id: int, fresh: bool = False) -> Layout:
+    """
+    From one snapshot of the prerequisite graph, so at most PREREQUISITE_GRAPH_TTL_SECONDS old;
+    `fresh` reloads the course's lesson list from the database first.
+    """
+    if fresh:
+        prerequisite_graph.invalidate_course(course_id)
+    graph = prerequisite_graph.get_graph(db)
+    lessons = graph.course_lessons(db, course_id)
+    lesson_ids = tuple(lesson_id for _, lesson_id in lessons)
+    positions = {lesson_id: position for position, lesson_id in enumerate(lesson_ids)}
+    order = tuple(lesson_id for lesson_id in graph.lesson_order(db, course_id) if lesson_id in positions)
+    return Layout(lesson_ids, positions, order, checksum(lessons))
+
+class CourseBits(NamedTuple):
+    """A user's bitmap of a course, with the layout it was computed for."""
+    layout: Layout
+    bits: int
+
+
+# --- Bit operations ---
+
+def to_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+def from_bytes(data: bytes) -> int:
+    return int.from_bytes(data, "little")
+
+def count(bits: int) -> int:
+    return bits.bit_count()
+
+def mask(positions: Iterable[int]) -> int:
+    result = 0
+    for position in positions:
+        result |= 1 << position
+    return result
+
+def completed_lessons(current: Layout, bits: int) -> List[int]:
+    """The completed lesson IDs, in course order."""
+    return [lesson_id for position, lesson_id in enumerate(current.lesson_ids) if bits >> position & 1]
+
+def next_lesson(current: Layout, bits: int) -> Optional[int]:
+    """
+    The first incomplete lesson in dependency order: the lowest clear bit, unless prerequisites
+    inside the course change the order, in which case the bits are tested in that order.
+    """
+    if current.order != current.lesson_ids:
+        return next((lesson_id for lesson_id in current.order if not bits >> current.positions[lesson_id] & 1), None)
+    position = (~bits & (bits + 1)).bit_length() - 1
+    return current.lesson_ids[position] if position < len(current.lesson_ids) else None
+
+def parse_positions(spec: str, size: int) -> List[int]:
+    """
+    Lesson positions as users count them, 1-based: "1-10", "3", "1,4,6-8"; an empty spec is every
+    lesson. Returns 0-based bit positions. Raises ValueError for malformed or out-of-range positions.
+    """
+    if not spec.strip():
+        return list(range(size))
+    positions = set()
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            first_number = int(first)
+            last_number = int(last) if last else first_number
+        except ValueError:
+            raise ValueError(f"Invalid lesson positions '{part.strip()}'")
+        if not 1 <= first_number <= last_number <= size:
+            raise ValueError(f"Lesson positions must be between 1 and {size}")
+        positions.update(range(first_number - 1, last_number))
+    return sorted(positions)
+
+
+# --- Writes, in the caller's shard transaction ---
+
+def _scan(shard: Session, current: Layout, user_id: Optional[int] = None) -> Dict[int, int]:
+    """Bitmaps computed from user_progress: of one user, or of everyone in the course."""
+    query = select(UserProgress.user_id, UserProgress.lesson_id).where(
+        UserProgress.is_completed.is_(True), UserProgress.lesson_id.in_(current.lesson_ids)
+    )
+    if user_id is not None:
+        query = query.where(UserProgress.user_id == user_id)
+    computed: Dict[int, int] = {}
+    for row_user_id, lesson_id in shard.execute(query):
+        computed[row_user_id] = computed.get(row_user_id, 0) | 1 << current.positions[lesson_id]
+    return computed
+
+_NEW_ROW = -1 # Checksum of a row created by `_lock`, never a CRC-32
+
+def _lock(db: Session, shard: Session, user_id: int, course_id: int, current: Layout) -> Tuple[Layout, Optional[int]]:
+    """
+    Creates or locks the user's row of the course. Returns the layout to use and the row's bits,
+    or None for bits that must be recomputed. A row written for another lesson list may have been
+    written by a worker that knows a newer one, so that case reloads the lesson list first.
+    """
+    statement = dialect_insert(shard, bitmaps).values(user_id=user_id, course_id=course_id, completed=b"", lessons_checksum=_NEW_ROW)
+    row = shard.execute(statement.on_conflict_do_update(
+        index_elements=[bitmaps.c.user_id, bitmaps.c.course_id], set_={"updated_at": func.now()}
+    ).returning(bitmaps.c.completed, bitmaps.c.lessons_checksum)).one()
+    if row.lessons_checksum not in (current.checksum, _NEW_ROW):
+        current = layout(db, course_id, fresh=True)
+    return current, (from_bytes(row.completed) if row.lessons_checksum == current.checksum else None)
+
+def _write(shard: Session, user_id: int, course_id: int, current: Layout, bits: int) -> None:
+    shard.execute(
+        update(bitmaps).where(bitmaps.c.user_id == user_id, bitmaps.c.course_id == course_id)
+        .values(completed=to_bytes(bits), lessons_checksum=current.checksum)
+    )
+
+def record_progress(db: Session, shard: Session, user_id: int, course_id: Optional[int], lesson_id: int, is_completed: bool) -> Optional[CourseBits]:
+    """
+    Sets or clears the lesson's bit, after its progress row was written. Returns the course's new
+    bitmap with its layout (None for a lesson without a course); call `remember` with it once committed.
+    """
+    if course_id is None:
+        return None
+    current, bits = _lock(db, shard, user_id, course_id, layout(db, course_id))
+    position = current.positions.get(lesson_id)
+    if bits is None or position is None:
+        bits = _scan(shard, current, user_id).get(user_id, 0) # Includes the progress just written
+    elif is_completed:
+        bits |= 1 << position
+    else:
+        bits &= ~(1 << position)
+    _write(shard, user_id, course_id, current, bits)
+    return CourseBits(current, bits)
+
+def delete_course(db: Session, course_id: int) -> None:
+    """Removes every user's bitmap of a purged course from all shards. The caller commits "main"."""
+    sharding.gather(db, lambda shard: shard.execute(delete(bitmaps).where(bitmaps.c.course_id == course_id)), commit=True)
+    forget(course_id)
+
+
+# --- Reading ---
+
+def user_bits(db: Session, user_id: int, course_id: int) -> CourseBits:
+    """The user's bitmap of a course: one primary-key read, recomputed and written back if stale."""
+    current = layout(db, course_id)
+    with sharding.user_session(db, user_id) as shard:
+        row = shard.execute(
+            select(bitmaps.c.completed, bitmaps.c.lessons_checksum)
+            .where(bitmaps.c.user_id == user_id, bitmaps.c.course_id == course_id)
+        ).first()
+    if row is not None and row.lessons_checksum == current.checksum:
+        return CourseBits(current, from_bytes(row.completed))
+    try:
+        with sharding.user_session(db, user_id, write=True) as shard:
+            current, bits = _lock(db, shard, user_id, course_id, current)
+            if bits is None:
+                bits = _scan(shard, current, user_id).get(user_id, 0)
+                _write(shard, user_id, course_id, current, bits)
+            shard.commit()
+    except sharding.ShardMoving:
+        with sharding.user_session(db, user_id) as shard: # Written back on a later read
+            bits = _scan(shard, current, user_id).get(user_id, 0)
+    completed = CourseBits(current, bits)
+    remember(user_id, course_id, completed)
+    return completed
+
+def course_completion(db: Session, user_id: int, course_id: int) -> Dict:
+    """Completed lessons, completion percent and next lesson of one user in one course."""
+    current, bits = user_bits(db, user_id, course_id)
+    total = len(current.lesson_ids)
+    return {
+        "course_id": course_id,
+        "lessons_total": total,
+        "lessons_completed": count(bits),
+        "completion_percent": round(100 * count(bits) / total, 1) if total else 0.0,
+        "next_lesson_id": next_lesson(current, bits),
+        "completed_lesson_ids": completed_lessons(current, bits),
+    }
+
+
+# --- Cohorts: every bitmap of a course, cached per worker ---
+
+class _Cohort(NamedTuple):
+    loaded_at: float
+    checksum: int
+    bits: Dict[int, int] # user_id -> bitmap
+
+_cohorts: "OrderedDict[int, _Cohort]" = OrderedDict()
+_cohorts_lock = threading.Lock()
+
+def _load_cohort(db: Session, course_id: int, current: Layout) -> Dict[int, int]:
+    def work(shard: Session) -> Dict[int, int]:
+        loaded, stale = {}, []
+        for user_id, data, row_checksum in shard.execute(
+            select(bitmaps.c.user_id, bitmaps.c.completed, bitmaps.c.lessons_checksum).where(bitmaps.c.course_id == course_id)
+        ):
+            if row_checksum == current.checksum:
+                loaded[user_id] = from_bytes(data)
+            else:
+                stale.append(user_id)
+        if stale: # E.g. after a reorder: one scan of the course's progress on this shard
+            computed = _scan(shard, current)
+            loaded.update((user_id, computed.get(user_id, 0)) for user_id in stale)
+        return loaded
+
+    cohort: Dict[int, int] = {}
+    for loaded in sharding.gather(db, work):
+        cohort.update(loaded)
+    return cohort
+
+def cohort_bits(db: Session, course_id: int, current: Layout) -> Dict[int, int]:
+    """Every bitmap of a course (user ID -> bits) for the given layout, at most COMPLETION_CACHE_TTL_SECONDS old."""
+    with _cohorts_lock:
+        cohort = _cohorts.get(course_id)
+        if cohort is not None and cohort.checksum == current.checksum \
+                and time.monotonic() - cohort.loaded_at < settings.COMPLETION_CACHE_TTL_SECONDS:
+            _cohorts.move_to_end(course_id)
+            return cohort.bits
+    loaded_at = time.monotonic()
+    bits = _load_cohort(db, course_id, current)
+    with _cohorts_lock:
+        _cohorts[course_id] = _Cohort(loaded_at, current.checksum, bits)
+        _cohorts.move_to_end(course_id)
+        while len(_cohorts) > settings.COMPLETION_CACHE_COURSES:
+            _cohorts.popitem(last=False)
+    return bits
+
+def users_completing(db: Session, course_id: int, current: Layout, positions: Iterable[int]) -> Tuple[List[int], int]:
+    """
+    The users who completed every lesson at the given 0-based positions of `current` (best a
+    fresh layout), in user ID order, and the number of users with a bitmap of the course.
+    """
+    required = mask(positions)
+    cohort = cohort_bits(db, course_id, current)
+    return sorted(user_id for user_id, bits in list(cohort.items()) if bits & required == required), len(cohort)
+
+def remember(user_id: int, course_id: int, completed: Optional[CourseBits]) -> None:
+    """Puts a committed bitmap into the worker's cached cohort of the course, if it has one for the same layout."""
+    if completed is None:
+        return
+    with _cohorts_lock:
+        cohort = _cohorts.get(course_id)
+        if cohort is not None and cohort.checksum == completed.layout.checksum:
+            cohort.bits[user_id] = completed.bits
+
+def forget(course_id: Optional[int] = None) -> None:
+    """Drops the cached cohort of a course, or all of them."""
+    with _cohorts_lock:
+        if course_id is None:
+            _cohorts.clear()
+        else:
+            _cohorts.pop(course_id, None)
+
+
+# --- Maintenance ---
+
+def rebuild(db: Session) -> int:
+    """Recomputes every bitmap from user_progress, one course at a time on all shards. Returns the number of rows written."""
+    written = 0
+    for course_id in db.execute(select(Course.id).order_by(Course.id)).scalars().all():
+        current = layout(db, course_id, fresh=True)
+
+        def work(shard: Session) -> int:
+            rows = [
+                {"user_id": user_id, "course_id": course_id, "completed": to_bytes(bits), "lessons_checksum": current.checksum}
+                for user_id, bits in _scan(shard, current).items()
+            ]
+            shard.execute(delete(bitmaps).where(bitmaps.c.course_id == course_id))
+            if rows:
+                shard.execute(insert(bitmaps), rows)
+            return len(rows)
+
+        written += sum(sharding.gather(db, work, commit=True))
+        db.commit()
+    forget()
+    return written
+
+
+if __name__ == "__main__":
+    # Run in backend/: `python -m app.services.completion rebuild`, once after adding the table
+    # (migration f3937313554f) or to repair the bitmaps
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild(session)} lesson completion bitmaps")
+    finally:
+        session.close()
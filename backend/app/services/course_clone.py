@@ -0,0 +1,194 @@
+# backend/app/services/course_clone.py
+"""
+Server-side deep copy of a course: its lessons, quizzes, questions and options and the
+prerequisite edges of the course and its lessons. Nothing of the tree is loaded into
+Python; each level is one INSERT ... SELECT, all inside one transaction:
+
+  1. the new IDs of a level are allocated up front into a temporary ID-mapping table
+     (old_id -> new_id): from the table's sequence on PostgreSQL, after the current MAX(id)
+     on SQLite (which holds the write lock for the whole transaction);
+  2. the rows are copied under their new IDs, with foreign keys re-pointed by joining the
+     parent level's mapping table.
+
+Answers and progress are not copied: the clone starts without students. Large courses are
+cloned as a background job (see `schedule_clone`).
+"""
+from typing import Dict, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy import Column, Integer, MetaData, Table, and_, case, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import jobs
+from app.crud import writes
+from app.database import SessionLocal
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.option import Option
+from app.models.prerequisite import Prerequisite
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.services import prerequisite_graph, search
+
+courses, lessons, quizzes = Course.__table__, Lesson.__table__, Quiz.__table__
+questions, options, prerequisites = Question.__table__, Option.__table__, Prerequisite.__table__
+
+# Temporary ID-mapping tables, created and dropped inside the clone's transaction
+_id_maps = MetaData()
+
+def _id_map(name: str) -> Table:
+    return Table(
+        name, _id_maps,
+        Column("old_id", Integer, primary_key=True, autoincrement=False),
+        Column("new_id", Integer, nullable=False),
+        prefixes=["TEMPORARY"],
+    )
+
+course_ids = _id_map("clone_course_ids")
+lesson_ids = _id_map("clone_lesson_ids")
+quiz_ids = _id_map("clone_quiz_ids")
+question_ids = _id_map("clone_question_ids")
+ID_MAPS = (course_ids, lesson_ids, quiz_ids, question_ids)
+
+_NOT_COPIED = {"id", "created_at", "updated_at", "deleted_at"} # New rows get fresh IDs and timestamps
+STEPS = 7 # Units of progress reported on a clone job
+
+
+class CourseNotFound(Exception):
+    pass
+
+
+def count_lessons(db: Session, course_id: int) -> int:
+    return db.execute(
+        select(func.count()).select_from(lessons).where(lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None))
+    ).scalar()
+
+def _allocate_ids(db: Session, id_map: Table, table: Table, old_ids) -> None:
+    """Fills `id_map` with a new ID of `table` for every ID selected by `old_ids`."""
+    old = old_ids.subquery()
+    if db.get_bind().dialect.name == "postgresql":
+        new_id = func.nextval(func.pg_get_serial_sequence(table.name, "id"))
+    else:
+        new_id = (
+            select(func.coalesce(func.max(table.c.id), 0)).scalar_subquery()
+            + func.row_number().over(order_by=old.c.id)
+        )
+    db.execute(insert(id_map).from_select(["old_id", "new_id"], select(old.c.id, new_id)))
+
+def _copy_rows(db: Session, table: Table, parent_column: str, parent_ids: Table, ids: Optional[Table] = None) -> int:
+    """
+    INSERT ... SELECT of the rows whose `parent_column` is in the parent level's mapping table,
+    re-pointed to the parent's copy. With `ids` the rows get their allocated IDs, otherwise the
+    database assigns them.
+    """
+    columns = [column for column in table.columns if column.name not in _NOT_COPIED]
+    source = table.join(parent_ids, parent_ids.c.old_id == table.c[parent_column])
+    values = [parent_ids.c.new_id if column.name == parent_column else column for column in columns]
+    names = [column.name for column in columns]
+    if ids is not None:
+        source = source.join(ids, ids.c.old_id == table.c.id)
+        values.insert(0, ids.c.new_id)
+        names.insert(0, "id")
+    return db.execute(insert(table).from_select(names, select(*values).select_from(source))).rowcount
+
+def _copy_prerequisites(db: Session, course_id: int, new_course_id: int) -> int:
+    """
+    Copies the edges whose requiring side is the course or one of its lessons. Requirements on
+    lessons of the same course point at their copies; requirements outside the course are kept.
+    Edges from other nodes to this course are not copied: nothing requires the clone yet, so
+    the copy cannot close a cycle.
+    """
+    required_copy = lesson_ids.alias("required_copy")
+    node_copy = lesson_ids.alias("node_copy")
+    required_id = case(
+        (required_copy.c.new_id.is_not(None), required_copy.c.new_id), else_=prerequisites.c.required_id
+    )
+    source = prerequisites.outerjoin(node_copy, and_(
+        prerequisites.c.node_type == "lesson", node_copy.c.old_id == prerequisites.c.node_id
+    )).outerjoin(required_copy, and_(
+        prerequisites.c.required_type == "lesson", required_copy.c.old_id == prerequisites.c.required_id
+    ))
+    query = select(
+        prerequisites.c.node_type,
+        case((prerequisites.c.node_type == "course", literal(new_course_id)), else_=node_copy.c.new_id),
+        prerequisites.c.required_type,
+        required_id,
+    ).select_from(source).where(
+        (and_(prerequisites.c.node_type == "course", prerequisites.c.node_id == course_id))
+        | node_copy.c.new_id.is_not(None)
+    )
+    return db.execute(insert(prerequisites).from_select(
+        ["node_type", "node_id", "required_type", "required_id"], query
+    )).rowcount
+
+def clone_course(db: Session, course_id: int, educator_id: int, title: Optional[str] = None,
+                 job: Optional[jobs.Job] = None) -> Dict[str, int]:
+    """
+    Copies a course and everything under it for `educator_id`, in one transaction.
+    Returns the new course ID and the number of rows copied per table.
+    """
+    source = db.execute(
+        select(courses.c.title, courses.c.description).where(courses.c.id == course_id, courses.c.deleted_at.is_(None))
+    ).one_or_none()
+    if source is None:
+        raise CourseNotFound(course_id)
+    if job:
+        job.total = STEPS
+
+    def step() -> None:
+        if job:
+            job.advance()
+
+    with writes.transaction(db):
+        # The course row goes first: on SQLite it opens the transaction (and takes the write
+        # lock) before the temporary tables are created, so they roll back with it
+        new_course_id = db.execute(insert(courses).values(
+            title=title or f"{source.title} (copy)", description=source.description, educator_id=educator_id
+        ).returning(courses.c.id)).scalar_one()
+        connection = db.connection()
+        for id_map in ID_MAPS:
+            id_map.create(connection)
+        db.execute(insert(course_ids).values(old_id=course_id, new_id=new_course_id))
+        step()
+
+        # Rows deleted but not yet purged are left behind; the levels below follow the ID maps
+        _allocate_ids(db, lesson_ids, lessons, select(lessons.c.id).where(lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None)))
+        copied = {"lessons": _copy_rows(db, lessons, "course_id", course_ids, ids=lesson_ids)}
+        step()
+        _allocate_ids(db, quiz_ids, quizzes, select(quizzes.c.id).join(lesson_ids, lesson_ids.c.old_id == quizzes.c.lesson_id))
+        copied["quizzes"] = _copy_rows(db, quizzes, "lesson_id", lesson_ids, ids=quiz_ids)
+        step()
+        _allocate_ids(db, question_ids, questions, select(questions.c.id).join(quiz_ids, quiz_ids.c.old_id == questions.c.quiz_id))
+        copied["questions"] = _copy_rows(db, questions, "quiz_id", quiz_ids, ids=question_ids)
+        step()
+        copied["options"] = _copy_rows(db, options, "question_id", question_ids) # Leaves: no mapping needed
+        step()
+        copied["prerequisites"] = _copy_prerequisites(db, course_id, new_course_id)
+        step()
+        search.index_course_tree(db, new_course_id)
+
+        for id_map in ID_MAPS:
+            id_map.drop(connection)
+        step()
+
+    if copied["prerequisites"]:
+        prerequisite_graph.invalidate()
+    return {"course_id": new_course_id, **copied}
+
+def _run_clone(job: jobs.Job, course_id: int, educator_id: int, title: Optional[str]) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return clone_course(db, course_id, educator_id, title=title, job=job)
+    finally:
+        db.close()
+
+def should_run_in_background(db: Session, course_id: int) -> bool:
+    return count_lessons(db, course_id) > settings.COURSE_CLONE_INLINE_MAX_LESSONS
+
+def schedule_clone(background_tasks: BackgroundTasks, course_id: int, educator_id: int,
+                   title: Optional[str] = None) -> jobs.Job:
+    """Queues a clone to run after the response is sent; poll it via GET /api/v1/jobs/{id}."""
+    job = jobs.create_job("clone", owner_id=educator_id, total=STEPS)
+    background_tasks.add_task(jobs.run_job, job, _run_clone, course_id, educator_id, title)
+    return job
@@ -0,0 +1,292 @@
+# backend/app/services/dashboard.py
+"""
+Precomputed per-course summaries of a learner's progress, served by
+GET /api/v1/progress/me/dashboard.
+
+  * `user_course_summaries` has one row per (user, course) on the user's shard, written in the
+    same shard transaction as the progress or answer it summarizes: completing a lesson sets the
+    course's completed-lesson count and next lesson from its completion bitmap (see
+    app/services/completion.py), an answer increments the course's answered and correct counts. A regrade
+    applies the change in correct answers per user, deleting questions subtracts their answers
+    and purging a course deletes its rows.
+  * Reading the dashboard is one primary-key range scan on the shard, then one query on the
+    primary for the course and next-lesson titles. Lesson lists come from one snapshot of the
+    prerequisite graph, at most PREREQUISITE_GRAPH_TTL_SECONDS old (the courses missing from it
+    are loaded in one query). Each row keeps a checksum of the lesson list it was computed for.
+    When it differs, the worker's list may be the stale one, so those courses' lists are
+    reloaded in one query first; rows that still differ are recomputed from user_progress and
+    written back.
+  * `python -m app.services.dashboard rebuild` recomputes every row from user_progress and the
+    live user_answers (answers already moved to the archive are not counted), e.g. once after
+    the table was added.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, bindparam, case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, dialect_insert
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.user_answer_claim import UserAnswerClaim
+from app.models.user_course_summary import UserCourseSummary
+from app.models.user_progress import UserProgress
+from app.services import answer_partitions, completion, ownership, prerequisite_graph, sharding
+
+summaries = UserCourseSummary.__table__
+
+
+def _lesson_values(graph: prerequisite_graph.PrerequisiteGraph, db: Session, course_id: int, completed: Set[int]) -> Dict:
+    """The lesson columns of a summary, from the user's completed lessons of the course."""
+    lessons = graph.course_lessons(db, course_id)
+    next_lesson_id = next((lesson_id for lesson_id in graph.lesson_order(db, course_id) if lesson_id not in completed), None)
+    return {
+        "lessons_completed": sum(1 for _, lesson_id in lessons if lesson_id in completed),
+        "next_lesson_id": next_lesson_id,
+        "lessons_checksum": completion.checksum(lessons),
+    }
+
+def _completed_lessons(shard: Session, user_id: int, lesson_ids: Iterable[int]) -> Set[int]:
+    return set(shard.execute(
+        select(UserProgress.lesson_id)
+        .where(UserProgress.user_id == user_id, UserProgress.is_completed.is_(True), UserProgress.lesson_id.in_(list(lesson_ids)))
+    ).scalars())
+
+
+# --- Writes, in the caller's shard transaction ---
+
+def lock_course(db: Session, shard: Session, user_id: int, lesson_id: int) -> Optional[int]:
+    """
+    Creates or locks the summary row of the lesson's course, before the progress is written: a
+    concurrent completion in the same course waits, then counts this one. Returns the course ID.
+    """
+    course_id = prerequisite_graph.get_graph(db).lesson_course(db, lesson_id)
+    if course_id is not None:
+        statement = dialect_insert(shard, summaries).values(
+            user_id=user_id, course_id=course_id, lessons_completed=0, questions_answered=0, questions_correct=0
+        )
+        shard.execute(statement.on_conflict_do_update(
+            index_elements=[summaries.c.user_id, summaries.c.course_id], set_={"last_activity_at": func.now()}
+        ))
+    return course_id
+
+def record_progress(shard: Session, user_id: int, course_id: Optional[int], completed: Optional[completion.CourseBits]) -> None:
+    """Sets the lesson columns of a row locked by `lock_course` from the course's new completion bitmap and its layout."""
+    if course_id is None or completed is None:
+        return
+    values = {
+        "lessons_completed": completion.count(completed.bits),
+        "next_lesson_id": completion.next_lesson(completed.layout, completed.bits),
+        "lessons_checksum": completed.layout.checksum,
+    }
+    shard.execute(update(summaries).where(summaries.c.user_id == user_id, summaries.c.course_id == course_id).values(**values))
+
+def record_answer(db: Session, shard: Session, user_id: int, question_id: int, is_correct: Optional[bool]) -> None:
+    """Counts a new answer in its course's row."""
+    owner = ownership.resolve(db, "question", question_id)
+    if owner is None:
+        return
+    correct = 1 if is_correct else 0
+    statement = dialect_insert(shard, summaries).values(
+        user_id=user_id, course_id=owner.course_id, lessons_completed=0, questions_answered=1, questions_correct=correct
+    )
+    shard.execute(statement.on_conflict_do_update(
+        index_elements=[summaries.c.user_id, summaries.c.course_id],
+        set_={
+            "questions_answered": summaries.c.questions_answered + 1,
+            "questions_correct": summaries.c.questions_correct + statement.excluded.questions_correct,
+            "last_activity_at": func.now(),
+        },
+    ))
+
+def apply_regrade(shard: Session, course_id: int, deltas: Dict[int, int]) -> None:
+    """Adds the change in correct answers (user ID -> delta) of a regraded question to the course's rows."""
+    changes = [{"user": user_id, "delta": delta} for user_id, delta in deltas.items() if delta]
+    if changes:
+        shard.connection().execute(
+            update(summaries)
+            .where(summaries.c.user_id == bindparam("user"), summaries.c.course_id == course_id)
+            .values(questions_correct=summaries.c.questions_correct + bindparam("delta")),
+            changes,
+        )
+
+def question_courses(db: Session, question_ids: Iterable[int]) -> Dict[int, int]:
+    """Question ID -> course ID, soft-deleted questions included (Core tables are not filtered)."""
+    questions, quizzes, lessons = Question.__table__, Quiz.__table__, Lesson.__table__
+    return dict(db.execute(
+        select(questions.c.id, lessons.c.course_id)
+        .join(quizzes, quizzes.c.id == questions.c.quiz_id)
+        .join(lessons, lessons.c.id == quizzes.c.lesson_id)
+        .where(questions.c.id.in_(list(question_ids)))
+    ).all())
+
+def forget_answers(shard: Session, question_courses: Dict[int, int]) -> None:
+    """Subtracts the answers to questions about to be deleted from their courses' rows."""
+    by_course: Dict[int, List[int]] = {}
+    for question_id, course_id in question_courses.items():
+        by_course.setdefault(course_id, []).append(question_id)
+    for course_id, question_ids in by_course.items():
+        answered = dict(shard.execute(
+            select(UserAnswerClaim.user_id, func.count())
+            .where(UserAnswerClaim.question_id.in_(question_ids)).group_by(UserAnswerClaim.user_id)
+        ).all())
+        answers = answer_partitions.live_answers(shard)
+        correct = dict(shard.execute(
+            select(answers.c.user_id, func.count())
+            .where(answers.c.question_id.in_(question_ids), answers.c.is_correct.is_(True)).group_by(answers.c.user_id)
+        ).all())
+        changes = [{"user": user_id, "answered": count, "correct": correct.get(user_id, 0)} for user_id, count in answered.items()]
+        if changes:
+            shard.connection().execute(
+                update(summaries)
+                .where(summaries.c.user_id == bindparam("user"), summaries.c.course_id == course_id)
+                .values(questions_answered=summaries.c.questions_answered - bindparam("answered"),
+                        questions_correct=summaries.c.questions_correct - bindparam("correct")),
+                changes,
+            )
+
+def delete_course(db: Session, course_id: int) -> None:
+    """Removes every user's row of a purged course from all shards. The caller commits "main"."""
+    sharding.gather(db, lambda shard: shard.execute(delete(summaries).where(summaries.c.course_id == course_id)), commit=True)
+
+
+# --- Reading ---
+
+def _refresh(db: Session, graph: prerequisite_graph.PrerequisiteGraph, user_id: int, rows: List[Dict]) -> None:
+    """Recomputes the lesson columns of rows whose course's lessons changed, and writes them back."""
+    lesson_ids = [lesson_id for row in rows for _, lesson_id in graph.course_lessons(db, row["course_id"])]
+    try:
+        with sharding.user_session(db, user_id, write=True) as shard:
+            completed = _completed_lessons(shard, user_id, lesson_ids) if lesson_ids else set()
+            for row in rows:
+                values = _lesson_values(graph, db, row["course_id"], completed)
+                row.update(values)
+                shard.execute(update(summaries)
+                              .where(summaries.c.user_id == user_id, summaries.c.course_id == row["course_id"])
+                              .values(**values))
+            shard.commit()
+    except sharding.ShardMoving:
+        pass # The values above are still returned; the rows are recomputed again on the next read
+
+def _percent(part: int, whole: int) -> Optional[float]:
+    return round(100 * min(max(part, 0), whole) / whole, 1) if whole > 0 else None
+
+def get_dashboard(db: Session, user_id: int) -> List[Dict]:
+    """Per course the user worked on, most recent activity first: completion, next lesson and quiz score."""
+    with sharding.user_session(db, user_id) as shard:
+        rows = [dict(row) for row in shard.execute(
+            select(summaries).where(summaries.c.user_id == user_id).order_by(summaries.c.last_activity_at.desc())
+        ).mappings()]
+    if not rows:
+        return []
+    graph = prerequisite_graph.get_graph(db) # One snapshot for the whole read
+
+    def stale_rows():
+        return [row for row in rows if row["lessons_checksum"] != completion.checksum(graph.course_lessons(db, row["course_id"]))]
+
+    graph.prefetch_course_lessons(db, [row["course_id"] for row in rows])
+    stale = stale_rows()
+    if stale: # Lessons changed through another worker, or this worker's lists are behind
+        graph.prefetch_course_lessons(db, [row["course_id"] for row in stale], reload=True)
+        stale = stale_rows()
+    if stale:
+        _refresh(db, graph, user_id, stale)
+
+    # Deleted courses and lessons are filtered out here (see app/models/soft_delete.py)
+    next_lesson_ids = [row["next_lesson_id"] for row in rows if row["next_lesson_id"] is not None]
+    titles = {
+        course_id: (course_title, lesson_title)
+        for course_id, course_title, lesson_title in db.execute(
+            select(Course.id, Course.title, Lesson.title)
+            .outerjoin(Lesson, and_(Lesson.course_id == Course.id, Lesson.id.in_(next_lesson_ids)))
+            .where(Course.id.in_([row["course_id"] for row in rows]))
+        )
+    }
+    dashboard = []
+    for row in rows:
+        if row["course_id"] not in titles:
+            continue
+        course_title, next_lesson_title = titles[row["course_id"]]
+        lessons_total = len(graph.course_lessons(db, row["course_id"]))
+        dashboard.append({
+            "course_id": row["course_id"],
+            "course_title": course_title,
+            "lessons_completed": min(max(row["lessons_completed"], 0), lessons_total),
+            "lessons_total": lessons_total,
+            "completion_percent": _percent(row["lessons_completed"], lessons_total) or 0.0,
+            "next_lesson_id": row["next_lesson_id"] if next_lesson_title is not None else None,
+            "next_lesson_title": next_lesson_title,
+            "questions_answered": max(row["questions_answered"], 0),
+            "questions_correct": max(row["questions_correct"], 0),
+            "quiz_score_percent": _percent(row["questions_correct"], row["questions_answered"]),
+            "last_activity_at": row["last_activity_at"],
+        })
+    return dashboard
+
+
+# --- Maintenance ---
+
+def rebuild(db: Session) -> int:
+    """Recomputes every summary row, one course at a time on all shards. Returns the number of rows written."""
+    graph = prerequisite_graph.get_graph(db)
+    now = datetime.now(timezone.utc)
+    written = 0
+    for course_id in db.execute(select(Course.id).order_by(Course.id)).scalars().all():
+        graph.prefetch_course_lessons(db, [course_id], reload=True) # Not a list cached before the run
+        lesson_ids = [lesson_id for _, lesson_id in graph.course_lessons(db, course_id)]
+        question_ids = db.execute(
+            select(Question.id).join(Quiz, Quiz.id == Question.quiz_id).join(Lesson, Lesson.id == Quiz.lesson_id)
+            .where(Lesson.course_id == course_id)
+        ).scalars().all()
+
+        def work(shard: Session) -> int:
+            completed: Dict[int, Set[int]] = {}
+            activity: Dict[int, datetime] = {}
+            for user_id, lesson_id, is_completed, accessed_at in shard.execute(
+                select(UserProgress.user_id, UserProgress.lesson_id, UserProgress.is_completed, UserProgress.last_accessed_at)
+                .where(UserProgress.lesson_id.in_(lesson_ids))
+            ):
+                completed.setdefault(user_id, set())
+                if is_completed:
+                    completed[user_id].add(lesson_id)
+                if accessed_at is not None:
+                    activity[user_id] = max(activity.get(user_id, accessed_at), accessed_at)
+            answers: Dict[int, Tuple[int, int]] = {}
+            if question_ids:
+                answers = answer_partitions.live_answers(shard) # Every live period of the shard
+                for user_id, answered, correct, answered_at in shard.execute(
+                    select(answers.c.user_id, func.count(), func.sum(case((answers.c.is_correct.is_(True), 1), else_=0)),
+                           func.max(answers.c.answered_at))
+                    .where(answers.c.question_id.in_(question_ids)).group_by(answers.c.user_id)
+                ):
+                    answers[user_id] = (answered, correct or 0)
+                    activity[user_id] = max(activity.get(user_id, answered_at), answered_at)
+            rows = []
+            for user_id in completed.keys() | answers.keys():
+                answered, correct = answers.get(user_id, (0, 0))
+                rows.append({
+                    "user_id": user_id, "course_id": course_id, "questions_answered": answered, "questions_correct": correct,
+                    "last_activity_at": activity.get(user_id) or now,
+                    **_lesson_values(graph, db, course_id, completed.get(user_id, set())),
+                })
+            shard.execute(delete(summaries).where(summaries.c.course_id == course_id))
+            if rows:
+                shard.execute(insert(summaries), rows)
+            return len(rows)
+
+        written += sum(sharding.gather(db, work, commit=True))
+        db.commit()
+    return written
+
+
+if __name__ == "__main__":
+    # Run in backend/: `python -m app.services.dashboard rebuild`, once after adding the table
+    # (migration 1f212bd602fa) or to repair the summaries
+    session = SessionLocal()
+    try:
+        print(f"Rebuilt {rebuild(session)} course summaries")
+    finally:
+        session.close()
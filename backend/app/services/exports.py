@@ -0,0 +1,184 @@
+# backend/app/services/exports.py
+import csv
+import heapq
+import io
+import itertools
+import zlib
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.database import read_session
+from app.models.lesson import Lesson
+from app.models.option import Option
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.user import User
+from app.models.user_progress import UserProgress
+from app.services import answer_partitions, sharding
+
+# CSV exports are streamed: rows come from server-side cursors (`yield_per`) over
+# column-only queries and are written out in chunks, so memory stays constant no
+# matter how many rows a course has. Answers and progress are read from every user shard
+# (see app.services.sharding); names and titles are looked up on the primary, the course's
+# questions and lessons once and usernames once per chunk.
+
+ROWS_PER_CHUNK = 1000
+ANSWER_COLUMNS = (
+    "answer_id", "answered_at", "user_id", "username", "lesson_id", "lesson_title", "quiz_id",
+    "question_id", "question_type", "selected_option_id", "selected_option_text", "user_answer_text", "is_correct",
+)
+PROGRESS_COLUMNS = (
+    "progress_id", "user_id", "username", "lesson_id", "lesson_title", "is_completed", "completed_at", "last_accessed_at",
+)
+
+
+def _answer_query(shard: Session, question_ids: List[int]) -> Select:
+    answers = answer_partitions.live_answers(shard) # Every live period of the shard
+    return (
+        select(
+            answers.c.id, answers.c.answered_at, answers.c.user_id, answers.c.question_id,
+            answers.c.selected_option_id, answers.c.user_answer_text, answers.c.is_correct,
+        )
+        .where(answers.c.question_id.in_(question_ids))
+        .order_by(answers.c.answered_at, answers.c.id)
+    )
+
+def _progress_query(lesson_ids: List[int]) -> Select:
+    return (
+        select(
+            UserProgress.id, UserProgress.user_id, UserProgress.lesson_id,
+            UserProgress.is_completed, UserProgress.completed_at, UserProgress.last_accessed_at,
+        )
+        .where(UserProgress.lesson_id.in_(lesson_ids))
+        .order_by(UserProgress.id)
+    )
+
+def _course_questions(db: Session, course_id: int) -> Dict[int, tuple]:
+    """question_id -> (lesson_id, lesson_title, quiz_id, question_type)"""
+    rows = db.execute(
+        select(Question.id, Lesson.id, Lesson.title, Quiz.id, Question.question_type)
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .join(Lesson, Lesson.id == Quiz.lesson_id)
+        .where(Lesson.course_id == course_id)
+    ).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+def _course_options(db: Session, course_id: int) -> Dict[int, str]:
+    return dict(db.execute(
+        select(Option.id, Option.option_text)
+        .join(Question, Question.id == Option.question_id)
+        .join(Quiz, Quiz.id == Question.quiz_id)
+        .join(Lesson, Lesson.id == Quiz.lesson_id)
+        .where(Lesson.course_id == course_id)
+    ).all())
+
+def _with_usernames(db: Session, rows: Iterable[Sequence]) -> Iterator[Tuple[Sequence, Optional[str]]]:
+    """Pairs rows (with a `user_id`) with the username, one lookup query per chunk."""
+    usernames: Dict[int, str] = {}
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, ROWS_PER_CHUNK))
+        if not chunk:
+            return
+        missing = {row.user_id for row in chunk} - usernames.keys()
+        if missing:
+            if len(usernames) > 100_000:
+                usernames.clear()
+            usernames.update(db.execute(select(User.id, User.username).where(User.id.in_(missing))).all())
+        for row in chunk:
+            yield row, usernames.get(row.user_id)
+
+def answer_rows(course_id: int) -> Iterator[Sequence]:
+    """Every answer in the course (ANSWER_COLUMNS), oldest first across all shards."""
+    db = read_session()
+    try:
+        questions = _course_questions(db, course_id)
+        if not questions:
+            return
+        options = _course_options(db, course_id)
+        question_ids = list(questions)
+        merged = heapq.merge(
+            *(stream_query(lambda shard: _answer_query(shard, question_ids), shard_name) for shard_name in sharding.shard_names()),
+            key=lambda row: (row.answered_at, row.id),
+        )
+        for row, username in _with_usernames(db, merged):
+            lesson_id, lesson_title, quiz_id, question_type = questions[row.question_id]
+            yield (
+                row.id, row.answered_at, row.user_id, username, lesson_id, lesson_title, quiz_id,
+                row.question_id, question_type, row.selected_option_id, options.get(row.selected_option_id),
+                row.user_answer_text, row.is_correct,
+            )
+    finally:
+        db.close()
+
+def progress_rows(course_id: int) -> Iterator[Sequence]:
+    """Every progress row in the course (PROGRESS_COLUMNS), shard by shard."""
+    db = read_session()
+    try:
+        lessons = dict(db.execute(select(Lesson.id, Lesson.title).where(Lesson.course_id == course_id)).all())
+        if not lessons:
+            return
+        query = _progress_query(list(lessons))
+        rows = itertools.chain.from_iterable(stream_query(query, shard_name) for shard_name in sharding.shard_names())
+        for row, username in _with_usernames(db, rows):
+            yield (
+                row.id, row.user_id, username, row.lesson_id, lessons.get(row.lesson_id),
+                row.is_completed, row.completed_at, row.last_accessed_at,
+            )
+    finally:
+        db.close()
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@"):
+        return "'" + value # Keep spreadsheets from evaluating user-supplied text as a formula
+    return value
+
+def iter_csv(header: Sequence[str], rows: Iterable[Sequence]) -> Iterator[bytes]:
+    """Encodes rows as CSV, one chunk of ROWS_PER_CHUNK rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def iter_gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compresses a stream of chunks into a single gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) # wbits=31: gzip header and trailer
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def stream_query(query: Union[Select, Callable[[Session], Select]], shard_name: str = sharding.MAIN) -> Iterator[Sequence]:
+    """
+    Rows of `query` on one shard, fetched through a server-side cursor. Uses its own session
+    (a read replica for "main" when configured): the request's session is closed before a
+    StreamingResponse starts sending. `query` can also be built from that session, when its
+    tables depend on the shard.
+    """
+    with sharding.read_shard_session(shard_name) as db:
+        if callable(query):
+            query = query(db)
+        result = db.execute(query.execution_options(yield_per=ROWS_PER_CHUNK))
+        for row in result:
+            yield row
+
+def export_csv(rows: Iterable[Sequence], header: Sequence[str], compress: bool = False) -> Iterator[bytes]:
+    chunks = iter_csv(header, rows)
+    return iter_gzip(chunks) if compress else chunks
@@ -0,0 +1,120 @@
+# backend/app/services/fieldsets.py
+"""
+Sparse fieldsets: `?fields=id,title,lessons.id,lessons.title` on a listing returns only
+those fields.
+
+  * `parse` checks the requested paths against the endpoint's response schema (a nested
+    field without subfields, e.g. `lessons`, means all of its schema's plain fields) and maps
+    each field to a column or relationship of the model. Fields that are not columns (e.g.
+    computed ones) cannot be selected.
+  * `fetch` loads only those columns: one column-projected SELECT for the page, then one per
+    requested relationship, for the whole page at once (`child.fk IN (...)`). No entity is
+    loaded, so none of the models' eager joins run; unrequested relationships cost nothing.
+    ORM column selects are still filtered for soft-deleted rows (see app/models/soft_delete.py).
+  * `to_json` serializes the plain dicts with pydantic-core, which formats values (datetimes)
+    the same way as the full response models, without building them.
+"""
+from typing import Dict, List, Optional, Sequence, Type, Union, get_args, get_origin
+
+import pydantic_core
+from pydantic import BaseModel
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+
+_PARENT = "_parent" # Label of the foreign key a nested row is grouped by
+
+
+class FieldSet:
+    """The fields requested from one schema/model: columns, and nested fieldsets by relationship."""
+
+    def __init__(self, schema: Type[BaseModel], model: type):
+        self.schema = schema
+        self.model = model
+        self.columns: List[str] = []
+        self.relations: Dict[str, "FieldSet"] = {}
+
+    def ordered(self) -> List[str]:
+        # Columns and relationships in the schema's order, like the full response
+        return [name for name in self.schema.model_fields if name in self.columns or name in self.relations]
+
+
+def _nested_schema(annotation) -> Optional[Type[BaseModel]]:
+    """The model of a `Model`, `List[Model]` or `Optional[Model]` field, else None."""
+    while get_origin(annotation) in (list, List, Union):
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+def _add(fieldset: FieldSet, parts: List[str], path: str) -> None:
+    name = parts[0]
+    field = fieldset.schema.model_fields.get(name)
+    if field is None:
+        raise ValueError(f"Unknown field '{path}'")
+    mapper = inspect(fieldset.model)
+    nested = _nested_schema(field.annotation)
+    if nested is None:
+        if len(parts) > 1:
+            raise ValueError(f"'{name}' has no fields to select ('{path}')")
+        if name not in mapper.column_attrs:
+            raise ValueError(f"Field '{path}' cannot be selected")
+        if name not in fieldset.columns:
+            fieldset.columns.append(name)
+        return
+    if name not in mapper.relationships:
+        raise ValueError(f"Field '{path}' cannot be selected")
+    child = fieldset.relations.setdefault(name, FieldSet(nested, mapper.relationships[name].mapper.class_))
+    if len(parts) > 1:
+        _add(child, parts[1:], path)
+        return
+    for child_name, child_field in nested.model_fields.items(): # All plain fields of the nested schema
+        if _nested_schema(child_field.annotation) is None:
+            _add(child, [child_name], f"{path}.{child_name}")
+
+def parse(fields: str, schema: Type[BaseModel], model: type) -> FieldSet:
+    """Parses a comma-separated `fields` value for a `schema` response. Raises ValueError for invalid fields."""
+    fieldset = FieldSet(schema, model)
+    for path in (path.strip() for path in fields.split(",")):
+        if path:
+            _add(fieldset, path.split("."), path)
+    if not fieldset.columns and not fieldset.relations:
+        raise ValueError("No fields given")
+    return fieldset
+
+
+def fetch(db: Session, fieldset: FieldSet, where: Sequence = (), order_by: Sequence = (),
+          skip: Optional[int] = None, limit: Optional[int] = None, parent_column=None) -> List[Dict]:
+    """
+    The rows matching `where` as dicts holding the requested fields, nested relationships
+    included. With `parent_column`, each dict also holds that column under _PARENT.
+    """
+    mapper = inspect(fieldset.model)
+    links = {}
+    for name in fieldset.relations:
+        relationship = mapper.relationships[name]
+        (local, remote), = relationship.local_remote_pairs
+        links[name] = (mapper.get_property_by_column(local).key, remote, relationship.order_by or ())
+    keys = [name for name in fieldset.ordered() if name in fieldset.columns]
+    selected = keys + [key for key, _, _ in links.values() if key not in keys] # Join keys, even if not requested
+    columns = [getattr(fieldset.model, key) for key in selected]
+    if parent_column is not None:
+        columns.append(parent_column.label(_PARENT))
+    rows = [row._asdict() for row in db.execute(
+        select(*columns).where(*where).order_by(*order_by).offset(skip).limit(limit)
+    )]
+
+    for name, (key, remote, child_order) in links.items():
+        children: Dict = {}
+        parent_ids = {row[key] for row in rows}
+        if parent_ids:
+            for child in fetch(db, fieldset.relations[name], where=[remote.in_(parent_ids)],
+                               order_by=[remote, *child_order], parent_column=remote):
+                children.setdefault(child.pop(_PARENT), []).append(child)
+        for row in rows:
+            row[name] = children.get(row[key], [])
+
+    requested = fieldset.ordered() + ([_PARENT] if parent_column is not None else [])
+    return [{key: row[key] for key in requested} for row in rows]
+
+def to_json(rows: List[Dict]) -> bytes:
+    return pydantic_core.to_json(rows)
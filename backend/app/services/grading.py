@@ -0,0 +1,238 @@
+# backend/app/services/grading.py
+import re
+import string
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session, lazyload, selectinload
+
+from app.config import settings
+from app.models.question import Question
+
+# --- Registry ---
+# A grader receives the compiled answer key of a question and one submission and returns
+# True/False, or None when the answer cannot be graded automatically (left for manual grading).
+
+Grader = Callable[["CompiledAnswerKey", Optional[int], Optional[str]], Optional[bool]]
+GRADERS: Dict[str, Grader] = {}
+
+def register_grader(question_type: str):
+    """Decorator registering the grader for a `Question.question_type`."""
+    def decorator(func: Grader) -> Grader:
+        GRADERS[question_type] = func
+        return func
+    return decorator
+
+
+# --- Compiled answer keys ---
+
+@dataclass(frozen=True)
+class CompiledAnswerKey:
+    question_type: str
+    correct_option_ids: FrozenSet[int]
+    option_ids: FrozenSet[int]
+    correct_answer: Optional[bool] # TrueFalse
+    accepted: FrozenSet[str] # Normalized accepted answers
+    accepted_by_length: Tuple[Tuple[int, str], ...] # For fuzzy matching, sorted by length
+    pattern: Optional["re.Pattern"]
+    case_sensitive: bool
+    ignore_punctuation: bool
+    collapse_whitespace: bool
+    max_edit_distance: int
+
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+def normalize(text: str, case_sensitive: bool = False, ignore_punctuation: bool = True, collapse_whitespace: bool = True) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    if not case_sensitive:
+        text = text.casefold()
+    if ignore_punctuation:
+        text = text.translate(_PUNCTUATION)
+    if collapse_whitespace:
+        text = " ".join(text.split())
+    return text.strip()
+
+# Python's re has no timeout, so ShortAnswer patterns are matched only against answers up to
+# this length, and patterns with a quantified group that itself contains a quantifier, like
+# (a+)+ or (\w*)*, are rejected: those backtrack exponentially on a near-miss.
+PATTERN_MAX_INPUT_CHARS = 500
+_NESTED_QUANTIFIER = re.compile(r"\((?:[^()\\]|\\.)*(?:[+*]|\{\d*,\d*\})(?:[^()\\]|\\.)*\)(?:[+*]|\{\d*,\d*\})")
+
+def is_backtracking_pattern(pattern: str) -> bool:
+    return _NESTED_QUANTIFIER.search(pattern) is not None
+
+def compile_answer_key(question: Question) -> CompiledAnswerKey:
+    spec = question.answer_spec or {}
+    case_sensitive = spec.get("case_sensitive", False)
+    ignore_punctuation = spec.get("ignore_punctuation", True)
+    collapse_whitespace = spec.get("collapse_whitespace", True)
+    accepted = frozenset(
+        normalize(answer, case_sensitive, ignore_punctuation, collapse_whitespace)
+        for answer in spec.get("accepted_answers") or []
+    )
+    pattern = spec.get("pattern")
+    if pattern and is_backtracking_pattern(pattern):
+        pattern = None # Stored before the check existed: grade on accepted_answers only
+    return CompiledAnswerKey(
+        question_type=question.question_type,
+        correct_option_ids=frozenset(option.id for option in question.options if option.is_correct),
+        option_ids=frozenset(option.id for option in question.options),
+        correct_answer=spec.get("correct_answer"),
+        accepted=accepted,
+        accepted_by_length=tuple(sorted((len(answer), answer) for answer in accepted)),
+        pattern=re.compile(pattern, 0 if case_sensitive else re.IGNORECASE) if pattern else None,
+        case_sensitive=case_sensitive,
+        ignore_punctuation=ignore_punctuation,
+        collapse_whitespace=collapse_whitespace,
+        max_edit_distance=spec.get("max_edit_distance", 0),
+    )
+
+
+# --- Per-question cache ---
+# crud_question invalidates entries whenever a question, its answer spec or its options change.
+# That only reaches this worker, so an entry is also trusted for GRADING_CACHE_TTL_SECONDS at most.
+
+_CACHE_SIZE = 10_000
+_cache: "OrderedDict[int, Tuple[CompiledAnswerKey, float]]" = OrderedDict() # question_id -> (key, loaded at)
+_cache_lock = threading.Lock()
+
+def get_cached_answer_key(question_id: int) -> Optional[CompiledAnswerKey]:
+    with _cache_lock:
+        entry = _cache.get(question_id)
+        if entry is None:
+            return None
+        key, loaded_at = entry
+        if time.monotonic() - loaded_at >= settings.GRADING_CACHE_TTL_SECONDS:
+            del _cache[question_id]
+            return None
+        _cache.move_to_end(question_id)
+        return key
+
+def get_answer_key(question: Question) -> CompiledAnswerKey:
+    key = get_cached_answer_key(question.id)
+    if key is not None:
+        return key
+    key = compile_answer_key(question)
+    with _cache_lock:
+        _cache[question.id] = (key, time.monotonic())
+        _cache.move_to_end(question.id)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return key
+
+def invalidate(question_id: int) -> None:
+    with _cache_lock:
+        _cache.pop(question_id, None)
+
+
+# --- Built-in graders ---
+
+def within_edit_distance(a: str, b: str, limit: int) -> bool:
+    """Levenshtein distance <= limit, computed on a diagonal band with early exit."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    if limit == 0:
+        return a == b
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [limit + 1] * len(b)
+        low, high = max(1, i - limit), min(len(b), i + limit)
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        if min(current[low - 1:high + 1]) > limit:
+            return False
+        previous = current
+    return previous[len(b)] <= limit
+
+@register_grader("MCQ")
+def grade_mcq(key: CompiledAnswerKey, selected_option_id: Optional[int], user_answer_text: Optional[str]) -> Optional[bool]:
+    if not selected_option_id or selected_option_id not in key.option_ids:
+        return None # Not an option of this question
+    return selected_option_id in key.correct_option_ids
+
+_TRUE_WORDS = frozenset({"true", "t", "yes", "y", "1"})
+_FALSE_WORDS = frozenset({"false", "f", "no", "n", "0"})
+
+@register_grader("TrueFalse")
+def grade_true_false(key: CompiledAnswerKey, selected_option_id: Optional[int], user_answer_text: Optional[str]) -> Optional[bool]:
+    if key.correct_answer is None:
+        if key.option_ids: # Answer key kept as True/False options
+            return grade_mcq(key, selected_option_id, user_answer_text)
+        return None
+    if user_answer_text is None:
+        return None
+    answer = normalize(user_answer_text)
+    if answer in _TRUE_WORDS:
+        return key.correct_answer is True
+    if answer in _FALSE_WORDS:
+        return key.correct_answer is False
+    return False
+
+@register_grader("ShortAnswer")
+def grade_short_answer(key: CompiledAnswerKey, selected_option_id: Optional[int], user_answer_text: Optional[str]) -> Optional[bool]:
+    if not key.accepted and key.pattern is None:
+        return None # No answer key: manual grading
+    if user_answer_text is None:
+        return False
+    text = user_answer_text.strip()
+    if key.pattern is not None and len(text) <= PATTERN_MAX_INPUT_CHARS and key.pattern.fullmatch(text):
+        return True
+    answer = normalize(user_answer_text, key.case_sensitive, key.ignore_punctuation, key.collapse_whitespace)
+    if answer in key.accepted:
+        return True
+    limit = key.max_edit_distance
+    if limit:
+        for length, accepted in key.accepted_by_length:
+            if length > len(answer) + limit:
+                break
+            if within_edit_distance(answer, accepted, limit):
+                return True
+    return False
+
+
+# --- Public API ---
+
+def _grade(key: CompiledAnswerKey, selected_option_id: Optional[int], user_answer_text: Optional[str]) -> Optional[bool]:
+    grader = GRADERS.get(key.question_type)
+    if grader is None:
+        return None
+    return grader(key, selected_option_id, user_answer_text)
+
+def grade_answer(question: Question, selected_option_id: Optional[int] = None, user_answer_text: Optional[str] = None) -> Optional[bool]:
+    """Grades one answer. Uses the options loaded with the question, so no extra queries."""
+    return _grade(get_answer_key(question), selected_option_id, user_answer_text)
+
+def get_answer_keys(db: Session, question_ids: Iterable[int]) -> Dict[int, CompiledAnswerKey]:
+    """Compiled keys for many questions; cache misses are loaded with one query (question + options only)."""
+    keys = {}
+    misses = []
+    for question_id in set(question_ids):
+        key = get_cached_answer_key(question_id)
+        if key is None:
+            misses.append(question_id)
+        else:
+            keys[question_id] = key
+    if misses:
+        questions = db.query(Question).options(
+            lazyload("*"), selectinload(Question.options).lazyload("*")
+        ).filter(Question.id.in_(misses)).all()
+        for question in questions:
+            keys[question.id] = get_answer_key(question)
+    return keys
+
+def grade_many(db: Session, submissions: Sequence[Tuple[int, Optional[int], Optional[str]]]) -> List[Optional[bool]]:
+    """
+    Batch grading of (question_id, selected_option_id, user_answer_text) tuples.
+    Answer keys come from the cache (at most one query for the misses); unknown questions grade as None.
+    """
+    keys = get_answer_keys(db, (question_id for question_id, _, _ in submissions))
+    results = []
+    for question_id, selected_option_id, user_answer_text in submissions:
+        key = keys.get(question_id)
+        results.append(_grade(key, selected_option_id, user_answer_text) if key else None)
+    return results
@@ -0,0 +1,198 @@
+# backend/app/services/lesson_bodies.py
+"""
+Content-addressed, compressed storage for long lesson texts.
+
+  * A lesson text of at least LESSON_BODY_MIN_BYTES (UTF-8) is stored in `lesson_bodies` under
+    the SHA-256 of the text, compressed with LESSON_BODY_CODEC (zstd, or zlib); the lesson keeps
+    only the hash in `body_sha256`. Identical texts share one row, so cloned cohorts and copied
+    lessons cost nothing (a course clone copies the hash). Shorter texts stay inline in
+    `lessons.text_content`, where compression and a lookup would cost more than they save.
+  * `Lesson.text_content` reads through a per-worker LRU of decompressed texts, bounded to
+    LESSON_BODY_CACHE_BYTES and keyed by hash. Stored bodies never change, so the cache needs no
+    invalidation; listings warm it for all their lessons with one query (`prefetch`).
+  * Texts from before are moved in batches by the Alembic migration, or for a large table by
+    `python -m app.services.lesson_bodies migrate`, which can be interrupted and re-run.
+    `python -m app.services.lesson_bodies gc` removes bodies no lesson refers to any more.
+"""
+import argparse
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import zstandard
+from sqlalchemy import delete, exists, func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal, dialect_insert
+from app.models.lesson import Lesson
+from app.models.lesson_body import LessonBody
+
+lessons, bodies = Lesson.__table__, LessonBody.__table__
+
+ZSTD_LEVEL = 3
+ZLIB_LEVEL = 6
+
+# zstandard (de)compressors must not be shared between threads
+_local = threading.local()
+
+def _zstd():
+    if not hasattr(_local, "compressor"):
+        _local.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        _local.decompressor = zstandard.ZstdDecompressor()
+    return _local.compressor, _local.decompressor
+
+def compress(raw: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd()[0].compress(raw)
+    if codec == "zlib":
+        return zlib.compress(raw, ZLIB_LEVEL)
+    raise ValueError(f"Unknown lesson body codec '{codec}'")
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return _zstd()[1].decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown lesson body codec '{codec}'")
+
+def is_stored(text: Optional[str]) -> bool:
+    """Whether a text goes to lesson_bodies rather than inline."""
+    return text is not None and len(text.encode()) >= settings.LESSON_BODY_MIN_BYTES
+
+
+# --- Decompressed texts: bounded LRU, sha256 -> text ---
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+def _cache_get(sha256: str) -> Optional[str]:
+    with _cache_lock:
+        text = _cache.get(sha256)
+        if text is not None:
+            _cache.move_to_end(sha256)
+        return text
+
+def _cache_put(sha256: str, text: str) -> None:
+    global _cache_bytes
+    size = len(text) # Characters: close enough to the memory a str takes for the bound
+    if size > settings.LESSON_BODY_CACHE_BYTES:
+        return
+    with _cache_lock:
+        if sha256 in _cache:
+            return
+        _cache[sha256] = text
+        _cache_bytes += size
+        while _cache_bytes > settings.LESSON_BODY_CACHE_BYTES:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+# --- Writing ---
+
+def store(db: Session, text: str) -> str:
+    """Stores a text (once per content) and returns its hash. Runs in the caller's transaction."""
+    raw = text.encode()
+    sha256 = hashlib.sha256(raw).hexdigest()
+    db.execute(
+        dialect_insert(db, bodies)
+        .values(sha256=sha256, codec=settings.LESSON_BODY_CODEC, size=len(raw), data=compress(raw, settings.LESSON_BODY_CODEC))
+        .on_conflict_do_nothing(index_elements=["sha256"])
+    )
+    _cache_put(sha256, text)
+    return sha256
+
+def prepare(db: Session, values: Dict) -> Dict:
+    """
+    Turns `text_content` in a lesson's insert/update values into the lesson columns: the text
+    inline, or its stored body's hash. Runs in the caller's transaction.
+    """
+    if "text_content" in values:
+        text = values.pop("text_content")
+        if is_stored(text):
+            values["inline_text"], values["body_sha256"] = None, store(db, text)
+        else:
+            values["inline_text"], values["body_sha256"] = text, None
+    return values
+
+
+# --- Reading ---
+
+def load(db: Optional[Session], sha256: str) -> str:
+    """The text of a stored body, from the cache or decompressed from the database (a new session without `db`)."""
+    text = _cache_get(sha256)
+    if text is None:
+        session = db or SessionLocal()
+        try:
+            row = session.execute(select(bodies.c.codec, bodies.c.data).where(bodies.c.sha256 == sha256)).one()
+        finally:
+            if db is None:
+                session.close()
+        text = decompress(row.data, row.codec).decode()
+        _cache_put(sha256, text)
+    return text
+
+def prefetch(db: Session, lessons: Iterable) -> None:
+    """Warms the cache for every stored body of `lessons` that is not in it yet, in one query."""
+    missing = {lesson.body_sha256 for lesson in lessons if lesson.body_sha256 is not None}
+    with _cache_lock:
+        missing -= _cache.keys()
+    if not missing:
+        return
+    for row in db.execute(select(bodies.c.sha256, bodies.c.codec, bodies.c.data).where(bodies.c.sha256.in_(missing))):
+        _cache_put(row.sha256, decompress(row.data, row.codec).decode())
+
+
+# --- Maintenance ---
+
+def migrate_inline_texts(db: Session, batch_size: int = 500) -> int:
+    """
+    Moves inline texts of at least LESSON_BODY_MIN_BYTES into lesson_bodies, `batch_size`
+    lessons per transaction, and returns how many lessons were moved. Safe to re-run.
+    """
+    moved, after_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(lessons.c.id, lessons.c.text_content)
+            .where(lessons.c.id > after_id, lessons.c.text_content.is_not(None),
+                   func.length(lessons.c.text_content) >= settings.LESSON_BODY_MIN_BYTES // 4) # Characters take 1-4 bytes
+            .order_by(lessons.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            db.commit()
+            return moved
+        for lesson_id, text in rows:
+            if is_stored(text):
+                db.execute(update(lessons).where(lessons.c.id == lesson_id).values(text_content=None, body_sha256=store(db, text)))
+                moved += 1
+        db.commit()
+        after_id = rows[-1].id
+
+def collect_garbage(db: Session) -> int:
+    """Deletes the bodies no lesson refers to (e.g. after an edit or a purge). Returns how many."""
+    removed = db.execute(
+        delete(bodies).where(~exists().where(lessons.c.body_sha256 == bodies.c.sha256))
+    ).rowcount
+    db.commit()
+    return removed
+
+
+if __name__ == "__main__":
+    # Run in backend/: `python -m app.services.lesson_bodies migrate` moves texts stored inline before
+    # (e.g. after lowering LESSON_BODY_MIN_BYTES); `gc` from cron, after the purge
+    parser = argparse.ArgumentParser(description="Lesson body maintenance")
+    parser.add_argument("command", choices=["migrate", "gc"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        if args.command == "migrate":
+            print(f"Moved {migrate_inline_texts(session, batch_size=args.batch_size)} lesson texts to lesson_bodies")
+        else:
+            print(f"Removed {collect_garbage(session)} unreferenced lesson bodies")
+    finally:
+        session.close()
@@ -0,0 +1,111 @@
+# backend/app/services/lesson_order.py
+"""
+Fractional lesson positions. `Lesson.order` is a float and lessons are listed by
+(order, id), so (lessons deleted but not yet purged take no part):
+
+  * placing a lesson between two neighbours takes the midpoint of their positions: one
+    indexed lookup of the neighbour and one write, whatever the size of the course;
+  * when two neighbours are too close to split (or share a position, as integer orders from
+    before could), the course is renumbered 1, 2, 3, ... in one UPDATE and the midpoint is
+    taken again. Halving a gap of 1 reaches MIN_GAP after ~30 moves into the same spot;
+  * a whole new order (PUT /courses/{id}/lesson-order) is one UPDATE with a CASE over the IDs.
+"""
+from typing import List, Optional
+
+from sqlalchemy import case, func, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.models.lesson import Lesson
+
+lessons = Lesson.__table__
+
+STEP = 1.0 # Distance between positions after a renumbering, and of a lesson appended at the end
+MIN_GAP = 1e-9 # Neighbours closer than this are renumbered before a lesson goes between them
+
+
+def rebalance(db: Session, course_id: int) -> None:
+    """Renumbers the course's lessons STEP, 2*STEP, ... in their current order, in one statement."""
+    ranked = select(
+        lessons.c.id,
+        (func.row_number().over(order_by=(lessons.c.order, lessons.c.id)) * STEP).label("position"),
+    ).where(lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None)).subquery()
+    db.execute(update(lessons).where(lessons.c.id == ranked.c.id).values(order=ranked.c.position))
+
+def _anchor(db: Session, course_id: int, lesson_id: int, moving_id: Optional[int]) -> float:
+    if lesson_id == moving_id:
+        raise ValueError("A lesson cannot be placed next to itself")
+    order = db.execute(
+        select(lessons.c.order).where(lessons.c.id == lesson_id, lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None))
+    ).scalar()
+    if order is None:
+        raise ValueError(f"Lesson {lesson_id} is not in this course")
+    return order
+
+def _neighbour(db: Session, course_id: int, order: float, lesson_id: int, moving_id: Optional[int], after: bool) -> Optional[float]:
+    """Position of the lesson right after (or before) `lesson_id` in (order, id) order, skipping the moving one."""
+    key = tuple_(lessons.c.order, lessons.c.id)
+    query = select(lessons.c.order).where(
+        lessons.c.course_id == course_id,
+        lessons.c.deleted_at.is_(None),
+        key > tuple_(order, lesson_id) if after else key < tuple_(order, lesson_id),
+    )
+    if moving_id is not None:
+        query = query.where(lessons.c.id != moving_id)
+    if after:
+        query = query.order_by(lessons.c.order, lessons.c.id)
+    else:
+        query = query.order_by(lessons.c.order.desc(), lessons.c.id.desc())
+    return db.execute(query.limit(1)).scalar()
+
+def _between(lower: float, upper: Optional[float]) -> Optional[float]:
+    if upper is None:
+        return lower + STEP
+    if upper - lower < 2 * MIN_GAP:
+        return None # No room: renumber first
+    return (lower + upper) / 2
+
+def _try_position(db: Session, course_id: int, after_id: Optional[int], before_id: Optional[int],
+                  moving_id: Optional[int]) -> Optional[float]:
+    if after_id is not None:
+        order = _anchor(db, course_id, after_id, moving_id)
+        return _between(order, _neighbour(db, course_id, order, after_id, moving_id, after=True))
+    if before_id is not None:
+        order = _anchor(db, course_id, before_id, moving_id)
+        previous = _neighbour(db, course_id, order, before_id, moving_id, after=False)
+        return _between(0.0 if previous is None else previous, order) # Positions stay >= 0
+    query = select(func.max(lessons.c.order)).where(lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None))
+    if moving_id is not None:
+        query = query.where(lessons.c.id != moving_id)
+    last = db.execute(query).scalar()
+    return STEP if last is None else last + STEP
+
+def position(db: Session, course_id: int, after_id: Optional[int] = None, before_id: Optional[int] = None,
+             moving_id: Optional[int] = None) -> float:
+    """
+    Order value that puts a lesson right after `after_id`, right before `before_id`, or at the
+    end of the course. `moving_id` is the lesson being moved (left out of the neighbours).
+    Raises ValueError if the anchor lesson is not in the course. Runs in the caller's transaction.
+    """
+    value = _try_position(db, course_id, after_id, before_id, moving_id)
+    if value is None:
+        rebalance(db, course_id)
+        value = _try_position(db, course_id, after_id, before_id, moving_id)
+    return value
+
+def apply_order(db: Session, course_id: int, lesson_ids: List[int]) -> None:
+    """
+    Gives the course's lessons the positions STEP, 2*STEP, ... in the order of `lesson_ids`, which
+    must list every lesson of the course exactly once. Runs in the caller's transaction.
+    """
+    live = (lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None))
+    current = set(db.execute(select(lessons.c.id).where(*live)).scalars())
+    if len(lesson_ids) != len(set(lesson_ids)) or set(lesson_ids) != current:
+        raise ValueError("lesson_ids must list every lesson of the course exactly once")
+    if not lesson_ids:
+        return
+    positions = {lesson_id: (index + 1) * STEP for index, lesson_id in enumerate(lesson_ids)}
+    db.execute(
+        update(lessons)
+        .where(*live)
+        .values(order=case(positions, value=lessons.c.id))
+    )
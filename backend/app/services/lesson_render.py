@@ -0,0 +1,196 @@
+# backend/app/services/lesson_render.py
+"""
+Server-side rendering of lesson markdown (`text_content`) to HTML, served by
+GET /api/v1/lessons/{id}/rendered.
+
+  * Rendering uses markdown-it-py (CommonMark, plus tables and strikethrough) with raw HTML
+    disabled: HTML in a lesson is escaped, not passed through, and link targets are checked
+    by markdown-it (no javascript:, vbscript:, file: or non-image data: URLs). Links get
+    rel="nofollow noopener noreferrer".
+  * Renders are cached under (SHA-256 of the text, RENDERER): the text hash is the lesson's
+    `body_sha256` for stored texts (see app/services/lesson_bodies.py), so a cache hit does
+    not even load the text. A rendered text never changes; editing a lesson changes its key,
+    so there is nothing to invalidate, and changing the renderer's options (bump
+    RENDERER_VERSION) or upgrading markdown-it-py starts a new cache.
+  * Two tiers: a per-worker LRU bounded to RENDER_CACHE_MEMORY_BYTES, then files under
+    RENDER_CACHE_DIR/<RENDERER>/ shared by the workers of a server.
+  * Stampedes: create_lesson/update_lesson render the new text before their transaction
+    commits, so readers of an edited lesson find it rendered. Misses (cold servers, evicted
+    entries) are single-flight per worker: concurrent requests for one key wait for one render.
+  * `python -m app.services.lesson_render gc` removes other renderers' caches and files not
+    read for RENDER_CACHE_MAX_AGE_DAYS.
+"""
+import argparse
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+import markdown_it
+from markdown_it import MarkdownIt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RENDERER_VERSION = 1 # Bump when the rendering options below change
+RENDERER = f"v{RENDERER_VERSION}-markdown-it-{markdown_it.__version__}"
+
+_markdown = MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+
+def _render_link_open(renderer, tokens, index, options, env):
+    tokens[index].attrSet("rel", "nofollow noopener noreferrer")
+    return renderer.renderToken(tokens, index, options, env)
+
+_markdown.add_render_rule("link_open", _render_link_open)
+
+def render(text: str) -> str:
+    """Markdown to sanitized HTML. Uncached; see `rendered`."""
+    return _markdown.render(text)
+
+def text_key(text: str) -> str:
+    """The cache key of a text: its SHA-256, the same as its `body_sha256` when stored in lesson_bodies."""
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# --- Memory tier: bounded LRU, key -> HTML ---
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+def _memory_get(key: str) -> Optional[str]:
+    with _cache_lock:
+        html = _cache.get(key)
+        if html is not None:
+            _cache.move_to_end(key)
+        return html
+
+def _memory_put(key: str, html: str) -> None:
+    global _cache_bytes
+    size = len(html)
+    if size > settings.RENDER_CACHE_MEMORY_BYTES:
+        return
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = html
+        _cache_bytes += size
+        while _cache_bytes > settings.RENDER_CACHE_MEMORY_BYTES:
+            _, evicted = _cache.popitem(last=False)
+            _cache_bytes -= len(evicted)
+
+
+# --- Disk tier: RENDER_CACHE_DIR/<RENDERER>/<key[:2]>/<key>.html ---
+
+def _path_for(key: str) -> str:
+    return os.path.join(settings.RENDER_CACHE_DIR, RENDERER, key[:2], f"{key}.html")
+
+def _disk_get(key: str) -> Optional[str]:
+    path = _path_for(key)
+    try:
+        with open(path, encoding="utf-8") as cached_file:
+            html = cached_file.read()
+        os.utime(path) # Read recently: kept by the garbage collection
+    except FileNotFoundError:
+        return None
+    return html
+
+def _disk_put(key: str, html: str) -> None:
+    path = _path_for(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+            tmp_file.write(html)
+        os.replace(tmp_path, path) # Atomic: other workers never read a partial file
+    except OSError:
+        # The memory tier still has it; a full or read-only disk must not fail requests or writes
+        logger.warning("Could not write rendered lesson %s to %s", key, settings.RENDER_CACHE_DIR, exc_info=True)
+
+
+# --- Lookup ---
+
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+_WAIT_SECONDS = 10 # A waiter renders itself if the first request takes longer than this
+
+def rendered(key: str, load_text: Callable[[], str]) -> str:
+    """
+    The HTML of the text with `key`, from the memory tier, the disk tier, or rendered from
+    `load_text()` (called only then). Concurrent misses for one key in this worker render once.
+    """
+    html = _memory_get(key)
+    if html is not None:
+        return html
+    with _inflight_lock:
+        done = _inflight.get(key)
+        leader = done is None
+        if leader:
+            done = _inflight[key] = threading.Event()
+    if not leader:
+        done.wait(_WAIT_SECONDS)
+        html = _memory_get(key)
+        if html is not None:
+            return html
+    try:
+        html = _disk_get(key)
+        if html is None:
+            html = render(load_text())
+            _disk_put(key, html)
+        _memory_put(key, html)
+        return html
+    finally:
+        if leader:
+            with _inflight_lock:
+                del _inflight[key]
+            done.set()
+
+def prerender(text: Optional[str]) -> None:
+    """Renders a new lesson text into both tiers unless it is cached already (called by the crud layer on writes)."""
+    if text:
+        rendered(text_key(text), lambda: text)
+
+
+# --- Maintenance ---
+
+def collect_garbage(max_age_days: Optional[int] = None) -> int:
+    """
+    Removes the disk caches of other renderers and rendered files not read for `max_age_days`
+    (default RENDER_CACHE_MAX_AGE_DAYS). Returns the number of files removed.
+    """
+    if max_age_days is None:
+        max_age_days = settings.RENDER_CACHE_MAX_AGE_DAYS
+    removed = 0
+    if not os.path.isdir(settings.RENDER_CACHE_DIR):
+        return removed
+    cutoff = time.time() - max_age_days * 86400
+    for renderer_dir in os.scandir(settings.RENDER_CACHE_DIR):
+        if not renderer_dir.is_dir():
+            continue
+        if renderer_dir.name != RENDERER:
+            removed += sum(len(files) for _, _, files in os.walk(renderer_dir.path))
+            shutil.rmtree(renderer_dir.path, ignore_errors=True)
+            continue
+        for directory in os.scandir(renderer_dir.path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    # Run from cron, e.g. `python -m app.services.lesson_render gc` in backend/
+    parser = argparse.ArgumentParser(description="Rendered lesson cache maintenance")
+    parser.add_argument("command", choices=["gc"])
+    parser.add_argument("--max-age-days", type=int, default=None)
+    args = parser.parse_args()
+    print(f"Removed {collect_garbage(args.max_age_days)} rendered lessons from {settings.RENDER_CACHE_DIR}")
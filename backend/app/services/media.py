@@ -0,0 +1,288 @@
+# backend/app/services/media.py
+"""
+Self-hosted lesson media (videos), served by GET /api/v1/lessons/{id}/media.
+
+  * Storage is content-addressed: an upload is streamed to a temporary file under MEDIA_DIR
+    while it is hashed, then moved to MEDIA_DIR/<sha256[:2]>/<sha256>. A file uploaded twice
+    (or a lesson copied by a course clone) is stored once, and a stored file never changes,
+    so its SHA-256 is a strong ETag that every worker and server agrees on.
+  * The lesson -> file lookup, with the file's size and modification time, is cached in memory
+    for MEDIA_CACHE_TTL_SECONDS per worker. A player seeking through a video sends one range
+    request after another; none of them touches the database.
+  * Ranges: a single `Range: bytes=...` is answered with 206 (or 416), `If-Range` falls back to
+    the whole file when the client's copy is outdated and `If-None-Match` answers 304.
+    Multi-range requests get the whole file, which HTTP allows.
+  * Zero-copy: with MEDIA_ACCEL_REDIRECT set the response only carries an X-Accel-Redirect
+    header, and nginx sends the file with sendfile(2), ranges and conditionals included.
+    Without it the file is read with os.pread in CHUNK_SIZE pieces (uvicorn supports neither
+    of the ASGI zero-copy extensions).
+  * Files no lesson refers to any more (lesson purged, media replaced) are removed by the cron
+    entry point at the bottom of this module.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import AsyncIterator, Mapping, NamedTuple, Optional, Tuple, Union
+
+import anyio
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.lesson import Lesson
+
+lessons = Lesson.__table__
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024 # Bytes read and sent at a time when the app sends the file itself
+TMP_DIR = "tmp" # Uploads in progress, under MEDIA_DIR
+
+
+class MediaFile(NamedTuple):
+    sha256: str
+    size: int
+    media_type: str
+    last_modified: str # HTTP date
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.sha256}"'
+
+
+def relative_path(sha256: str) -> str:
+    return f"{sha256[:2]}/{sha256}"
+
+def path_for(sha256: str) -> str:
+    return os.path.join(settings.MEDIA_DIR, sha256[:2], sha256)
+
+
+# --- Uploads ---
+
+class UploadTooLarge(ValueError):
+    pass
+
+def _move_into_place(tmp_path: str, sha256: str) -> None:
+    path = path_for(sha256)
+    if os.path.exists(path):
+        os.utime(path) # Already stored: count as new for the garbage collection's grace period
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.replace(tmp_path, path)
+
+async def store_upload(chunks: AsyncIterator[bytes], max_bytes: int) -> Tuple[str, int]:
+    """
+    Streams an upload into the store and returns its (sha256, size). Raises UploadTooLarge if it
+    is larger than `max_bytes` and ValueError if it is empty; nothing is kept then.
+    """
+    tmp_dir = os.path.join(settings.MEDIA_DIR, TMP_DIR)
+    await anyio.to_thread.run_sync(lambda: os.makedirs(tmp_dir, exist_ok=True))
+    tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+    digest, size = hashlib.sha256(), 0
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Media files are limited to {max_bytes} bytes")
+                digest.update(chunk)
+                await out.write(chunk)
+        if size == 0:
+            raise ValueError("The upload is empty")
+        sha256 = digest.hexdigest()
+        await anyio.to_thread.run_sync(_move_into_place, tmp_path, sha256)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return sha256, size
+
+
+# --- Lookup cache: lesson ID -> (cached at, MediaFile or None) ---
+
+_CACHE_SIZE = 10_000
+_cache: "OrderedDict[int, Tuple[float, Optional[MediaFile]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def cached(lesson_id: int) -> Tuple[bool, Optional[MediaFile]]:
+    """(True, media) if the lesson's media (or its absence) is cached and fresh, else (False, None)."""
+    with _cache_lock:
+        entry = _cache.get(lesson_id)
+        if entry is None or time.monotonic() - entry[0] >= settings.MEDIA_CACHE_TTL_SECONDS:
+            return False, None
+        _cache.move_to_end(lesson_id)
+        return True, entry[1]
+
+def resolve(lesson_id: int) -> Optional[MediaFile]:
+    """The lesson's media file, or None if the lesson does not exist or has none. Blocking: fills the cache from the primary."""
+    db = SessionLocal()
+    try:
+        row = db.execute(
+            select(lessons.c.media_sha256, lessons.c.media_type)
+            .where(lessons.c.id == lesson_id, lessons.c.deleted_at.is_(None))
+        ).first()
+    finally:
+        db.close()
+    media_file = None
+    if row is not None and row.media_sha256 is not None:
+        try:
+            stat_result = os.stat(path_for(row.media_sha256))
+        except FileNotFoundError:
+            logger.warning("Media file %s of lesson %d is missing from %s", row.media_sha256, lesson_id, settings.MEDIA_DIR)
+        else:
+            media_file = MediaFile(row.media_sha256, stat_result.st_size, row.media_type,
+                                   formatdate(stat_result.st_mtime, usegmt=True))
+    with _cache_lock:
+        _cache[lesson_id] = (time.monotonic(), media_file)
+        _cache.move_to_end(lesson_id)
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return media_file
+
+def invalidate(*lesson_ids: int) -> None:
+    """Forgets the cached media of lessons whose media changed or that were deleted (this worker only)."""
+    with _cache_lock:
+        for lesson_id in lesson_ids:
+            _cache.pop(lesson_id, None)
+
+
+# --- Serving ---
+
+UNSATISFIABLE = "unsatisfiable"
+
+def parse_range(value: str, size: int) -> Union[None, str, Tuple[int, int]]:
+    """
+    The (first, last) byte positions of a single-range `Range` header, UNSATISFIABLE, or None
+    when the header is malformed or asks for several ranges (the whole file is sent then).
+    """
+    unit, _, spec = value.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if unit.strip().lower() != "bytes" or not dash or "," in spec:
+        return None
+    first, last = first.strip(), last.strip()
+    if not first: # Suffix range: the last N bytes
+        if not last.isdigit():
+            return None
+        if int(last) == 0 or size == 0:
+            return UNSATISFIABLE
+        return max(0, size - int(last)), size - 1
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start, end = int(first), int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        return UNSATISFIABLE
+    return start, min(end, size - 1)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+class MediaResponse(Response):
+    """Sends bytes `start`..`end` of a stored file (all of it for a 200)."""
+
+    def __init__(self, media_file: MediaFile, status_code: int, headers: Mapping[str, str],
+                 start: int = 0, end: Optional[int] = None, send_body: bool = True):
+        self.path = path_for(media_file.sha256)
+        self.start = start
+        self.end = media_file.size - 1 if end is None else end
+        self.send_body = send_body
+        self.status_code = status_code
+        self.media_type = media_file.media_type
+        self.background = None
+        self.body = b""
+        self.init_headers({**headers, "Content-Length": str(self.end - self.start + 1)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.end < self.start:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        fd = await anyio.to_thread.run_sync(os.open, self.path, os.O_RDONLY)
+        try:
+            offset = self.start
+            while offset <= self.end:
+                # pread: no shared file position, so one descriptor serves the whole response without seeks
+                chunk = await anyio.to_thread.run_sync(os.pread, fd, min(CHUNK_SIZE, self.end + 1 - offset), offset)
+                if not chunk:
+                    raise RuntimeError(f"Media file {self.path} is shorter than expected")
+                offset += len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": offset <= self.end})
+        finally:
+            os.close(fd)
+
+
+def media_response(media_file: MediaFile, method: str, request_headers: Mapping[str, str]) -> Response:
+    """The response to a GET or HEAD of a lesson's media, honoring Range, If-Range and If-None-Match."""
+    headers = {
+        "ETag": media_file.etag,
+        "Last-Modified": media_file.last_modified,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, no-cache", # The lesson's media can change: revalidate with the ETag
+    }
+    if settings.MEDIA_ACCEL_REDIRECT:
+        # nginx takes over from here: it applies the original Range and conditional headers itself
+        headers["X-Accel-Redirect"] = f"{settings.MEDIA_ACCEL_REDIRECT.rstrip('/')}/{relative_path(media_file.sha256)}"
+        return Response(status_code=200, headers=headers, media_type=media_file.media_type)
+
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, media_file.etag):
+        return Response(status_code=304, headers=headers)
+
+    send_body = method != "HEAD"
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    # If-Range: serve the range only if the client's copy is still current, else the whole file
+    if range_header and (if_range is None or if_range.strip() in (media_file.etag, media_file.last_modified)):
+        byte_range = parse_range(range_header, media_file.size)
+        if byte_range == UNSATISFIABLE:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{media_file.size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{media_file.size}"
+            return MediaResponse(media_file, 206, headers, start, end, send_body)
+    return MediaResponse(media_file, 200, headers, send_body=send_body)
+
+
+# --- Garbage collection ---
+
+def collect_garbage(db: Session, min_age_seconds: int = 3600) -> int:
+    """
+    Removes stored files no lesson refers to (deleted lessons still waiting for the purge keep
+    theirs) and abandoned uploads. Files younger than `min_age_seconds` are kept, since an upload
+    is stored before its lesson is updated. Returns the number of files removed.
+    """
+    referenced = set(db.execute(
+        select(lessons.c.media_sha256).where(lessons.c.media_sha256.is_not(None)).distinct()
+    ).scalars())
+    cutoff = time.time() - min_age_seconds
+    removed = 0
+    if not os.path.isdir(settings.MEDIA_DIR):
+        return removed
+    for directory in os.scandir(settings.MEDIA_DIR):
+        if not directory.is_dir():
+            continue
+        for entry in os.scandir(directory.path):
+            if entry.name in referenced or entry.stat().st_mtime > cutoff:
+                continue
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    # Run from cron, e.g. `python -m app.services.media` in backend/, after the purge
+    session = SessionLocal()
+    try:
+        print(f"Removed {collect_garbage(session)} unreferenced media files from {settings.MEDIA_DIR}")
+    finally:
+        session.close()
@@ -0,0 +1,83 @@
+# backend/app/services/ownership.py
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.option import Option
+from app.models.question import Question
+from app.models.quiz import Quiz
+
+# Maps any course, lesson, quiz, question or option ID to the course it belongs to and that
+# course's educator. One query walks the foreign keys up to the course (primary-key lookups
+# only) instead of loading the ORM chain `option.question.quiz.lesson.course`.
+# The parent of an entity cannot be changed through the API, so only deletes invalidate.
+
+KINDS = ("course", "lesson", "quiz", "question", "option")
+
+
+class Owner(NamedTuple):
+    course_id: int
+    educator_id: int
+
+
+def _owner_query(kind: str, entity_id: int):
+    query = select(Course.id, Course.educator_id)
+    if kind == "course":
+        return query.where(Course.id == entity_id)
+    query = query.join(Lesson, Lesson.course_id == Course.id)
+    if kind == "lesson":
+        return query.where(Lesson.id == entity_id)
+    query = query.join(Quiz, Quiz.lesson_id == Lesson.id)
+    if kind == "quiz":
+        return query.where(Quiz.id == entity_id)
+    query = query.join(Question, Question.quiz_id == Quiz.id)
+    if kind == "question":
+        return query.where(Question.id == entity_id)
+    if kind == "option":
+        return query.join(Option, Option.question_id == Question.id).where(Option.id == entity_id)
+    raise ValueError(f"Unknown ownership kind '{kind}'")
+
+
+# --- Bounded LRU cache ---
+# Misses (entity does not exist) are not cached, so a newly created entity resolves at once.
+
+_CACHE_SIZE = 50_000
+_cache: "OrderedDict[Tuple[str, int], Owner]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+def resolve(db: Session, kind: str, entity_id: int) -> Optional[Owner]:
+    """The owning course and educator of an entity, or None if it does not exist."""
+    key = (kind, entity_id)
+    with _cache_lock:
+        owner = _cache.get(key)
+        if owner is not None:
+            _cache.move_to_end(key)
+            return owner
+    row = db.execute(_owner_query(kind, entity_id)).first()
+    if row is None:
+        return None
+    owner = Owner(row[0], row[1])
+    with _cache_lock:
+        _cache[key] = owner
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return owner
+
+def invalidate(kind: str, entity_id: int) -> None:
+    with _cache_lock:
+        _cache.pop((kind, entity_id), None)
+
+def invalidate_course(course_id: int) -> None:
+    """Forgets every cached entity of a course (a course, lesson, quiz or question was deleted, taking its children with it)."""
+    with _cache_lock:
+        for key in [key for key, owner in _cache.items() if owner.course_id == course_id]:
+            del _cache[key]
+
+def clear() -> None:
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,290 @@
+# backend/app/services/prerequisite_graph.py
+import heapq
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.lesson import Lesson
+from app.models.prerequisite import Prerequisite
+
+# Every node of the graph is a single integer:
+#   lesson L          -> L * 3      (completed when the user completed L)
+#   course C (start)  -> C * 3 + 1  (requirements of C, inherited by all its lessons)
+#   course C (done)   -> C * 3 + 2  (completed when every lesson of C is completed)
+# "course X requires Y" is an edge from start(X); "Y is a course" targets done(Y).
+LESSON, COURSE_START, COURSE_DONE = 0, 1, 2
+
+
+def lesson_node(lesson_id: int) -> int:
+    return lesson_id * 3 + LESSON
+
+def course_start_node(course_id: int) -> int:
+    return course_id * 3 + COURSE_START
+
+def course_done_node(course_id: int) -> int:
+    return course_id * 3 + COURSE_DONE
+
+def source_node(node_type: str, node_id: int) -> int:
+    return lesson_node(node_id) if node_type == "lesson" else course_start_node(node_id)
+
+def target_node(node_type: str, node_id: int) -> int:
+    return lesson_node(node_id) if node_type == "lesson" else course_done_node(node_id)
+
+
+class PrerequisiteGraph:
+    """
+    Immutable snapshot of the prerequisite DAG in CSR form: `_targets[_offsets[i]:_offsets[i + 1]]`
+    are the nodes required by the i-th source node. Lesson membership of courses is loaded
+    lazily per course and kept next to the edges.
+    """
+
+    def __init__(self, edges: Iterable[Tuple[int, int]], lesson_courses: Dict[int, int]):
+        by_source: Dict[int, List[int]] = {}
+        for source, target in edges:
+            by_source.setdefault(source, []).append(target)
+        self._index: Dict[int, int] = {}
+        self._offsets = array("q", [0])
+        self._targets = array("q")
+        for position, source in enumerate(sorted(by_source)):
+            self._index[source] = position
+            self._targets.extend(sorted(by_source[source]))
+            self._offsets.append(len(self._targets))
+        self._lesson_course: Dict[int, int] = dict(lesson_courses)
+        self._course_lessons: Dict[int, Tuple[Tuple[int, int], ...]] = {} # course_id -> ((order, lesson_id), ...)
+        self._lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+
+    # --- Loading ---
+
+    @classmethod
+    def load(cls, db: Session) -> "PrerequisiteGraph":
+        rows = db.execute(
+            select(Prerequisite.node_type, Prerequisite.node_id, Prerequisite.required_type, Prerequisite.required_id)
+        ).all()
+        edges = [(source_node(r.node_type, r.node_id), target_node(r.required_type, r.required_id)) for r in rows]
+        lesson_ids = {r.node_id for r in rows if r.node_type == "lesson"} | {r.required_id for r in rows if r.required_type == "lesson"}
+        lesson_courses = {}
+        if lesson_ids:
+            lesson_courses = dict(db.execute(select(Lesson.id, Lesson.course_id).where(Lesson.id.in_(lesson_ids))).all())
+        return cls(edges, lesson_courses)
+
+    def course_lessons(self, db: Optional[Session], course_id: int) -> Tuple[Tuple[int, int], ...]:
+        """(order, lesson_id) pairs of a course, loaded once and then served from memory."""
+        lessons = self._course_lessons.get(course_id)
+        if lessons is None:
+            if db is None:
+                return ()
+            rows = db.execute(select(Lesson.order, Lesson.id).where(Lesson.course_id == course_id)).all()
+            lessons = tuple(sorted((row.order, row.id) for row in rows))
+            with self._lock:
+                self._course_lessons[course_id] = lessons
+                for _, lesson_id in lessons:
+                    self._lesson_course[lesson_id] = course_id
+        return lessons
+
+    def prefetch_course_lessons(self, db: Session, course_ids: Iterable[int], reload: bool = False) -> None:
+        """Loads the lesson lists of the given courses that are not cached yet (all of them with `reload`), in one query."""
+        missing = {course_id for course_id in course_ids if reload or course_id not in self._course_lessons}
+        if not missing:
+            return
+        loaded: Dict[int, List[Tuple[int, int]]] = {course_id: [] for course_id in missing}
+        for row in db.execute(select(Lesson.course_id, Lesson.order, Lesson.id).where(Lesson.course_id.in_(missing))):
+            loaded[row.course_id].append((row.order, row.id))
+        with self._lock:
+            for course_id, lessons in loaded.items():
+                for _, lesson_id in self._course_lessons.get(course_id, ()):
+                    self._lesson_course.pop(lesson_id, None)
+                self._course_lessons[course_id] = tuple(sorted(lessons))
+                for _, lesson_id in lessons:
+                    self._lesson_course[lesson_id] = course_id
+
+    def lesson_course(self, db: Optional[Session], lesson_id: int) -> Optional[int]:
+        course_id = self._lesson_course.get(lesson_id)
+        if course_id is None and db is not None:
+            course_id = db.execute(select(Lesson.course_id).where(Lesson.id == lesson_id)).scalar()
+            if course_id is not None:
+                self._lesson_course[lesson_id] = course_id
+        return course_id
+
+    # --- Adjacency ---
+
+    def explicit_requirements(self, node: int) -> array:
+        position = self._index.get(node)
+        if position is None:
+            return array("q")
+        return self._targets[self._offsets[position]:self._offsets[position + 1]]
+
+    def requirements(self, db: Optional[Session], node: int) -> List[int]:
+        """Explicit edges plus the implicit ones (lesson -> start of its course, course done -> its lessons)."""
+        kind, node_id = node % 3, node // 3
+        required = list(self.explicit_requirements(node))
+        if kind == LESSON:
+            course_id = self.lesson_course(db, node_id)
+            if course_id is not None:
+                required.append(course_start_node(course_id))
+        elif kind == COURSE_DONE:
+            required.extend(lesson_node(lesson_id) for _, lesson_id in self.course_lessons(db, node_id))
+        return required
+
+    def would_create_cycle(self, db: Session, source: int, target: int) -> bool:
+        """True if adding `source requires target` closes a cycle, i.e. `target` already depends on `source`."""
+        if source == target:
+            return True
+        seen = {target}
+        stack = [target]
+        while stack:
+            node = stack.pop()
+            for required in self.requirements(db, node):
+                if required == source:
+                    return True
+                if required not in seen:
+                    seen.add(required)
+                    stack.append(required)
+        return False
+
+    # --- Queries against a user's completed lessons ---
+
+    def _is_satisfied(self, db: Optional[Session], node: int, completed: Set[int], memo: Dict[int, bool]) -> bool:
+        cached = memo.get(node)
+        if cached is not None:
+            return cached
+        kind, node_id = node % 3, node // 3
+        if kind == LESSON:
+            result = node_id in completed
+        elif kind == COURSE_DONE:
+            lessons = self.course_lessons(db, node_id)
+            result = bool(lessons) and all(lesson_id in completed for _, lesson_id in lessons)
+        else: # Course start: its own requirements must be met
+            result = all(self._is_satisfied(db, required, completed, memo) for required in self.explicit_requirements(node))
+        memo[node] = result
+        return result
+
+    def missing_requirements(self, db: Optional[Session], lesson_id: int, course_id: int, completed: Set[int]) -> List[int]:
+        """Unsatisfied requirement nodes of a lesson (empty when the lesson can be taken)."""
+        memo: Dict[int, bool] = {}
+        node = lesson_node(lesson_id)
+        required = list(self.explicit_requirements(node)) + [course_start_node(course_id)]
+        return [r for r in required if not self._is_satisfied(db, r, completed, memo)]
+
+    def next_lessons(self, db: Optional[Session], course_ids: Iterable[int], completed: Set[int]) -> List[int]:
+        """Incomplete lessons of the given courses whose requirements are all satisfied, in course order."""
+        memo: Dict[int, bool] = {}
+        available = []
+        for course_id in course_ids:
+            if not self._is_satisfied(db, course_start_node(course_id), completed, memo):
+                continue
+            for lesson_id in self.lesson_order(db, course_id):
+                if lesson_id in completed:
+                    continue
+                node = lesson_node(lesson_id)
+                if all(self._is_satisfied(db, r, completed, memo) for r in self.explicit_requirements(node)):
+                    available.append(lesson_id)
+        return available
+
+    # --- Topological orders ---
+
+    def lesson_order(self, db: Optional[Session], course_id: int) -> List[int]:
+        """
+        Lessons of a course in dependency order, ties broken by `Lesson.order` then ID. Lessons
+        on a cycle (which `create_prerequisite` refuses) come last rather than being dropped.
+        """
+        lessons = self.course_lessons(db, course_id)
+        in_course = {lesson_id: (order, lesson_id) for order, lesson_id in lessons}
+        dependents: Dict[int, List[int]] = {}
+        indegree = dict.fromkeys(in_course, 0)
+        for lesson_id in in_course:
+            for required in self.explicit_requirements(lesson_node(lesson_id)):
+                if required % 3 == LESSON and required // 3 in in_course:
+                    dependents.setdefault(required // 3, []).append(lesson_id)
+                    indegree[lesson_id] += 1
+        heap = [in_course[lesson_id] for lesson_id, degree in indegree.items() if degree == 0]
+        heapq.heapify(heap)
+        ordered = []
+        while heap:
+            _, lesson_id = heapq.heappop(heap)
+            ordered.append(lesson_id)
+            for dependent in dependents.get(lesson_id, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(heap, in_course[dependent])
+        if len(ordered) < len(in_course): # A cycle slipped in: keep its lessons, in course order
+            placed = set(ordered)
+            ordered.extend(lesson_id for _, lesson_id in lessons if lesson_id not in placed)
+        return ordered
+
+    def course_order(self, db: Optional[Session] = None) -> List[int]:
+        """Courses that take part in prerequisites, prerequisite courses first."""
+        def course_of(node: int) -> Optional[int]:
+            return node // 3 if node % 3 != LESSON else self.lesson_course(db, node // 3)
+
+        dependents: Dict[int, Set[int]] = {}
+        courses: Set[int] = set()
+        for source, position in self._index.items():
+            source_course = course_of(source)
+            for target in self._targets[self._offsets[position]:self._offsets[position + 1]]:
+                target_course = course_of(target)
+                if source_course is None or target_course is None:
+                    continue
+                courses.update((source_course, target_course))
+                if source_course != target_course:
+                    dependents.setdefault(target_course, set()).add(source_course)
+        indegree = dict.fromkeys(courses, 0)
+        for targets in dependents.values():
+            for course_id in targets:
+                indegree[course_id] += 1
+        heap = [course_id for course_id, degree in indegree.items() if degree == 0]
+        heapq.heapify(heap)
+        ordered = []
+        while heap:
+            course_id = heapq.heappop(heap)
+            ordered.append(course_id)
+            for dependent in dependents.get(course_id, ()):
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    heapq.heappush(heap, dependent)
+        ordered.extend(sorted(courses.difference(ordered))) # Courses on a cycle, if any
+        return ordered
+
+
+# --- Process-wide cached graph ---
+# Each worker process keeps its own snapshot; crud functions that change edges or
+# lessons invalidate it so the next reader rebuilds from the database. Changes made through
+# other workers are picked up when the snapshot expires, PREREQUISITE_GRAPH_TTL_SECONDS after
+# it was loaded (the lesson lists loaded into it expire with it).
+
+_graph: Optional[PrerequisiteGraph] = None
+_graph_lock = threading.Lock()
+
+
+def _expired(graph: Optional[PrerequisiteGraph]) -> bool:
+    return graph is None or time.monotonic() - graph.loaded_at >= settings.PREREQUISITE_GRAPH_TTL_SECONDS
+
+def get_graph(db: Session) -> PrerequisiteGraph:
+    """The current snapshot. Callers that read it more than once should keep the one they got."""
+    global _graph
+    graph = _graph
+    if _expired(graph):
+        with _graph_lock:
+            if _expired(_graph):
+                _graph = PrerequisiteGraph.load(db)
+            graph = _graph
+    return graph
+
+def invalidate() -> None:
+    """Drops the whole snapshot (edges changed)."""
+    global _graph
+    with _graph_lock:
+        _graph = None
+
+def invalidate_course(course_id: int) -> None:
+    """Forgets the cached lesson list of one course (lessons added, removed or reordered)."""
+    graph = _graph
+    if graph is not None:
+        with graph._lock:
+            for _, lesson_id in graph._course_lessons.pop(course_id, ()):
+                graph._lesson_course.pop(lesson_id, None)
@@ -0,0 +1,206 @@
+# backend/app/services/purge.py
+"""
+Two-step deletion of courses and lessons.
+
+  1. Deleting marks the course or lesson and everything under it (lessons, quizzes,
+     questions) with `deleted_at`: one set-based UPDATE per level, nothing loaded into
+     Python. From then on the subtree is hidden from every read (see app/models/soft_delete.py);
+     its search documents and prerequisite edges are removed in the same transaction.
+  2. A background job purges the marked rows in batches of PURGE_BATCH_LESSONS lessons, one
+     transaction each: the batch's answers and progress are deleted on every user shard, then
+     one DELETE of the lessons takes their quizzes, questions, options and review items with it
+     through ON DELETE CASCADE. The course row goes last, with the users' dashboard summaries
+     and completion bitmaps of the course. Progress (lessons purged) and throughput are reported on the job and
+     logged per batch.
+
+A purge that was interrupted (e.g. the worker restarted) is finished by the cron entry point
+at the bottom of this module.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy import delete, func, select, true, update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core import jobs
+from app.crud import crud_user_answer, crud_user_progress, writes
+from app.database import SessionLocal
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.option import Option
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.review_item import ReviewItem
+from app.services import completion, dashboard, grading
+
+courses, lessons, quizzes = Course.__table__, Lesson.__table__, Quiz.__table__
+questions, options, review_items = Question.__table__, Option.__table__, ReviewItem.__table__
+
+logger = logging.getLogger(__name__)
+
+
+# --- Step 1: soft delete ---
+
+def _mark_quizzes_and_questions(db: Session, lesson_ids, deleted_at: datetime) -> None:
+    quiz_ids = select(quizzes.c.id).where(quizzes.c.lesson_id.in_(lesson_ids))
+    db.execute(update(quizzes).where(quizzes.c.lesson_id.in_(lesson_ids), quizzes.c.deleted_at.is_(None))
+               .values(deleted_at=deleted_at))
+    db.execute(update(questions).where(questions.c.quiz_id.in_(quiz_ids), questions.c.deleted_at.is_(None))
+               .values(deleted_at=deleted_at))
+
+def soft_delete_course(db: Session, course_id: int) -> Optional[List[int]]:
+    """
+    Marks the course and everything under it as deleted. Returns the IDs of its lessons, or
+    None if the course does not exist (or is already deleted). Runs in the caller's transaction.
+    """
+    deleted_at = datetime.now(timezone.utc)
+    marked = db.execute(
+        update(courses).where(courses.c.id == course_id, courses.c.deleted_at.is_(None))
+        .values(deleted_at=deleted_at).returning(courses.c.id)
+    ).scalar()
+    if marked is None:
+        return None
+    lesson_ids = db.execute(
+        update(lessons).where(lessons.c.course_id == course_id, lessons.c.deleted_at.is_(None))
+        .values(deleted_at=deleted_at).returning(lessons.c.id)
+    ).scalars().all()
+    _mark_quizzes_and_questions(db, select(lessons.c.id).where(lessons.c.course_id == course_id), deleted_at)
+    return lesson_ids
+
+def soft_delete_lesson(db: Session, lesson_id: int) -> Optional[int]:
+    """
+    Marks the lesson, its quiz and its questions as deleted. Returns the lesson's course ID, or
+    None if the lesson does not exist (or is already deleted). Runs in the caller's transaction.
+    """
+    deleted_at = datetime.now(timezone.utc)
+    course_id = db.execute(
+        update(lessons).where(lessons.c.id == lesson_id, lessons.c.deleted_at.is_(None))
+        .values(deleted_at=deleted_at).returning(lessons.c.course_id)
+    ).scalar()
+    if course_id is not None:
+        _mark_quizzes_and_questions(db, [lesson_id], deleted_at)
+    return course_id
+
+
+# --- Step 2: purge ---
+
+def _delete_lessons(db: Session, lesson_ids: List[int]) -> None:
+    if db.get_bind().dialect.name != "postgresql":
+        # SQLite only enforces foreign keys, and so ON DELETE CASCADE, with PRAGMA foreign_keys=ON:
+        # delete the levels below the lessons explicitly, leaves first
+        quiz_ids = select(quizzes.c.id).where(quizzes.c.lesson_id.in_(lesson_ids))
+        question_ids = select(questions.c.id).where(questions.c.quiz_id.in_(quiz_ids))
+        db.execute(delete(review_items).where(review_items.c.question_id.in_(question_ids)))
+        db.execute(delete(options).where(options.c.question_id.in_(question_ids)))
+        db.execute(delete(questions).where(questions.c.quiz_id.in_(quiz_ids)))
+        db.execute(delete(quizzes).where(quizzes.c.lesson_id.in_(lesson_ids)))
+    db.execute(delete(lessons).where(lessons.c.id.in_(lesson_ids)))
+
+def _purge_lessons(db: Session, condition, totals: Dict[str, Any], job: Optional[jobs.Job], batch_size: int) -> None:
+    """Purges the deleted lessons matching `condition`, `batch_size` at a time, one transaction per batch."""
+    while True:
+        started = time.perf_counter()
+        lesson_ids = db.execute(
+            select(lessons.c.id).where(condition, lessons.c.deleted_at.is_not(None)).order_by(lessons.c.id).limit(batch_size)
+        ).scalars().all()
+        if not lesson_ids:
+            return
+        question_ids = db.execute(
+            select(questions.c.id).join(quizzes, quizzes.c.id == questions.c.quiz_id).where(quizzes.c.lesson_id.in_(lesson_ids))
+        ).scalars().all()
+        with writes.transaction(db):
+            # Answers and progress may be on other shards, so they are not cascaded by the database
+            crud_user_answer.delete_answers_for_questions(db, question_ids)
+            crud_user_progress.delete_progress_for_lessons(db, lesson_ids)
+            _delete_lessons(db, lesson_ids)
+        for question_id in question_ids:
+            grading.invalidate(question_id)
+        totals["lessons"] += len(lesson_ids)
+        totals["questions"] += len(question_ids)
+        totals["batches"] += 1
+        if job:
+            job.advance(len(lesson_ids))
+        elapsed = time.perf_counter() - started
+        logger.info("Purged %d lessons (%d questions) in %.0f ms, %d lessons so far",
+                    len(lesson_ids), len(question_ids), elapsed * 1000, totals["lessons"])
+
+def _count_deleted_lessons(db: Session, condition) -> int:
+    return db.execute(
+        select(func.count()).select_from(lessons).where(condition, lessons.c.deleted_at.is_not(None))
+    ).scalar()
+
+def _finish(totals: Dict[str, Any], started: float) -> Dict[str, Any]:
+    totals["seconds"] = round(time.perf_counter() - started, 3)
+    totals["lessons_per_second"] = round(totals["lessons"] / totals["seconds"], 1) if totals["seconds"] else None
+    return totals
+
+def purge_course(db: Session, course_id: int, job: Optional[jobs.Job] = None,
+                 batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Purges a deleted course: its lessons batch by batch, then the course row. A live course is left alone."""
+    started = time.perf_counter()
+    totals = {"courses": 0, "lessons": 0, "questions": 0, "batches": 0}
+    if db.execute(select(courses.c.deleted_at).where(courses.c.id == course_id)).scalar() is None:
+        return _finish(totals, started)
+    condition = lessons.c.course_id == course_id
+    if job:
+        job.total = _count_deleted_lessons(db, condition) + 1
+    _purge_lessons(db, condition, totals, job, batch_size or settings.PURGE_BATCH_LESSONS)
+    with writes.transaction(db):
+        dashboard.delete_course(db, course_id) # The users' course summaries, on every shard
+        completion.delete_course(db, course_id)
+        totals["courses"] = db.execute(delete(courses).where(courses.c.id == course_id)).rowcount
+    if job:
+        job.advance()
+    return _finish(totals, started)
+
+def purge_lesson(db: Session, lesson_id: int, job: Optional[jobs.Job] = None) -> Dict[str, Any]:
+    """Purges a deleted lesson with its quiz, questions, options, answers and progress."""
+    started = time.perf_counter()
+    totals = {"courses": 0, "lessons": 0, "questions": 0, "batches": 0}
+    if job:
+        job.total = 1
+    _purge_lessons(db, lessons.c.id == lesson_id, totals, job, batch_size=1)
+    return _finish(totals, started)
+
+def purge_deleted(db: Session, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Purges everything still marked as deleted: deleted courses first, then lessons deleted on their own."""
+    started = time.perf_counter()
+    totals = {"courses": 0, "lessons": 0, "questions": 0, "batches": 0}
+    batch_size = batch_size or settings.PURGE_BATCH_LESSONS
+    course_ids = db.execute(select(courses.c.id).where(courses.c.deleted_at.is_not(None))).scalars().all()
+    for course_id in course_ids:
+        result = purge_course(db, course_id, batch_size=batch_size)
+        for key in ("courses", "lessons", "questions", "batches"):
+            totals[key] += result[key]
+    _purge_lessons(db, true(), totals, None, batch_size)
+    return _finish(totals, started)
+
+def _run_purge(job: jobs.Job, kind: str, entity_id: int) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        if kind == "course":
+            return purge_course(db, entity_id, job=job)
+        return purge_lesson(db, entity_id, job=job)
+    finally:
+        db.close()
+
+def schedule_purge(background_tasks: BackgroundTasks, kind: str, entity_id: int, owner_id: int) -> jobs.Job:
+    """Queues the purge of a deleted course or lesson to run after the response is sent; poll it via GET /api/v1/jobs/{id}."""
+    job = jobs.create_job("purge", owner_id=owner_id)
+    background_tasks.add_task(jobs.run_job, job, _run_purge, kind, entity_id)
+    return job
+
+
+if __name__ == "__main__":
+    # Run from cron, e.g. `python -m app.services.purge` in backend/, to finish interrupted purges
+    session = SessionLocal()
+    try:
+        result = purge_deleted(session)
+        print(f"Purged {result['courses']} courses and {result['lessons']} lessons "
+              f"({result['questions']} questions) in {result['seconds']} s")
+    finally:
+        session.close()
@@ -0,0 +1,124 @@
+# backend/app/services/regrade.py
+from typing import Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy import Table, bindparam, case, func, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.core import jobs
+from app.database import SessionLocal
+from app.models.option import Option
+from app.models.question import Question
+from app.services import answer_partitions, dashboard, grading, ownership, sharding
+
+# Rows touched per transaction; every chunk commits on its own so row locks on
+# user_answers are only held for one chunk at a time. Answers are regraded shard by shard;
+# the question and its options are always read from the primary. The change in correct answers
+# per user goes to their dashboard summaries in the same chunk transaction. On SQLite every
+# live period table is regraded in turn (see answer_partitions.live_answer_tables).
+CHUNK_SIZE = 5_000
+
+
+def _regrade_mcq(db: Session, shard: Session, answers: Table, question_id: int, course_id: int, job: Optional[jobs.Job], chunk_size: int) -> int:
+    """Set-based: the new grade is a CASE over the question's options inside the UPDATE, one statement per ID range."""
+    low, high = shard.execute(
+        select(func.min(answers.c.id), func.max(answers.c.id)).where(answers.c.question_id == question_id)
+    ).one()
+    if low is None:
+        return 0
+    # Options are on the primary, answers possibly on a shard: inline the (few) option grades
+    option_grades = dict(db.execute(select(Option.id, Option.is_correct).where(Option.question_id == question_id)).all())
+    new_grade = case(option_grades, value=answers.c.selected_option_id, else_=None) if option_grades else None
+    correct_options = [option_id for option_id, is_correct in option_grades.items() if is_correct]
+    gained = case((answers.c.selected_option_id.in_(correct_options), 1), else_=0) if correct_options else literal(0)
+    lost = case((answers.c.is_correct.is_(True), 1), else_=0)
+    changed = 0
+    for start in range(low, high + 1, chunk_size):
+        in_chunk = (answers.c.question_id == question_id, answers.c.id >= start, answers.c.id < start + chunk_size)
+        scanned = shard.execute(select(func.count()).select_from(answers).where(*in_chunk)).scalar()
+        deltas = shard.execute(
+            select(answers.c.user_id, func.sum(gained - lost))
+            .where(*in_chunk, answers.c.is_correct.is_distinct_from(new_grade)).group_by(answers.c.user_id)
+        ).all()
+        dashboard.apply_regrade(shard, course_id, dict(deltas))
+        result = shard.execute(
+            update(answers)
+            .where(*in_chunk, answers.c.is_correct.is_distinct_from(new_grade))
+            .values(is_correct=new_grade)
+            .execution_options(synchronize_session=False)
+        )
+        shard.commit()
+        changed += result.rowcount
+        if job:
+            job.advance(scanned)
+    return changed
+
+def _regrade_with_grader(db: Session, shard: Session, answers: Table, question_id: int, course_id: int, job: Optional[jobs.Job], chunk_size: int) -> int:
+    """Keyset-paginated batches graded in Python; only rows whose grade changes are written back."""
+    changed = 0
+    last_id = 0
+    statement = (
+        update(answers)
+        .where(answers.c.id == bindparam("answer_id"))
+        .values(is_correct=bindparam("new_grade"))
+        .execution_options(synchronize_session=False)
+    )
+    while True:
+        rows = shard.execute(
+            select(answers.c.id, answers.c.user_id, answers.c.selected_option_id, answers.c.user_answer_text, answers.c.is_correct)
+            .where(answers.c.question_id == question_id, answers.c.id > last_id)
+            .order_by(answers.c.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        grades = grading.grade_many(db, [(question_id, row.selected_option_id, row.user_answer_text) for row in rows])
+        updates, deltas = [], {}
+        for row, grade in zip(rows, grades):
+            if grade != row.is_correct:
+                updates.append({"answer_id": row.id, "new_grade": grade})
+                deltas[row.user_id] = deltas.get(row.user_id, 0) + (grade is True) - (row.is_correct is True)
+        if updates:
+            shard.connection().execute(statement, updates)
+            dashboard.apply_regrade(shard, course_id, deltas)
+        shard.commit()
+        changed += len(updates)
+        last_id = rows[-1].id
+        if job:
+            job.advance(len(rows))
+    return changed
+
+def regrade_question(db: Session, question_id: int, job: Optional[jobs.Job] = None, chunk_size: int = CHUNK_SIZE) -> dict:
+    """Recomputes `UserAnswer.is_correct` for every answer to a question after its answer key changed."""
+    question_type = db.execute(select(Question.question_type).where(Question.id == question_id)).scalar()
+    owner = ownership.resolve(db, "question", question_id)
+    if question_type is None or owner is None: # Deleted, possibly between the two lookups
+        return {"question_id": question_id, "answers_changed": 0}
+    course_id = owner.course_id
+    grading.invalidate(question_id)
+    if job:
+        def count(shard: Session) -> int:
+            answers = answer_partitions.live_answers(shard)
+            return shard.execute(select(func.count()).select_from(answers).where(answers.c.question_id == question_id)).scalar()
+
+        job.total = sum(sharding.gather(db, count))
+    regrade_shard = _regrade_mcq if question_type == "MCQ" else _regrade_with_grader
+    changed = 0
+    for shard_name in sharding.shard_names():
+        with sharding.shard_session(db, shard_name) as shard:
+            for answers in answer_partitions.live_answer_tables(shard): # One table per period on SQLite
+                changed += regrade_shard(db, shard, answers, question_id, course_id, job, chunk_size)
+    return {"question_id": question_id, "answers_changed": changed}
+
+def _run_regrade(job: jobs.Job, question_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        return regrade_question(db, question_id, job=job)
+    finally:
+        db.close()
+
+def schedule_regrade(background_tasks: BackgroundTasks, question_id: int, owner_id: int) -> jobs.Job:
+    """Queues a regrade to run after the response is sent; poll it via GET /api/v1/jobs/{id}."""
+    job = jobs.create_job("regrade", owner_id=owner_id)
+    background_tasks.add_task(jobs.run_job, job, _run_regrade, question_id)
+    return job
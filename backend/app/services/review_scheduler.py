@@ -0,0 +1,119 @@
+# backend/app/services/review_scheduler.py
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.question import Question
+from app.models.review_item import ReviewItem
+
+MIN_EASINESS = 1.3
+DEFAULT_EASINESS = 2.5
+# Penalty applied by the nightly batch to items that were never reviewed in time
+LAPSE_EASINESS_PENALTY = 0.2
+
+
+def quality_from_answer(is_correct: bool) -> int:
+    """Maps a graded answer to the SM-2 0-5 recall quality scale."""
+    return 4 if is_correct else 1
+
+def sm2(easiness: float, interval_days: int, repetitions: int, quality: int) -> Tuple[float, int, int]:
+    """One SM-2 step. Returns the new (easiness, interval_days, repetitions)."""
+    if quality < 3:
+        repetitions = 0
+        interval_days = 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = round(interval_days * easiness)
+        repetitions += 1
+    easiness = max(MIN_EASINESS, easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return easiness, interval_days, repetitions
+
+def record_answer(db: Session, user_id: int, question_id: int, is_correct: Optional[bool],
+                  answered_at: Optional[datetime] = None) -> Optional[ReviewItem]:
+    """
+    Applies a graded answer to the user's schedule for the question.
+    Runs in the caller's transaction; ungraded answers leave the schedule untouched.
+    The default schedule is inserted with ON CONFLICT DO NOTHING and the row is then locked, so
+    concurrent answers to a new item apply one after the other instead of failing on the unique key.
+    """
+    if is_correct is None:
+        return None
+    answered_at = answered_at or datetime.now(timezone.utc)
+    items = ReviewItem.__table__
+    statement = dialect_insert(db, items).values(
+        user_id=user_id, question_id=question_id, easiness=DEFAULT_EASINESS, interval_days=0,
+        repetitions=0, lapses=0, due_at=answered_at, lapse_at=answered_at,
+    )
+    is_new = db.execute(statement.on_conflict_do_nothing(
+        index_elements=[items.c.user_id, items.c.question_id]
+    ).returning(items.c.id)).first() is not None
+    item = db.query(ReviewItem).filter(
+        ReviewItem.user_id == user_id, ReviewItem.question_id == question_id
+    ).populate_existing().with_for_update().one()
+    quality = quality_from_answer(is_correct)
+    item.easiness, item.interval_days, item.repetitions = sm2(
+        item.easiness, item.interval_days, item.repetitions, quality
+    )
+    if quality < 3 and not is_new: # Forgot something that was learned before
+        item.lapses += 1
+    item.due_at = answered_at + timedelta(days=item.interval_days)
+    item.lapse_at = item.due_at + timedelta(days=item.interval_days)
+    item.last_reviewed_at = answered_at
+    return item
+
+def get_due_reviews(db: Session, user_id: int, limit: int = 20, now: Optional[datetime] = None) -> List[ReviewItem]:
+    """Next `limit` due items of a user, read in due order straight off the (user_id, due_at) index."""
+    now = now or datetime.now(timezone.utc)
+    # The join skips questions that were deleted but not yet purged (see app/models/soft_delete.py)
+    return db.query(ReviewItem).join(Question, Question.id == ReviewItem.question_id).filter(
+        ReviewItem.user_id == user_id, ReviewItem.due_at <= now
+    ).order_by(ReviewItem.due_at).limit(limit).all()
+
+def reschedule_overdue(db: Session, now: Optional[datetime] = None, chunk_size: int = 50_000) -> int:
+    """
+    Nightly batch: items left unreviewed past their `lapse_at` count as forgotten and restart
+    at a one-day interval with a lower easiness. Each chunk is a single set-based UPDATE over
+    an ID range, so the database applies the arithmetic to all rows at once and locks stay short.
+    Returns the number of rescheduled items.
+    """
+    now = now or datetime.now(timezone.utc)
+    lowered = ReviewItem.easiness - LAPSE_EASINESS_PENALTY
+    low, high = db.execute(select(func.min(ReviewItem.id), func.max(ReviewItem.id))).one()
+    if low is None:
+        return 0
+    total = 0
+    for start in range(low, high + 1, chunk_size):
+        result = db.execute(
+            update(ReviewItem)
+            .where(ReviewItem.id >= start, ReviewItem.id < start + chunk_size, ReviewItem.lapse_at < now)
+            .values(
+                easiness=case((lowered < MIN_EASINESS, MIN_EASINESS), else_=lowered),
+                interval_days=1,
+                repetitions=0,
+                lapses=ReviewItem.lapses + 1,
+                due_at=now,
+                lapse_at=now + timedelta(days=1),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+    return total
+
+
+if __name__ == "__main__":
+    # Run from cron, e.g. `python -m app.services.review_scheduler` in backend/
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Rescheduled {reschedule_overdue(session)} overdue review items")
+    finally:
+        session.close()
@@ -0,0 +1,317 @@
+# backend/app/services/search.py
+import html
+import re
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.lesson import Lesson
+from app.services import lesson_bodies
+
+# Document types stored in the search index
+DOC_TYPES = ("course", "lesson", "question")
+
+# Highlight markers wrapped around matched terms in titles and snippets. The index returns raw
+# educator text, so the backends mark matches with private-use characters; `search` escapes the
+# text as HTML and only then turns those into the tags.
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+_MARK_START = "\ue000"
+_MARK_STOP = "\ue001"
+
+
+class SearchBackend(ABC):
+    """Interface every full-text search implementation has to provide."""
+
+    @abstractmethod
+    def ensure_schema(self, db: Session) -> None:
+        """Creates the index structures if the backend manages them itself."""
+
+    @abstractmethod
+    def upsert(self, db: Session, doc_type: str, doc_id: int, course_id: int,
+               lesson_id: Optional[int], title: str, body: str) -> None:
+        """Adds or replaces a single document in the index."""
+
+    @abstractmethod
+    def index_course_tree(self, db: Session, course_id: int) -> None:
+        """Adds or replaces a course and every lesson/question under it, set-based from the tables."""
+
+    @abstractmethod
+    def remove(self, db: Session, doc_type: str, doc_id: int) -> None:
+        """Removes a single document from the index."""
+
+    @abstractmethod
+    def remove_by_course(self, db: Session, course_id: int) -> None:
+        """Removes a course and every lesson/question document under it."""
+
+    @abstractmethod
+    def remove_by_lesson(self, db: Session, lesson_id: int, doc_types: Sequence[str] = ("lesson", "question")) -> None:
+        """Removes documents belonging to a lesson (the lesson itself and its questions by default)."""
+
+    @abstractmethod
+    def search(self, db: Session, query: str, doc_types: Sequence[str] = DOC_TYPES,
+               limit: int = 20, offset: int = 0) -> List[dict]:
+        """Returns ranked, highlighted hits for a free-text query (best match first)."""
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    `tsvector` + GIN implementation. The `search_documents` table and its
+    generated `tsv` column are created by the Alembic migration.
+    """
+
+    def ensure_schema(self, db: Session) -> None:
+        pass # Managed by migrations
+
+    def upsert(self, db, doc_type, doc_id, course_id, lesson_id, title, body):
+        db.execute(
+            text(
+                "INSERT INTO search_documents (doc_type, doc_id, course_id, lesson_id, title, body) "
+                "VALUES (:doc_type, :doc_id, :course_id, :lesson_id, :title, :body) "
+                "ON CONFLICT (doc_type, doc_id) DO UPDATE SET "
+                "course_id = EXCLUDED.course_id, lesson_id = EXCLUDED.lesson_id, "
+                "title = EXCLUDED.title, body = EXCLUDED.body"
+            ),
+            {"doc_type": doc_type, "doc_id": doc_id, "course_id": course_id,
+             "lesson_id": lesson_id, "title": title, "body": body},
+        )
+
+    def index_course_tree(self, db, course_id):
+        db.execute(
+            text(
+                "INSERT INTO search_documents (doc_type, doc_id, course_id, lesson_id, title, body) "
+                "SELECT 'course', c.id, c.id, NULL, c.title, coalesce(c.description, '') "
+                "FROM courses c WHERE c.id = :course_id "
+                "UNION ALL "
+                "SELECT 'lesson', l.id, l.course_id, l.id, l.title, coalesce(l.text_content, '') "
+                "FROM lessons l WHERE l.course_id = :course_id "
+                "UNION ALL "
+                "SELECT 'question', q.id, l.course_id, l.id, q.question_text, coalesce(ob.body, '') "
+                "FROM questions q JOIN quizzes z ON z.id = q.quiz_id JOIN lessons l ON l.id = z.lesson_id "
+                "LEFT JOIN ("
+                "  SELECT o.question_id, string_agg(o.option_text, ' ' ORDER BY o.id) AS body "
+                "  FROM options o JOIN questions oq ON oq.id = o.question_id JOIN quizzes oz ON oz.id = oq.quiz_id "
+                "  JOIN lessons ol ON ol.id = oz.lesson_id WHERE ol.course_id = :course_id GROUP BY o.question_id"
+                ") ob ON ob.question_id = q.id "
+                "WHERE l.course_id = :course_id "
+                "ON CONFLICT (doc_type, doc_id) DO UPDATE SET "
+                "course_id = EXCLUDED.course_id, lesson_id = EXCLUDED.lesson_id, "
+                "title = EXCLUDED.title, body = EXCLUDED.body"
+            ),
+            {"course_id": course_id},
+        )
+
+    def remove(self, db, doc_type, doc_id):
+        db.execute(
+            text("DELETE FROM search_documents WHERE doc_type = :doc_type AND doc_id = :doc_id"),
+            {"doc_type": doc_type, "doc_id": doc_id},
+        )
+
+    def remove_by_course(self, db, course_id):
+        db.execute(text("DELETE FROM search_documents WHERE course_id = :course_id"), {"course_id": course_id})
+
+    def remove_by_lesson(self, db, lesson_id, doc_types=("lesson", "question")):
+        db.execute(
+            text("DELETE FROM search_documents WHERE lesson_id = :lesson_id AND doc_type = ANY(:doc_types)"),
+            {"lesson_id": lesson_id, "doc_types": list(doc_types)},
+        )
+
+    def search(self, db, query, doc_types=DOC_TYPES, limit=20, offset=0):
+        # Rank over the GIN-filtered matches first, then run the (expensive)
+        # ts_headline only on the page of rows actually returned.
+        options = f"StartSel={_MARK_START}, StopSel={_MARK_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+        rows = db.execute(
+            text(
+                "SELECT d.doc_type, d.doc_id, d.course_id, d.lesson_id, d.title, r.rank AS score, "
+                "ts_headline('english', d.title, r.q, 'HighlightAll=true, "
+                f"StartSel={_MARK_START}, StopSel={_MARK_STOP}') AS title_highlight, "
+                "ts_headline('english', coalesce(d.body, ''), r.q, :options) AS snippet "
+                "FROM ("
+                "  SELECT s.id, ts_rank_cd(s.tsv, q) AS rank, q "
+                "  FROM search_documents s, websearch_to_tsquery('english', :query) q "
+                "  WHERE s.tsv @@ q AND s.doc_type = ANY(:doc_types) "
+                "  ORDER BY rank DESC, s.id LIMIT :limit OFFSET :offset"
+                ") r JOIN search_documents d ON d.id = r.id "
+                "ORDER BY r.rank DESC, d.id"
+            ),
+            {"query": query, "doc_types": list(doc_types), "limit": limit, "offset": offset, "options": options},
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 implementation for local development and testing.
+    The rowid is derived from (doc_type, doc_id) so replacing a document is a
+    primary-key operation instead of a scan over the UNINDEXED columns.
+    """
+
+    _TYPE_CODES = {doc_type: code for code, doc_type in enumerate(DOC_TYPES)}
+    _TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+    def ensure_schema(self, db: Session) -> None:
+        db.execute(
+            text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents USING fts5("
+                "title, body, doc_type UNINDEXED, doc_id UNINDEXED, course_id UNINDEXED, lesson_id UNINDEXED, "
+                "tokenize = 'porter unicode61')"
+            )
+        )
+
+    def _rowid(self, doc_type: str, doc_id: int) -> int:
+        return doc_id * len(DOC_TYPES) + self._TYPE_CODES[doc_type]
+
+    def upsert(self, db, doc_type, doc_id, course_id, lesson_id, title, body):
+        db.execute(
+            text(
+                "INSERT OR REPLACE INTO search_documents (rowid, title, body, doc_type, doc_id, course_id, lesson_id) "
+                "VALUES (:rowid, :title, :body, :doc_type, :doc_id, :course_id, :lesson_id)"
+            ),
+            {"rowid": self._rowid(doc_type, doc_id), "title": title, "body": body, "doc_type": doc_type,
+             "doc_id": doc_id, "course_id": course_id, "lesson_id": lesson_id},
+        )
+
+    def index_course_tree(self, db, course_id):
+        # Same rowid formula as _rowid, computed in SQL
+        db.execute(
+            text(
+                "INSERT OR REPLACE INTO search_documents (rowid, title, body, doc_type, doc_id, course_id, lesson_id) "
+                "SELECT c.id * :types + :course_code, c.title, coalesce(c.description, ''), 'course', c.id, c.id, NULL "
+                "FROM courses c WHERE c.id = :course_id "
+                "UNION ALL "
+                "SELECT l.id * :types + :lesson_code, l.title, coalesce(l.text_content, ''), 'lesson', l.id, l.course_id, l.id "
+                "FROM lessons l WHERE l.course_id = :course_id "
+                "UNION ALL "
+                "SELECT q.id * :types + :question_code, q.question_text, coalesce(ob.body, ''), "
+                "  'question', q.id, l.course_id, l.id "
+                "FROM questions q JOIN quizzes z ON z.id = q.quiz_id JOIN lessons l ON l.id = z.lesson_id "
+                "LEFT JOIN ("
+                "  SELECT o.question_id, group_concat(o.option_text, ' ') AS body "
+                "  FROM options o JOIN questions oq ON oq.id = o.question_id JOIN quizzes oz ON oz.id = oq.quiz_id "
+                "  JOIN lessons ol ON ol.id = oz.lesson_id WHERE ol.course_id = :course_id GROUP BY o.question_id"
+                ") ob ON ob.question_id = q.id "
+                "WHERE l.course_id = :course_id"
+            ),
+            {"course_id": course_id, "types": len(DOC_TYPES), "course_code": self._TYPE_CODES["course"],
+             "lesson_code": self._TYPE_CODES["lesson"], "question_code": self._TYPE_CODES["question"]},
+        )
+
+    def remove(self, db, doc_type, doc_id):
+        db.execute(text("DELETE FROM search_documents WHERE rowid = :rowid"), {"rowid": self._rowid(doc_type, doc_id)})
+
+    def remove_by_course(self, db, course_id):
+        db.execute(text("DELETE FROM search_documents WHERE course_id = :course_id"), {"course_id": course_id})
+
+    def remove_by_lesson(self, db, lesson_id, doc_types=("lesson", "question")):
+        placeholders = ", ".join(f":t{i}" for i in range(len(doc_types)))
+        params = {f"t{i}": doc_type for i, doc_type in enumerate(doc_types)}
+        db.execute(
+            text(f"DELETE FROM search_documents WHERE lesson_id = :lesson_id AND doc_type IN ({placeholders})"),
+            {"lesson_id": lesson_id, **params},
+        )
+
+    def _match_expression(self, query: str) -> str:
+        # Quote every token so user input can never be parsed as FTS5 syntax;
+        # the last token is a prefix match to support search-as-you-type
+        # (only from 3 characters on, shorter prefixes expand to huge term lists).
+        tokens = self._TOKEN_RE.findall(query)
+        if not tokens:
+            return ""
+        terms = [f'"{token}"' for token in tokens]
+        if len(tokens[-1]) >= 3:
+            terms[-1] += "*"
+        return " ".join(terms)
+
+    def search(self, db, query, doc_types=DOC_TYPES, limit=20, offset=0):
+        match = self._match_expression(query)
+        if not match:
+            return []
+        placeholders = ", ".join(f":t{i}" for i in range(len(doc_types)))
+        params = {f"t{i}": doc_type for i, doc_type in enumerate(doc_types)}
+        # bm25() returns lower-is-better scores; title matches weigh 10x body matches
+        rows = db.execute(
+            text(
+                "SELECT doc_type, doc_id, course_id, lesson_id, title, "
+                "-bm25(search_documents, 10.0, 1.0) AS score, "
+                f"highlight(search_documents, 0, '{_MARK_START}', '{_MARK_STOP}') AS title_highlight, "
+                f"snippet(search_documents, 1, '{_MARK_START}', '{_MARK_STOP}', '…', 16) AS snippet "
+                "FROM search_documents "
+                f"WHERE search_documents MATCH :match AND doc_type IN ({placeholders}) "
+                "ORDER BY bm25(search_documents, 10.0, 1.0) LIMIT :limit OFFSET :offset"
+            ),
+            {"match": match, "limit": limit, "offset": offset, **params},
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+
+_BACKENDS = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SQLiteSearchBackend(),
+}
+_initialized_binds = set()
+
+
+def get_backend(db: Session) -> SearchBackend:
+    """Picks the search backend matching the session's database dialect."""
+    bind = db.get_bind()
+    backend = _BACKENDS.get(bind.dialect.name)
+    if backend is None:
+        raise NotImplementedError(f"Full-text search is not supported on '{bind.dialect.name}'")
+    if id(bind) not in _initialized_binds:
+        backend.ensure_schema(db)
+        _initialized_binds.add(id(bind))
+    return backend
+
+
+# --- Index maintenance helpers, called from the crud write functions ---
+# They run inside the caller's transaction, so the index never drifts from the rows.
+
+def index_course(db: Session, course) -> None:
+    get_backend(db).upsert(db, "course", course.id, course.id, None, course.title, course.description or "")
+
+def index_lesson(db: Session, lesson) -> None:
+    get_backend(db).upsert(db, "lesson", lesson.id, lesson.course_id, lesson.id, lesson.title, lesson.text_content or "")
+
+def index_question(db: Session, question) -> None:
+    # Option texts are searchable, but correctness is never part of the index
+    lesson = question.quiz.lesson
+    body = " ".join(option.option_text for option in question.options)
+    get_backend(db).upsert(db, "question", question.id, lesson.course_id, lesson.id, question.question_text, body)
+
+def index_course_tree(db: Session, course_id: int) -> None:
+    backend = get_backend(db)
+    backend.index_course_tree(db, course_id)
+    # The set-based pass only sees inline texts: index lessons with compressed ones again from Python
+    stored = db.query(Lesson).filter(Lesson.course_id == course_id, Lesson.body_sha256.is_not(None)).all()
+    lesson_bodies.prefetch(db, stored)
+    for lesson in stored:
+        backend.upsert(db, "lesson", lesson.id, lesson.course_id, lesson.id, lesson.title, lesson.text_content)
+
+def remove_course(db: Session, course_id: int) -> None:
+    get_backend(db).remove_by_course(db, course_id)
+
+def remove_lesson(db: Session, lesson_id: int) -> None:
+    get_backend(db).remove_by_lesson(db, lesson_id)
+
+def remove_quiz_questions(db: Session, question_ids: Sequence[int]) -> None:
+    # By ID: other quizzes of the same lesson keep their questions
+    backend = get_backend(db)
+    for question_id in question_ids:
+        backend.remove(db, "question", question_id)
+
+def remove_question(db: Session, question_id: int) -> None:
+    get_backend(db).remove(db, "question", question_id)
+
+def _highlight_html(value: Optional[str]) -> str:
+    """Escapes indexed text as HTML, then turns the backend's match markers into <mark> tags."""
+    escaped = html.escape(value or "")
+    return escaped.replace(_MARK_START, HIGHLIGHT_START).replace(_MARK_STOP, HIGHLIGHT_STOP)
+
+def search(db: Session, query: str, doc_types: Sequence[str] = DOC_TYPES, limit: int = 20, offset: int = 0) -> List[dict]:
+    hits = get_backend(db).search(db, query, doc_types=doc_types, limit=limit, offset=offset)
+    for hit in hits:
+        hit["title_highlight"] = _highlight_html(hit["title_highlight"])
+        hit["snippet"] = _highlight_html(hit["snippet"])
+    return hits
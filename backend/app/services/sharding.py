@@ -0,0 +1,370 @@
+# backend/app/services/sharding.py
+import argparse
+import bisect
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, UniqueConstraint, create_engine, delete, insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import engine, read_session
+from app.models.user_answer import UserAnswer
+from app.models.user_answer_claim import UserAnswerClaim
+from app.models.user_course_summary import UserCourseSummary
+from app.models.user_lesson_bitmap import UserLessonBitmap
+from app.models.user_progress import UserProgress
+from app.models.user_shard import UserShard
+from app.services import answer_partitions
+
+# user_answers and user_progress can live on several databases ("shards"), each user's rows
+# on exactly one. "main" is the primary database (DATABASE_URL); USER_SHARDS adds more.
+#
+# Placement is recorded in the user_shards directory on the primary; users without a row
+# are on "main", which is where all data lived before sharding. New users are placed by a
+# consistent-hash ring over every configured shard, so adding a shard never moves anyone by
+# itself: `python -m app.services.sharding rebalance` moves the users whose ring placement
+# changed, roughly 1/N of them. Workers cache placements for SHARD_DIRECTORY_TTL_SECONDS;
+# the rebalancer waits that long between steps so no worker writes to a stale shard.
+#
+# Only the user-keyed tables are sharded (with user_answer_claims, which belongs to user_answers,
+# user_course_summaries, which summarizes both, and user_lesson_bitmaps, derived from user_progress). Courses, questions, users and so on stay on
+# the primary, so shard sessions must never join or eagerly load into them.
+
+MAIN = "main"
+VIRTUAL_NODES = 64 # Ring points per shard; more points even out the share of each shard
+
+
+class ShardMoving(Exception):
+    """The user's data is being moved to another shard; writes are refused until it is done."""
+
+
+class HashRing:
+    def __init__(self, names: List[str], virtual_nodes: int = VIRTUAL_NODES):
+        points = sorted(
+            (self._hash(f"{name}#{replica}"), name) for name in names for replica in range(virtual_nodes)
+        )
+        self._keys = [key for key, _ in points]
+        self._names = [name for _, name in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+    def node_for(self, user_id: int) -> str:
+        index = bisect.bisect(self._keys, self._hash(str(user_id))) % len(self._keys)
+        return self._names[index]
+
+
+def _parse_shards(value: str) -> Dict[str, str]:
+    shards = {}
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        name, separator, url = entry.partition("=")
+        if not separator or not name.strip() or name.strip() == MAIN:
+            raise ValueError(f"USER_SHARDS entries must be name=url with a name other than '{MAIN}': {entry!r}")
+        shards[name.strip()] = url.strip()
+    return shards
+
+engines = {MAIN: engine}
+engines.update({name: create_engine(url, pool_pre_ping=True) for name, url in _parse_shards(settings.USER_SHARDS).items()})
+ring = HashRing(list(engines))
+# expire_on_commit=False: rows are still readable after their shard session is closed
+ShardSession = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+
+def enabled() -> bool:
+    return len(engines) > 1
+
+def shard_names() -> List[str]:
+    return list(engines)
+
+def archive_dir(name: str) -> str:
+    """Each shard archives its expired answer periods to its own directory."""
+    return settings.ANSWER_ARCHIVE_DIR if name == MAIN else f"{settings.ANSWER_ARCHIVE_DIR}/{name}"
+
+
+# --- Directory ---
+
+_placements: Dict[int, Tuple[str, bool, float]] = {} # user_id -> (shard, moving, fetched at)
+_placements_lock = threading.Lock()
+
+def placement(db: Session, user_id: int) -> Tuple[str, bool]:
+    """(shard, moving) for a user, read from the directory on the primary and cached briefly."""
+    if not enabled():
+        return MAIN, False
+    now = time.monotonic()
+    cached = _placements.get(user_id)
+    if cached is not None and now - cached[2] < settings.SHARD_DIRECTORY_TTL_SECONDS:
+        return cached[0], cached[1]
+    row = db.execute(select(UserShard.shard, UserShard.moving).where(UserShard.user_id == user_id)).first()
+    shard, moving = (row.shard, row.moving) if row else (MAIN, False)
+    if shard not in engines:
+        raise RuntimeError(f"User {user_id} is placed on unknown shard '{shard}'; check USER_SHARDS")
+    with _placements_lock:
+        if len(_placements) > 100_000:
+            _placements.clear()
+        _placements[user_id] = (shard, moving, now)
+    return shard, moving
+
+def assign(db: Session, user_id: int) -> None:
+    """Places a new user by the ring. Runs in the caller's transaction."""
+    if enabled():
+        db.add(UserShard(user_id=user_id, shard=ring.node_for(user_id)))
+
+def forget(user_id: int) -> None:
+    with _placements_lock:
+        _placements.pop(user_id, None)
+
+
+# --- Sessions ---
+
+@contextmanager
+def shard_session(db: Session, name: str) -> Iterator[Session]:
+    """The caller's session for "main", otherwise a session on the shard that is closed afterwards."""
+    if name == MAIN:
+        yield db
+        return
+    session = ShardSession(bind=engines[name])
+    try:
+        yield session
+    finally:
+        session.close()
+
+@contextmanager
+def user_session(db: Session, user_id: int, write: bool = False) -> Iterator[Session]:
+    """Session on the shard holding the user's answers and progress. `db` must be on the primary."""
+    shard, moving = placement(db, user_id)
+    if write and moving:
+        raise ShardMoving(f"User {user_id} is being moved to another shard")
+    with shard_session(db, shard) as session:
+        yield session
+
+@contextmanager
+def read_shard_session(name: str) -> Iterator[Session]:
+    """A standalone read session on a shard (a read replica for "main"), e.g. for streaming exports."""
+    session = read_session() if name == MAIN else ShardSession(bind=engines[name])
+    try:
+        yield session
+    finally:
+        session.close()
+
+def gather(db: Session, work: Callable[[Session], object], commit: bool = False) -> List[object]:
+    """
+    Scatter-gather for cross-user queries: runs `work` on every shard, the others in parallel,
+    and returns the results in shard order. "main" runs on `db` in the caller's transaction;
+    with `commit`, the other shards commit their part (the caller commits "main").
+    """
+    def run(name: str):
+        with shard_session(db, name) as session:
+            result = work(session)
+            if commit:
+                session.commit()
+            return result
+
+    others = [name for name in engines if name != MAIN]
+    if not others:
+        return [work(db)]
+    with ThreadPoolExecutor(max_workers=len(others)) as pool:
+        futures = [pool.submit(run, name) for name in others]
+        results = [work(db)]
+        results.extend(future.result() for future in futures)
+    return results
+
+
+# --- Shard schema ---
+
+def _shard_table(table: Table, metadata: MetaData) -> Table:
+    """A copy of a sharded table without foreign keys: what they point at is on the primary."""
+    copy = Table(table.name, metadata, *[
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable,
+               server_default=column.server_default.arg if column.server_default is not None else None)
+        for column in table.columns
+    ])
+    for index in table.indexes:
+        Index(index.name, *[copy.c[column.name] for column in index.columns], unique=index.unique)
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint): # As a unique index, which `init` can add to existing shards
+            Index(constraint.name, *[copy.c[column.name] for column in constraint.columns], unique=True)
+    return copy
+
+shard_metadata = MetaData()
+_shard_answers = _shard_table(UserAnswer.__table__, shard_metadata)
+_shard_progress = _shard_table(UserProgress.__table__, shard_metadata)
+_shard_claims = _shard_table(UserAnswerClaim.__table__, shard_metadata)
+_shard_summaries = _shard_table(UserCourseSummary.__table__, shard_metadata)
+_shard_bitmaps = _shard_table(UserLessonBitmap.__table__, shard_metadata)
+
+def init_shard(name: str) -> None:
+    """Creates the sharded tables on a shard (the primary gets them from the Alembic migrations)."""
+    shard_engine = engines[name]
+    if shard_engine.dialect.name == "postgresql":
+        # Same layout as the partitioned table on the primary (see migration 0d68ae8b0547)
+        with shard_engine.begin() as connection:
+            connection.execute(text("CREATE SEQUENCE IF NOT EXISTS user_answers_id_seq"))
+            connection.execute(text("""
+                CREATE TABLE IF NOT EXISTS user_answers (
+                    id INTEGER NOT NULL DEFAULT nextval('user_answers_id_seq'),
+                    user_id INTEGER NOT NULL,
+                    question_id INTEGER NOT NULL,
+                    selected_option_id INTEGER,
+                    user_answer_text TEXT,
+                    is_correct BOOLEAN,
+                    answered_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+                    CONSTRAINT user_answers_pkey PRIMARY KEY (id, answered_at)
+                ) PARTITION BY RANGE (answered_at)
+            """))
+            connection.execute(text("CREATE TABLE IF NOT EXISTS user_answers_default PARTITION OF user_answers DEFAULT"))
+        session = ShardSession(bind=shard_engine)
+        try:
+            answer_partitions.get_partitions(session).maintain(session, datetime.now(timezone.utc))
+        finally:
+            session.close()
+    # Idempotent: also adds tables and indexes introduced since the shard was created
+    with shard_engine.begin() as connection:
+        for table in shard_metadata.sorted_tables:
+            table.create(connection, checkfirst=True)
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+# --- Rebalancing ---
+
+def _copy_user(source: Session, target: Session, user_id: int) -> Tuple[int, int]:
+    """Copies a user's rows (every live answer period) to the target. Rows get new IDs there."""
+    target.execute(delete(UserAnswer.__table__).where(UserAnswer.user_id == user_id)) # Leftovers of an interrupted move
+    target.execute(delete(UserProgress.__table__).where(UserProgress.user_id == user_id))
+    target.execute(delete(UserAnswerClaim.__table__).where(UserAnswerClaim.user_id == user_id))
+    target.execute(delete(UserCourseSummary.__table__).where(UserCourseSummary.user_id == user_id))
+    target.execute(delete(UserLessonBitmap.__table__).where(UserLessonBitmap.user_id == user_id))
+    answers = [
+        {key: value for key, value in row.items() if key != "id"}
+        for row in answer_partitions.read_live_answers(source, user_id)
+    ]
+    progress = [
+        {key: value for key, value in row.items() if key != "id"}
+        for row in source.execute(select(UserProgress.__table__).where(UserProgress.user_id == user_id)).mappings()
+    ]
+    if answers:
+        target.execute(insert(UserAnswer.__table__), answers)
+    if progress:
+        target.execute(insert(UserProgress.__table__), progress)
+    claims = [dict(row) for row in source.execute(
+        select(UserAnswerClaim.__table__).where(UserAnswerClaim.user_id == user_id)
+    ).mappings()]
+    if claims:
+        target.execute(insert(UserAnswerClaim.__table__), claims)
+    summaries = [dict(row) for row in source.execute(
+        select(UserCourseSummary.__table__).where(UserCourseSummary.user_id == user_id)
+    ).mappings()]
+    if summaries:
+        target.execute(insert(UserCourseSummary.__table__), summaries)
+    bitmaps = [dict(row) for row in source.execute(
+        select(UserLessonBitmap.__table__).where(UserLessonBitmap.user_id == user_id)
+    ).mappings()]
+    if bitmaps:
+        target.execute(insert(UserLessonBitmap.__table__), bitmaps)
+    return len(answers), len(progress)
+
+def _delete_user(session: Session, user_id: int) -> None:
+    for table in answer_partitions.get_partitions(session).live_tables(session):
+        session.execute(text(f"DELETE FROM {table} WHERE user_id = :user_id"), {"user_id": user_id})
+    session.execute(delete(UserProgress.__table__).where(UserProgress.user_id == user_id))
+    session.execute(delete(UserAnswerClaim.__table__).where(UserAnswerClaim.user_id == user_id))
+    session.execute(delete(UserCourseSummary.__table__).where(UserCourseSummary.user_id == user_id))
+    session.execute(delete(UserLessonBitmap.__table__).where(UserLessonBitmap.user_id == user_id))
+
+def _set_placements(db: Session, moves: List[Tuple[int, str, str]], moving: bool, switch: bool) -> None:
+    for user_id, source, target in moves:
+        row = db.get(UserShard, user_id)
+        if row is None:
+            row = UserShard(user_id=user_id, shard=source)
+            db.add(row)
+        row.moving = moving
+        if switch:
+            row.shard, row.moved_from = target, source
+    db.commit()
+    for user_id, _, _ in moves:
+        forget(user_id)
+
+def _delete_moved(db: Session, user_ids: Optional[List[int]] = None) -> int:
+    """Deletes the rows left on the old shard of moved users, then clears `moved_from`."""
+    query = select(UserShard).where(UserShard.moved_from.is_not(None))
+    if user_ids is not None:
+        query = query.where(UserShard.user_id.in_(user_ids))
+    rows = db.execute(query).scalars().all()
+    for row in rows:
+        with shard_session(db, row.moved_from) as source:
+            _delete_user(source, row.user_id)
+            source.commit()
+        row.moved_from = None
+        db.commit()
+    return len(rows)
+
+def plan_moves(db: Session) -> List[Tuple[int, str, str]]:
+    """(user_id, current shard, ring shard) for every user not on their ring shard."""
+    from app.models.user import User
+
+    placed = dict(db.execute(select(UserShard.user_id, UserShard.shard)).all())
+    moves = []
+    for user_id in db.execute(select(User.id).order_by(User.id)).scalars():
+        current, target = placed.get(user_id, MAIN), ring.node_for(user_id)
+        if current != target:
+            moves.append((user_id, current, target))
+    return moves
+
+def rebalance(db: Session, batch_size: int = 100, wait: Optional[float] = None, log: Callable[[str], None] = print) -> int:
+    """
+    Moves users to their ring shard while the API keeps serving, one batch at a time:
+    mark the batch moving (its writes get 503), wait out the placement caches, copy,
+    switch the directory, wait again for readers of the old shard, then delete the old rows.
+    Safe to re-run after an interruption.
+    """
+    wait = settings.SHARD_DIRECTORY_TTL_SECONDS + 1 if wait is None else wait
+    leftovers = _delete_moved(db) # From a run that stopped between switching and deleting
+    if leftovers:
+        log(f"Cleaned up {leftovers} users moved by an earlier run")
+    moves = plan_moves(db)
+    log(f"{len(moves)} users to move")
+    for start in range(0, len(moves), batch_size):
+        batch = moves[start:start + batch_size]
+        _set_placements(db, batch, moving=True, switch=False)
+        time.sleep(wait)
+        for user_id, source, target in batch:
+            with shard_session(db, source) as source_session, shard_session(db, target) as target_session:
+                _copy_user(source_session, target_session, user_id)
+                target_session.commit()
+        _set_placements(db, batch, moving=False, switch=True)
+        time.sleep(wait)
+        _delete_moved(db, [user_id for user_id, _, _ in batch])
+        log(f"Moved {start + len(batch)}/{len(moves)}")
+    return len(moves)
+
+
+if __name__ == "__main__":
+    # Run in backend/: `python -m app.services.sharding init` after adding a shard to USER_SHARDS,
+    # then `python -m app.services.sharding rebalance` (safe to re-run if interrupted)
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="User shard maintenance")
+    parser.add_argument("command", choices=["init", "plan", "rebalance"])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        if args.command == "init":
+            for shard_name in shard_names():
+                if shard_name != MAIN:
+                    init_shard(shard_name)
+                    print(f"Initialized shard {shard_name}")
+        elif args.command == "plan":
+            for user_id, source, target in plan_moves(session):
+                print(f"user {user_id}: {source} -> {target}")
+        else:
+            rebalance(session, batch_size=args.batch_size)
+    finally:
+        session.close()
@@ -0,0 +1,139 @@
+# backend/benchmarks/completion_bitmaps.py
+"""
+Lesson completion bitmaps (app/services/completion.py) against reading user_progress, for one
+course taken by `--users` students.
+
+A throwaway SQLite database gets one course of `--lessons` lessons and `--users` students, each
+of whom completed a random run of lessons from the start with a few gaps. The bitmaps are built
+with `completion.rebuild`. Then:
+
+  * one student's completed lessons of the course: user_progress rows with their joined user
+    and lesson (as the ORM loads them) against one bitmap read, for `--samples` random students;
+  * "who completed lessons 1-N" (`--first`): GROUP BY ... HAVING over user_progress against an
+    AND per bitmap, with the bitmaps loaded from the database (cold) and from the worker cache;
+  * the storage: user_progress rows against bitmap bytes;
+  * a lesson completion through crud_user_progress (progress row, bitmap and dashboard summary).
+
+Run from backend/:  python -m benchmarks.completion_bitmaps [--users 100000] [--lessons 40]
+                                                           [--first 10] [--samples 500]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--lessons", type=int, default=40, help="lessons in the course")
+    parser.add_argument("--first", type=int, default=10, help="cohort query: who completed lessons 1..N")
+    parser.add_argument("--samples", type=int, default=500, help="single-student reads and writes")
+    return parser.parse_args()
+
+ARGS = parse_args()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'completion.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95)] * 1000
+
+def timed(work):
+    started = time.perf_counter()
+    result = work()
+    return result, time.perf_counter() - started
+
+
+def main():
+    from sqlalchemy import func, insert, select
+    from sqlalchemy.orm import joinedload
+
+    from app.crud import crud_user_progress
+    from app.database import Base, SessionLocal, engine
+    from app.models.course import Course
+    from app.models.lesson import Lesson
+    from app.models.user import User
+    from app.models.user_lesson_bitmap import UserLessonBitmap
+    from app.models.user_progress import UserProgress
+    from app.services import completion
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    # Fresh database: IDs are assigned in insert order, the educator is user 1
+    db.execute(insert(User), [{"username": f"user{index}", "email": f"user{index}@example.com", "hashed_password": "x",
+                               "is_educator": index == 0} for index in range(ARGS.users + 1)])
+    db.execute(insert(Course), [{"title": "Course", "educator_id": 1}])
+    db.execute(insert(Lesson), [{"course_id": 1, "title": f"Lesson {index}", "content_type": "text", "order": index}
+                                for index in range(ARGS.lessons)])
+    rng = random.Random(42)
+    progress = []
+    for user_id in range(2, ARGS.users + 2):
+        for lesson_id in range(1, rng.randint(0, ARGS.lessons) + 1):
+            if rng.random() < 0.95: # A few lessons skipped on the way
+                progress.append({"user_id": user_id, "lesson_id": lesson_id, "is_completed": True})
+    for start in range(0, len(progress), 50_000):
+        db.execute(insert(UserProgress), progress[start:start + 50_000])
+    db.commit()
+    rebuilt, rebuild_seconds = timed(lambda: completion.rebuild(db))
+
+    # One student's completed lessons of the course
+    students = [rng.randint(2, ARGS.users + 1) for _ in range(ARGS.samples)]
+    before, after = [], []
+    for user_id in students:
+        expected, seconds = timed(lambda: [
+            row.lesson.id for row in db.query(UserProgress)
+            .options(joinedload(UserProgress.user), joinedload(UserProgress.lesson))
+            .join(Lesson, Lesson.id == UserProgress.lesson_id)
+            .filter(UserProgress.user_id == user_id, UserProgress.is_completed.is_(True), Lesson.course_id == 1)
+            .order_by(Lesson.order, Lesson.id)
+        ])
+        before.append(seconds)
+        db.expunge_all()
+        lesson_ids, seconds = timed(lambda: completion.completed_lessons(*completion.user_bits(db, user_id, 1)))
+        after.append(seconds)
+        assert lesson_ids == expected, (user_id, lesson_ids, expected)
+
+    # Who completed lessons 1..N
+    first_lessons = list(range(1, ARGS.first + 1))
+    expected, sql_seconds = timed(lambda: sorted(db.execute(
+        select(UserProgress.user_id)
+        .where(UserProgress.is_completed.is_(True), UserProgress.lesson_id.in_(first_lessons))
+        .group_by(UserProgress.user_id).having(func.count() == len(first_lessons))
+    ).scalars()))
+    completion.forget()
+    (cohort, learners), cold_seconds = timed(lambda: completion.users_completing(db, 1, completion.layout(db, 1, fresh=True), range(ARGS.first)))
+    assert cohort == expected
+    cached = [timed(lambda: completion.users_completing(db, 1, completion.layout(db, 1, fresh=True), range(ARGS.first)))[1]
+              for _ in range(20)]
+
+    bitmap_bytes = db.execute(select(func.sum(func.length(UserLessonBitmap.completed)))).scalar()
+    writes = []
+    for user_id in students:
+        lesson_id = rng.randint(1, ARGS.lessons)
+        writes.append(timed(lambda: crud_user_progress.create_or_update_user_progress(db, user_id, lesson_id, is_completed=True))[1])
+    db.close()
+
+    print(f"{ARGS.users} students, {ARGS.lessons} lessons, {len(progress)} completed lessons; "
+          f"SQLite, {os.cpu_count()} CPU(s); rebuild wrote {rebuilt} bitmaps in {rebuild_seconds:.1f} s")
+    print(f"  storage              user_progress {len(progress):9d} rows   bitmaps {bitmap_bytes / 1024:8.1f} KB "
+          f"({bitmap_bytes / max(rebuilt, 1):.1f} B per student)")
+    print(f"  student's lessons    rows + joins {percentiles(before)[0]:7.2f}/{percentiles(before)[1]:7.2f} ms   "
+          f"bitmap {percentiles(after)[0]:7.2f}/{percentiles(after)[1]:7.2f} ms (p50/p95)")
+    print(f"  lessons 1-{ARGS.first:<3} cohort  GROUP BY {sql_seconds * 1000:8.1f} ms   bitmaps cold {cold_seconds * 1000:8.1f} ms   "
+          f"cached {statistics.median(cached) * 1000:6.1f} ms   ({len(cohort)} of {learners} students)")
+    print(f"  lesson completion    progress + bitmap + summary {percentiles(writes)[0]:5.2f}/{percentiles(writes)[1]:5.2f} ms (p50/p95)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# backend/benchmarks/course_clone.py
+"""
+Course cloning: the set-based clone of app.services.course_clone against an ORM deep copy
+(load Course.lessons -> quizzes -> questions -> options, build new objects, flush) for one
+large course.
+
+Run from backend/:  python -m benchmarks.course_clone [--lessons 1000] [--questions 5] [--options 4]
+                                                       [--database-url URL]
+Without --database-url a throwaway SQLite file is used. A PostgreSQL URL must point at an
+empty database: the benchmark creates and drops its tables there.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=5, help="questions per lesson quiz")
+    parser.add_argument("--options", type=int, default=4, help="options per question")
+    parser.add_argument("--database-url", default=None)
+    return parser.parse_args()
+
+ARGS = parse_args()
+if ARGS.database_url is None:
+    ARGS.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'clone.db')}"
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+os.environ["DATABASE_URL"] = ARGS.database_url
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+
+from sqlalchemy import event, insert, select
+
+import app.main # noqa: F401 (imports every model)
+from app.database import Base, SessionLocal, engine
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.option import Option
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.user import User
+from app.services import course_clone
+
+_statements = [0]
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    _statements[0] += 1
+
+
+def seed(db) -> int:
+    educator = db.scalars(insert(User).returning(User.id), [
+        {"username": "educator", "email": "educator@example.com", "hashed_password": "x", "is_educator": True}
+    ]).one()
+    course_id = db.scalars(insert(Course).returning(Course.id), [{"title": "Large course", "educator_id": educator}]).one()
+    lesson_ids = db.scalars(insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True), [
+        {"course_id": course_id, "title": f"Lesson {i}", "content_type": "quiz", "order": i, "text_content": "Lorem ipsum " * 40}
+        for i in range(ARGS.lessons)
+    ]).all()
+    quiz_ids = db.scalars(insert(Quiz).returning(Quiz.id, sort_by_parameter_order=True), [
+        {"lesson_id": lesson_id, "title": "Check yourself"} for lesson_id in lesson_ids
+    ]).all()
+    question_ids = db.scalars(insert(Question).returning(Question.id, sort_by_parameter_order=True), [
+        {"quiz_id": quiz_id, "question_text": f"Question {n} of quiz {quiz_id}?", "question_type": "MCQ"}
+        for quiz_id in quiz_ids for n in range(ARGS.questions)
+    ]).all()
+    db.execute(insert(Option), [
+        {"question_id": question_id, "option_text": f"Option {n}", "is_correct": n == 0}
+        for question_id in question_ids for n in range(ARGS.options)
+    ])
+    db.commit()
+    return course_id, educator
+
+
+def orm_deep_copy(db, course_id: int, educator_id: int) -> int:
+    """What cloning looks like without set-based SQL: the whole graph goes through Python."""
+    source = db.query(Course).filter(Course.id == course_id).first()
+    copy = Course(title=f"{source.title} (copy)", description=source.description, educator_id=educator_id)
+    for lesson in source.lessons:
+        new_lesson = Lesson(title=lesson.title, content_type=lesson.content_type, content_url=lesson.content_url,
+                            text_content=lesson.text_content, order=lesson.order)
+        copy.lessons.append(new_lesson)
+        for quiz in lesson.quizzes:
+            new_quiz = Quiz(title=quiz.title, description=quiz.description)
+            new_lesson.quizzes.append(new_quiz)
+            for question in quiz.questions:
+                new_question = Question(question_text=question.question_text, question_type=question.question_type,
+                                        answer_spec=question.answer_spec)
+                new_quiz.questions.append(new_question)
+                for option in question.options:
+                    new_question.options.append(Option(option_text=option.option_text, is_correct=option.is_correct))
+    db.add(copy)
+    db.commit()
+    return copy.id
+
+
+def measure(name, clone):
+    db = SessionLocal()
+    _statements[0] = 0
+    start = time.perf_counter()
+    clone(db)
+    elapsed = time.perf_counter() - start
+    db.close()
+    print(f"{name:<12}{elapsed * 1000:>10.0f}{_statements[0]:>12}")
+
+
+def main():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    course_id, educator_id = seed(db)
+    db.close()
+    rows = ARGS.lessons * (2 + ARGS.questions * (1 + ARGS.options))
+    print(f"{engine.dialect.name}, {ARGS.lessons} lessons with a {ARGS.questions}-question quiz each, "
+          f"{ARGS.options} options per question ({rows} rows per copy)")
+    print(f"{'path':<12}{'ms':>10}{'statements':>12}")
+    measure("set-based", lambda db: course_clone.clone_course(db, course_id, educator_id))
+    measure("orm copy", lambda db: orm_deep_copy(db, course_id, educator_id))
+    with engine.connect() as connection:
+        copies = connection.execute(select(Lesson.course_id).distinct()).all()
+    assert len(copies) == 3, copies
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# backend/benchmarks/dashboard.py
+"""
+The "my learning" dashboard: GET /api/v1/progress/me/dashboard, served from user_course_summaries,
+against what a client had to do before (GET /progress/me, GET /courses/ and GET /progress/answers/me,
+then compute the percentages itself), and the cost the summaries add to each progress write.
+
+A throwaway SQLite database gets `--courses` courses of `--lessons` lessons, each course with a
+quiz of three questions. One learner completes a random share of every course's lessons and
+answers every quiz through the crud layer (writes timed with and without the summary and
+completion bitmap upkeep, the latter by a second learner with those hooks disabled). Reads go
+through the app in-process (fastapi.testclient) and report p50/p95 latency and the SQL
+statements per call.
+
+Run from backend/:  python -m benchmarks.dashboard [--courses 300] [--lessons 20] [--requests 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=300)
+    parser.add_argument("--lessons", type=int, default=20, help="lessons per course")
+    parser.add_argument("--requests", type=int, default=50)
+    return parser.parse_args()
+
+ARGS = parse_args()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'dashboard.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+QUESTIONS = 3 # Per course quiz, two options each
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1000, samples[int(len(samples) * 0.95)] * 1000
+
+
+def main():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, insert
+
+    from app.crud import crud_user, crud_user_answer, crud_user_progress
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.course import Course
+    from app.models.lesson import Lesson
+    from app.models.option import Option
+    from app.models.question import Question
+    from app.models.quiz import Quiz
+    from app.schemas.user import UserCreate
+    from app.schemas.user_answer import UserAnswerCreate
+    from app.services import completion, dashboard, prerequisite_graph
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    educator = crud_user.create_user(db, UserCreate(username="educator", email="educator@example.com",
+                                                    password="password123", is_educator=True))
+    learner = crud_user.create_user(db, UserCreate(username="learner", email="learner@example.com", password="password123"))
+    baseline = crud_user.create_user(db, UserCreate(username="baseline", email="baseline@example.com", password="password123"))
+    # Fresh database: IDs are assigned in insert order
+    db.execute(insert(Course), [{"title": f"Course number {index}", "educator_id": educator.id} for index in range(ARGS.courses)])
+    db.execute(insert(Lesson), [{"course_id": course_id, "title": f"Lesson {index}", "content_type": "text", "order": index}
+                                for course_id in range(1, ARGS.courses + 1) for index in range(ARGS.lessons)])
+    db.execute(insert(Quiz), [{"lesson_id": (course_id - 1) * ARGS.lessons + 1, "title": "Quiz"} for course_id in range(1, ARGS.courses + 1)])
+    db.execute(insert(Question), [{"quiz_id": quiz_id, "question_text": f"Question {index}", "question_type": "MCQ"}
+                                  for quiz_id in range(1, ARGS.courses + 1) for index in range(QUESTIONS)])
+    db.execute(insert(Option), [{"question_id": question_id, "option_text": text, "is_correct": text == "right"}
+                                for question_id in range(1, ARGS.courses * QUESTIONS + 1) for text in ("right", "wrong")])
+    db.commit()
+
+    rng = random.Random(42)
+    plan = []
+    for course_id in range(1, ARGS.courses + 1):
+        first = (course_id - 1) * ARGS.lessons + 1
+        plan.extend(range(first, first + rng.randint(0, ARGS.lessons)))
+    rng.shuffle(plan)
+    hooks = dashboard.lock_course, dashboard.record_progress, completion.record_progress
+
+    def write_progress(user_id):
+        samples = []
+        for lesson_id in plan:
+            started = time.perf_counter()
+            crud_user_progress.create_or_update_user_progress(db, user_id=user_id, lesson_id=lesson_id, is_completed=True)
+            samples.append(time.perf_counter() - started)
+        return percentiles(samples)
+
+    with_summary = write_progress(learner.id)
+    dashboard.lock_course, dashboard.record_progress, completion.record_progress = (lambda *args: None,) * 3
+    without_summary = write_progress(baseline.id)
+    dashboard.lock_course, dashboard.record_progress, completion.record_progress = hooks
+    for question_id in range(1, ARGS.courses * QUESTIONS + 1):
+        option_id = (question_id - 1) * 2 + 1 + rng.randint(0, 1)
+        crud_user_answer.create_user_answer(db, UserAnswerCreate(question_id=question_id, selected_option_id=option_id), learner.id)
+    db.close()
+
+    client = TestClient(app)
+    token = client.post("/api/v1/token", data={"username": "learner", "password": "password123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.__setitem__(0, statements[0] + 1))
+
+    def measure(paths, before=None):
+        samples, counts = [], []
+        for _ in range(ARGS.requests):
+            if before:
+                before()
+            statements[0] = 0
+            started = time.perf_counter()
+            for path in paths:
+                response = client.get(path, headers=headers)
+                assert response.status_code == 200, response.text
+            samples.append(time.perf_counter() - started)
+            counts.append(statements[0])
+        return percentiles(samples), statistics.median(counts)
+
+    client.get("/api/v1/progress/me/dashboard", headers=headers) # Warm up the lesson lists
+    results = [
+        ("dashboard, lesson lists cached", measure(["/api/v1/progress/me/dashboard"])),
+        ("dashboard, lesson lists cold", measure(["/api/v1/progress/me/dashboard"], before=prerequisite_graph.invalidate)),
+        ("before: progress + courses + answers", measure([
+            f"/api/v1/progress/me?limit={len(plan)}", f"/api/v1/courses/?limit={ARGS.courses}",
+            f"/api/v1/progress/answers/me?limit={ARGS.courses * QUESTIONS}",
+        ])),
+    ]
+    print(f"{ARGS.courses} courses x {ARGS.lessons} lessons, {len(plan)} lessons completed, "
+          f"{ARGS.courses * QUESTIONS} answers; SQLite, in-process, {os.cpu_count()} CPU(s)")
+    print(f"  lesson completion write   with summary {with_summary[0]:5.2f}/{with_summary[1]:5.2f} ms   "
+          f"without {without_summary[0]:5.2f}/{without_summary[1]:5.2f} ms (p50/p95)")
+    for name, ((p50, p95), count) in results:
+        print(f"  {name:38} {p50:7.1f}/{p95:7.1f} ms  {count:5.0f} SQL statements")
+
+
+if __name__ == "__main__":
+    main()
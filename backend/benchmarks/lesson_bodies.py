@@ -0,0 +1,155 @@
+# backend/benchmarks/lesson_bodies.py
+"""
+Lesson text storage: texts inline in lessons.text_content against compressed, content-addressed
+lesson_bodies (zstd and zlib), for one course cloned into several cohorts.
+
+For each layout a throwaway SQLite database gets a course of `--lessons` text lessons (made-up
+English-like text with markdown, `--words` words each, created through crud_lesson), cloned
+`--cohorts` times with app.services.course_clone. Reported: the size of lessons and lesson_bodies
+(indexes included, after VACUUM), the latency of reading a lesson and its text (cold: body cache
+empty; warm) and of listing a 100-lesson course page with an empty cache.
+
+Run from backend/:  python -m benchmarks.lesson_bodies [--lessons 500] [--cohorts 10] [--words 800]
+                                                       [--reads 2000]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lessons", type=int, default=500)
+    parser.add_argument("--cohorts", type=int, default=10, help="clones of the course")
+    parser.add_argument("--words", type=int, default=800, help="words per lesson text")
+    parser.add_argument("--reads", type=int, default=2000)
+    return parser.parse_args()
+
+ARGS = parse_args()
+_tmp = tempfile.mkdtemp()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'unused.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.main # noqa: F401 (imports every model)
+from app.config import settings
+from app.crud import crud_course, crud_lesson, crud_user
+from app.database import Base
+from app.schemas.course import CourseCreate
+from app.schemas.lesson import LessonCreate
+from app.schemas.user import UserCreate
+from app.services import course_clone, lesson_bodies
+
+LAYOUTS = {"inline": None, "zstd": "zstd", "zlib": "zlib"}
+
+
+def make_texts(rng: random.Random):
+    syllables = ["ka", "lo", "mi", "tra", "en", "sul", "po", "rin", "da", "ve", "cho", "ist", "un", "ber", "o", "ta"]
+    vocabulary = ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(3000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))] # Zipf-like, as in natural text
+    texts = []
+    for index in range(ARGS.lessons):
+        words = rng.choices(vocabulary, weights, k=ARGS.words)
+        parts, position = [f"# Lesson {index + 1}\n"], 0
+        while position < len(words):
+            sentence = words[position:position + rng.randint(6, 18)]
+            position += len(sentence)
+            parts.append(" ".join(sentence).capitalize() + (".\n\n" if rng.random() < 0.2 else ". "))
+            if rng.random() < 0.03:
+                parts.append(f"\n## {' '.join(rng.choices(vocabulary, weights, k=3)).title()}\n\n")
+            if rng.random() < 0.02:
+                parts.append(f"\n```python\nresult = {rng.choice(vocabulary)}({rng.randint(1, 99)})\n```\n\n")
+        texts.append("".join(parts))
+    return texts
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (statistics.median(samples) * 1e6, samples[int(len(samples) * 0.95)] * 1e6)
+
+def run(layout: str, texts):
+    path = os.path.join(_tmp, f"{layout}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    codec = LAYOUTS[layout]
+    settings.LESSON_BODY_MIN_BYTES = 10 ** 12 if codec is None else 1024
+    settings.LESSON_BODY_CODEC = codec or "zstd"
+
+    db = Session()
+    educator = crud_user.create_user(db, UserCreate(username="educator", email="educator@example.com",
+                                                    password="password123", is_educator=True))
+    course = crud_course.create_course(db, CourseCreate(title="Text course"), educator_id=educator.id)
+    started = time.perf_counter()
+    for index, text in enumerate(texts):
+        crud_lesson.create_lesson(db, LessonCreate(title=f"Lesson {index + 1}", content_type="text",
+                                                   text_content=text, course_id=course.id))
+    write_seconds = time.perf_counter() - started
+    course_ids = [course.id] + [course_clone.clone_course(db, course.id, educator.id)["course_id"]
+                                for _ in range(ARGS.cohorts)]
+    db.close()
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+        # The lessons table with its indexes, and lesson_bodies (the search index keeps its own copy of the texts)
+        size = connection.exec_driver_sql(
+            "SELECT sum(pgsize) FROM dbstat WHERE name IN ('lessons', 'lesson_bodies') "
+            "OR name IN (SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN ('lessons', 'lesson_bodies'))"
+        ).scalar()
+
+    rng = random.Random(7)
+    lesson_count = ARGS.lessons * len(course_ids)
+    reads, cold, warm, pages = [], [], [], []
+    db = Session()
+    for _ in range(ARGS.reads):
+        lesson_id = rng.randint(1, lesson_count)
+        db.expunge_all()
+        lesson_bodies._cache.clear()
+        lesson_bodies._cache_bytes = 0
+        started = time.perf_counter()
+        lesson = crud_lesson.get_lesson(db, lesson_id)
+        loaded = time.perf_counter()
+        assert lesson.text_content # Cold: a stored body is fetched and decompressed
+        done = time.perf_counter()
+        assert lesson.text_content # Warm: from the cache
+        reads.append(done - started)
+        cold.append(done - loaded)
+        warm.append(time.perf_counter() - done)
+    for _ in range(50):
+        db.expunge_all()
+        lesson_bodies._cache.clear()
+        lesson_bodies._cache_bytes = 0
+        started = time.perf_counter()
+        page = crud_lesson.get_lessons_by_course(db, rng.choice(course_ids), limit=100)
+        assert all(lesson.text_content for lesson in page)
+        pages.append(time.perf_counter() - started)
+    db.close()
+    return size, write_seconds, percentiles(reads), percentiles(cold), percentiles(warm), percentiles(pages)
+
+
+def main():
+    texts = make_texts(random.Random(42))
+    raw_bytes = sum(len(text.encode()) for text in texts)
+    print(f"{ARGS.lessons} lessons x {ARGS.cohorts + 1} cohorts, {ARGS.words} words per text "
+          f"({raw_bytes / ARGS.lessons / 1024:.1f} KB on average), SQLite")
+    results = {layout: run(layout, texts) for layout in LAYOUTS}
+    inline_size = results["inline"][0]
+    print("p50/p95; `lesson` is get_lesson plus reading the text with an empty cache, `text` the text alone")
+    for layout, (size, write_seconds, reads, cold, warm, pages) in results.items():
+        print(f"{layout:6} storage {size / 1024 / 1024:5.1f} MB ({size / inline_size:5.1%})  "
+              f"create {write_seconds / ARGS.lessons * 1e6:5.0f} us  lesson {reads[0]:4.0f}/{reads[1]:4.0f} us  "
+              f"text cold {cold[0]:4.0f}/{cold[1]:4.0f} us, warm {warm[0]:3.1f}/{warm[1]:3.1f} us  "
+              f"100-lesson page {pages[0] / 1000:4.1f}/{pages[1] / 1000:4.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# backend/benchmarks/lesson_render.py
+"""
+Rendered lesson cache: the cost of rendering a lesson's markdown against a memory-tier and a
+disk-tier hit, and a stampede of concurrent requests for a text no tier has.
+
+The texts are made-up markdown lessons (headings, paragraphs with emphasis and links, lists,
+code blocks, a table) of about `--kb` KB. The stampede starts `--threads` threads on one cold
+key, first with the cache's single-flight and then each rendering on its own.
+
+Run from backend/:  python -m benchmarks.lesson_render [--kb 8] [--texts 200] [--threads 32]
+A throwaway cache directory is used.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kb", type=int, default=8, help="approximate size of each text")
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=32, help="concurrent requests in the stampede")
+    return parser.parse_args()
+
+ARGS = parse_args()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'unused.db')}"
+os.environ["RENDER_CACHE_DIR"] = os.path.join(_tmp, "render_cache")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+from app.services import lesson_render
+
+WORDS = "the a lesson graph node edge weight path learner quiz answer review spaced memory interval".split()
+
+
+def make_text(rng: random.Random) -> str:
+    def sentence():
+        words = rng.choices(WORDS, k=rng.randint(6, 16))
+        if rng.random() < 0.3:
+            words[rng.randrange(len(words))] = f"**{rng.choice(WORDS)}**"
+        if rng.random() < 0.2:
+            words[rng.randrange(len(words))] = f"[{rng.choice(WORDS)}](https://example.com/{rng.randint(1, 999)})"
+        return " ".join(words).capitalize() + "."
+
+    parts = [f"# Lesson {rng.randint(1, 999)}\n"]
+    while sum(len(part) for part in parts) < ARGS.kb * 1024:
+        kind = rng.random()
+        if kind < 0.6:
+            parts.append(" ".join(sentence() for _ in range(rng.randint(2, 6))) + "\n")
+        elif kind < 0.75:
+            parts.append("\n".join(f"- {sentence()}" for _ in range(rng.randint(2, 5))) + "\n")
+        elif kind < 0.85:
+            parts.append(f"```python\ndef step_{rng.randint(1, 99)}(x):\n    return x * {rng.randint(2, 9)}\n```\n")
+        elif kind < 0.92:
+            parts.append("| term | meaning |\n|---|---|\n" + "\n".join(
+                f"| {rng.choice(WORDS)} | {sentence()} |" for _ in range(rng.randint(2, 5))) + "\n")
+        else:
+            parts.append(f"## {sentence()}\n")
+    return "\n".join(parts)
+
+def micros(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.95)] * 1e6
+
+def clear_memory():
+    lesson_render._cache.clear()
+    lesson_render._cache_bytes = 0
+
+def timed(call, texts):
+    samples = []
+    for text in texts:
+        key = lesson_render.text_key(text)
+        started = time.perf_counter()
+        call(key, text)
+        samples.append(time.perf_counter() - started)
+    return micros(samples)
+
+def stampede(single_flight: bool):
+    text = make_text(random.Random(99))
+    key = lesson_render.text_key(text)
+    renders = []
+    original = lesson_render.render
+    def counting_render(source):
+        renders.append(1)
+        return original(source)
+    lesson_render.render = counting_render
+    gate = threading.Barrier(ARGS.threads)
+    def request():
+        gate.wait()
+        if single_flight:
+            lesson_render.rendered(key, lambda: text)
+        else:
+            lesson_render.render(text)
+    threads = [threading.Thread(target=request) for _ in range(ARGS.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    lesson_render.render = original
+    return len(renders), time.perf_counter() - started
+
+
+def main():
+    rng = random.Random(42)
+    texts = [make_text(rng) for _ in range(ARGS.texts)]
+    average_kb = sum(len(text.encode()) for text in texts) / len(texts) / 1024
+    print(f"{ARGS.texts} markdown texts of {average_kb:.1f} KB on average, {lesson_render.RENDERER}, {os.cpu_count()} CPU(s)")
+
+    render = timed(lambda key, text: lesson_render.render(text), texts)
+    key_cost = timed(lambda key, text: lesson_render.text_key(text), texts)
+    for text in texts:
+        lesson_render.prerender(text) # Both tiers
+    memory = timed(lambda key, text: lesson_render.rendered(key, lambda: text), texts)
+    clear_memory()
+    disk = timed(lambda key, text: (lesson_render.rendered(key, lambda: text), clear_memory()), texts)
+    print("p50/p95 per text:")
+    print(f"  render            {render[0]:7.0f}/{render[1]:7.0f} us")
+    print(f"  disk-tier hit     {disk[0]:7.0f}/{disk[1]:7.0f} us")
+    print(f"  memory-tier hit   {memory[0]:7.1f}/{memory[1]:7.1f} us")
+    print(f"  sha256 of an inline text (the key) {key_cost[0]:.1f} us")
+
+    clear_memory()
+    for single_flight in (False, True):
+        renders, seconds = stampede(single_flight)
+        label = "single-flight" if single_flight else "no coalescing"
+        print(f"stampede of {ARGS.threads} on a cold text, {label:13}: {renders:2} renders, {seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+# backend/benchmarks/live_feed.py
+"""
+Live feed load test: N concurrent SSE subscribers on GET /api/v1/courses/{id}/live of one
+uvicorn worker, while events are published to the course at a fixed rate.
+
+The server (uvicorn, in a thread) and the publisher run in this process; the subscribers
+are raw asyncio connections in a child process. Each event carries its publish time, so
+the clients measure publish-to-receive latency. `--slow` subscribers use a tiny receive
+buffer and stop reading while events are published, then try to catch up: once they fall
+further behind than the broker's ring, they get a `dropped` event instead of slowing the others.
+
+Run from backend/:  python -m benchmarks.live_feed [--subscribers 2000] [--events 200] [--rate 50]
+                                                   [--payload 200] [--buffer 256] [--slow 0]
+A throwaway SQLite database holds the educator and the course.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import resource
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50, help="events published per second")
+    parser.add_argument("--payload", type=int, default=200, help="bytes of filler per event")
+    parser.add_argument("--buffer", type=int, default=256, help="LIVE_FEED_BUFFER_EVENTS: events kept per course")
+    parser.add_argument("--slow", type=int, default=0, help="extra subscribers that stop reading while events are published")
+    return parser.parse_args()
+
+ARGS = parse_args()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'live.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ["LIVE_FEED_BUFFER_EVENTS"] = str(ARGS.buffer)
+
+_SENT = re.compile(rb'"sent":([0-9.]+)')
+
+
+# --- Subscribers (child process) ---
+
+async def _subscribe(port: int, path: str, token: str, slow: bool, ready: asyncio.Event, stats: dict,
+                     expected: int, started: list):
+    # Raw socket reads: an asyncio stream would keep draining the socket into its own buffer
+    # even while a slow subscriber is not reading
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if slow:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+    sock.setblocking(False)
+    await loop.sock_connect(sock, ("127.0.0.1", port))
+    await loop.sock_sendall(sock, f"GET {path} HTTP/1.1\r\nHost: localhost\r\nAuthorization: Bearer {token}\r\n"
+                                  f"Accept: text/event-stream\r\n\r\n".encode())
+    buffer = b""
+    while b"\r\n\r\n" not in buffer:
+        buffer += await loop.sock_recv(sock, 65536)
+    assert buffer.startswith(b"HTTP/1.1 200"), buffer[:200]
+    started[0] += 1
+    if started[0] == stats["subscribers"]:
+        ready.set()
+    if slow:
+        await stats["published"].wait()
+    received = 0
+    while received < expected:
+        data = await loop.sock_recv(sock, 65536)
+        if not data:
+            break
+        now = time.time()
+        buffer = buffer[-256:] + data
+        last = 0
+        for match in _SENT.finditer(buffer):
+            if not slow:
+                stats["latencies"].append(now - float(match.group(1)))
+            received += 1
+            last = match.end()
+        buffer = buffer[last:]
+        if b"event: dropped" in data:
+            stats["slow_dropped" if slow else "dropped"] += 1
+            break
+    if not slow:
+        stats["received"] += received
+    sock.close()
+
+def _clients(port: int, path: str, token: str, pipe):
+    async def run():
+        total = ARGS.subscribers + ARGS.slow
+        stats = {"latencies": [], "received": 0, "dropped": 0, "slow_dropped": 0, "subscribers": total,
+                 "published": asyncio.Event()}
+        ready, started = asyncio.Event(), [0]
+        start = time.perf_counter()
+        tasks = []
+        for index in range(total):
+            slow = index >= ARGS.subscribers
+            tasks.append(asyncio.create_task(_subscribe(port, path, token, slow, ready, stats, ARGS.events, started)))
+            if index % 200 == 199:
+                await asyncio.sleep(0.05) # Stay under the listen backlog
+        await asyncio.wait([asyncio.create_task(ready.wait())] + tasks, return_when=asyncio.FIRST_COMPLETED)
+        failed = [task.exception() for task in tasks if task.done() and task.exception()]
+        if failed:
+            raise failed[0]
+        pipe.send(("ready", time.perf_counter() - start))
+        await asyncio.wait(tasks[:ARGS.subscribers], timeout=ARGS.events / ARGS.rate + 60)
+        await asyncio.get_running_loop().run_in_executor(None, pipe.recv) # The publisher is done
+        stats["published"].set()
+        await asyncio.wait(tasks, timeout=10)
+        pipe.send(("done", {key: stats[key] for key in ("latencies", "received", "dropped", "slow_dropped")}))
+
+    asyncio.run(run())
+
+
+# --- Server and publisher (this process) ---
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def main():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    import uvicorn
+    from app.core import live
+    from app.core.jwt import create_access_token
+    from app.crud import crud_course, crud_user
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.schemas.course import CourseCreate
+    from app.schemas.user import UserCreate
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    educator = crud_user.create_user(db, UserCreate(username="educator", email="educator@example.com",
+                                                    password="password123", is_educator=True))
+    course = crud_course.create_course(db, CourseCreate(title="Live course"), educator_id=educator.id)
+    token = create_access_token(educator)
+    db.close()
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    rss_before = _rss_mb()
+    parent, child = multiprocessing.Pipe()
+    clients = multiprocessing.Process(target=_clients, args=(port, f"/api/v1/courses/{course.id}/live", token, child))
+    clients.start()
+    _, connect_seconds = parent.recv()
+    topic = live.course_topic(course.id)
+    subscribed = live.broker.subscriber_count(topic)
+    rss_subscribed = _rss_mb()
+
+    filler = "x" * ARGS.payload
+    interval = 1 / ARGS.rate
+    start = time.perf_counter()
+    for index in range(ARGS.events):
+        live.broker.publish(topic, "answer", {"n": index, "filler": filler, "sent": time.time()})
+        time.sleep(max(0.0, start + (index + 1) * interval - time.perf_counter()))
+    publish_seconds = time.perf_counter() - start
+    parent.send("published")
+
+    _, stats = parent.recv()
+    clients.join()
+    server.should_exit = True
+
+    latencies = sorted(stats["latencies"]) or [0.0]
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    expected = ARGS.subscribers * ARGS.events
+    print(f"{ARGS.subscribers} subscribers (+{ARGS.slow} slow), {ARGS.events} events at {ARGS.rate:g}/s, "
+          f"{ARGS.payload}-byte payload, {ARGS.buffer}-event ring, 1 worker, {os.cpu_count()} CPU(s)")
+    print(f"connected {subscribed} subscribers in {connect_seconds:.1f} s; "
+          f"server RSS +{rss_subscribed - rss_before:.1f} MB ({(rss_subscribed - rss_before) * 1024 / max(subscribed, 1):.1f} KB per subscriber)")
+    print(f"delivered {stats['received']}/{expected} events ({stats['received'] / max(expected, 1):.1%}), "
+          f"{stats['received'] / publish_seconds:.0f} deliveries/s")
+    print(f"latency ms: p50 {percentile(0.50):.1f}  p95 {percentile(0.95):.1f}  p99 {percentile(0.99):.1f}  "
+          f"max {latencies[-1] * 1000:.1f}  mean {statistics.fmean(latencies) * 1000:.1f}")
+    print(f"dropped by the broker: {live.broker.dropped} ({stats['slow_dropped']}/{ARGS.slow} slow subscribers, "
+          f"{stats['dropped']} others)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# backend/benchmarks/media_ranges.py
+"""
+Media throughput: concurrent range requests on GET /api/v1/lessons/{id}/media of one uvicorn
+worker, the way video players seek and buffer.
+
+The server (uvicorn, in a thread) runs in this process; the clients are raw asyncio keep-alive
+connections in a child process. Each client asks for `--requests` random ranges of `--range-kb`
+(the whole file with 0) of one `--file-mb` video, uploaded through PUT /lessons/{id}/media first.
+
+Run from backend/:  python -m benchmarks.media_ranges [--clients 50] [--requests 40] [--range-kb 1024]
+                                                      [--file-mb 256]
+A throwaway SQLite database and media directory are used.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=40, help="range requests per client")
+    parser.add_argument("--range-kb", type=int, default=1024, help="size of each range, 0 for the whole file")
+    parser.add_argument("--file-mb", type=int, default=256)
+    return parser.parse_args()
+
+ARGS = parse_args()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'media.db')}"
+os.environ["MEDIA_DIR"] = os.path.join(_tmp, "media")
+os.environ["MEDIA_ACCEL_REDIRECT"] = ""
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+
+# --- Clients (child process) ---
+
+async def _client(port: int, path: str, size: int, seed: int, results: list):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    rng = random.Random(seed)
+    span = ARGS.range_kb * 1024
+    for _ in range(ARGS.requests):
+        headers = ""
+        if span:
+            start = rng.randrange(0, max(1, size - span))
+            headers = f"Range: bytes={start}-{start + span - 1}\r\n"
+        started = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n{headers}\r\n".encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        assert status in (200, 206), head
+        length = int(next(line.split(b":", 1)[1] for line in head.split(b"\r\n") if line.lower().startswith(b"content-length:")))
+        remaining = length
+        while remaining:
+            remaining -= len(await reader.read(min(remaining, 1 << 20)))
+        results.append((time.perf_counter() - started, length))
+    writer.close()
+
+def _clients(port: int, path: str, size: int, pipe):
+    async def run():
+        results = []
+        started = time.perf_counter()
+        await asyncio.gather(*(_client(port, path, size, seed, results) for seed in range(ARGS.clients)))
+        pipe.send((time.perf_counter() - started, results))
+
+    asyncio.run(run())
+
+
+# --- Server (this process) ---
+
+def main():
+    import httpx
+    import uvicorn
+    from app.core.jwt import create_access_token
+    from app.crud import crud_course, crud_lesson, crud_user
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.schemas.course import CourseCreate
+    from app.schemas.lesson import LessonCreate
+    from app.schemas.user import UserCreate
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    educator = crud_user.create_user(db, UserCreate(username="educator", email="educator@example.com",
+                                                    password="password123", is_educator=True))
+    course = crud_course.create_course(db, CourseCreate(title="Video course"), educator_id=educator.id)
+    lesson = crud_lesson.create_lesson(db, LessonCreate(title="Video lesson", content_type="video", course_id=course.id))
+    token = create_access_token(educator)
+    db.close()
+
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    port = listener.getsockname()[1]
+    listener.close()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    path = f"/api/v1/lessons/{lesson.id}/media"
+    size = ARGS.file_mb * 1024 * 1024
+    block = os.urandom(1024 * 1024)
+    def body():
+        for _ in range(ARGS.file_mb):
+            yield block
+    started = time.perf_counter()
+    response = httpx.put(f"http://127.0.0.1:{port}{path}", content=body(), timeout=600,
+                         headers={"Authorization": f"Bearer {token}", "Content-Type": "video/mp4"})
+    upload_seconds = time.perf_counter() - started
+    response.raise_for_status()
+
+    parent, child = multiprocessing.Pipe()
+    clients = multiprocessing.Process(target=_clients, args=(port, path, size, child))
+    clients.start()
+    elapsed, results = parent.recv()
+    clients.join()
+    server.should_exit = True
+
+    latencies = sorted(seconds for seconds, _ in results)
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    sent = sum(length for _, length in results)
+    print(f"{ARGS.clients} clients x {ARGS.requests} requests of "
+          f"{f'{ARGS.range_kb} KB ranges' if ARGS.range_kb else 'the whole file'} from a {ARGS.file_mb} MB file, "
+          f"1 worker, {os.cpu_count()} CPU(s)")
+    print(f"upload: {ARGS.file_mb / upload_seconds:.0f} MB/s")
+    print(f"{len(results)} responses in {elapsed:.1f} s: {len(results) / elapsed:.0f} requests/s, "
+          f"{sent / elapsed / 1024 / 1024:.0f} MB/s")
+    print(f"latency ms: p50 {percentile(0.50):.1f}  p95 {percentile(0.95):.1f}  p99 {percentile(0.99):.1f}  "
+          f"max {latencies[-1] * 1000:.1f}  mean {statistics.fmean(latencies) * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    main()
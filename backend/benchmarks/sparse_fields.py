@@ -0,0 +1,96 @@
+# backend/benchmarks/sparse_fields.py
+"""
+Course listing with sparse fieldsets: payload size and latency of GET /api/v1/courses/ with
+and without `fields=`.
+
+A throwaway SQLite database gets `--courses` courses of `--lessons` text lessons each (with
+`--text-bytes` of inline text). Each variant requests the first page of `--limit` courses
+`--requests` times through the app in-process (fastapi.testclient, so the numbers include the
+middleware and serialization but no network).
+
+Run from backend/:  python -m benchmarks.sparse_fields [--courses 200] [--lessons 30] [--limit 100]
+                                                       [--text-bytes 600] [--requests 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--lessons", type=int, default=30, help="lessons per course")
+    parser.add_argument("--limit", type=int, default=100, help="courses per page")
+    parser.add_argument("--text-bytes", type=int, default=600, help="inline text per lesson")
+    parser.add_argument("--requests", type=int, default=50)
+    return parser.parse_args()
+
+ARGS = parse_args()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+_tmp = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'fields.db')}"
+os.environ["RENDER_CACHE_DIR"] = os.path.join(_tmp, "render_cache")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+VARIANTS = [
+    None,
+    "id,title",
+    "id,title,lessons.id,lessons.title",
+    "id,title,description,educator_id,created_at,updated_at,lessons",
+]
+
+
+def main():
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from app.models.course import Course
+    from app.models.lesson import Lesson
+    from app.crud import crud_user
+    from app.schemas.user import UserCreate
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    educator = crud_user.create_user(db, UserCreate(username="educator", email="educator@example.com",
+                                                    password="password123", is_educator=True))
+    text = ("Lorem ipsum dolor sit amet. " * (ARGS.text_bytes // 28 + 1))[:ARGS.text_bytes]
+    db.execute(insert(Course), [{"title": f"Course number {index}", "description": "A course. " * 20,
+                                 "educator_id": educator.id} for index in range(ARGS.courses)])
+    db.execute(insert(Lesson), [{"course_id": course_id, "title": f"Lesson {index}", "content_type": "text",
+                                 "inline_text": text, "order": index}
+                                for course_id in range(1, ARGS.courses + 1) for index in range(ARGS.lessons)])
+    db.commit()
+    db.close()
+
+    client = TestClient(app)
+    print(f"GET /api/v1/courses/?limit={ARGS.limit}: {ARGS.courses} courses x {ARGS.lessons} lessons, "
+          f"SQLite, in-process, {os.cpu_count()} CPU(s); p50/p95 of {ARGS.requests} requests")
+    baseline = None
+    for fields in VARIANTS:
+        params = {"limit": ARGS.limit, **({"fields": fields} if fields else {})}
+        client.get("/api/v1/courses/", params=params) # Warm up
+        samples = []
+        for _ in range(ARGS.requests):
+            started = time.perf_counter()
+            response = client.get("/api/v1/courses/", params=params)
+            samples.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+        samples.sort()
+        p50, p95 = statistics.median(samples) * 1000, samples[int(len(samples) * 0.95)] * 1000
+        size = len(response.content)
+        baseline = baseline or (size, p50)
+        print(f"  {fields or '(full CourseOut)':66} {size / 1024:7.1f} KB ({size / baseline[0]:6.1%})  "
+              f"{p50:6.1f}/{p95:6.1f} ms ({baseline[1] / p50:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
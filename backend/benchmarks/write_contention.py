@@ -0,0 +1,215 @@
+# backend/benchmarks/write_contention.py
+"""
+Double-submit contention: pairs of threads submit the same quiz answer and the same lesson
+completion at the same moment, once through the previous read-then-write code and once
+through the ON CONFLICT upserts in app.crud. Reports duplicate rows, statements per write
+and latency.
+
+Run from backend/:  python -m benchmarks.write_contention [--users 200] [--database-url URL]
+Without --database-url a throwaway SQLite file is used. A PostgreSQL URL must point at an
+empty database: the benchmark creates and drops its tables there.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200, help="double-submitting users per scenario")
+    parser.add_argument("--database-url", default=None)
+    return parser.parse_args()
+
+ARGS = parse_args()
+_tmpdir = None
+if ARGS.database_url is None:
+    _tmpdir = tempfile.mkdtemp()
+    ARGS.database_url = f"sqlite:///{os.path.join(_tmpdir, 'contention.db')}"
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+os.environ["DATABASE_URL"] = ARGS.database_url
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+
+from datetime import datetime
+
+from sqlalchemy import Column, MetaData, Table, event, func, select, text
+
+from app.database import Base, SessionLocal, engine
+from app.crud import crud_user_answer, crud_user_progress
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.option import Option
+from app.models.question import Question
+from app.models.quiz import Quiz
+from app.models.review_item import ReviewItem
+from app.models.user import User
+from app.models.user_answer import UserAnswer
+from app.models.user_answer_claim import UserAnswerClaim
+from app.models.user_progress import UserProgress
+from app.schemas.user_answer import UserAnswerCreate
+from app.services import grading, review_scheduler
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _busy_timeout(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA busy_timeout = 30000") # Wait for the write lock instead of failing
+
+_statements = threading.local()
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count(conn, cursor, statement, parameters, context, executemany):
+    _statements.count = getattr(_statements, "count", 0) + 1
+
+
+# --- The previous write paths, kept here for comparison ---
+
+def legacy_submit_answer(db, user_id, question_id, option_id):
+    existing = db.query(UserAnswer).filter(UserAnswer.user_id == user_id, UserAnswer.question_id == question_id).first()
+    if existing:
+        return None
+    question = db.query(Question).filter(Question.id == question_id).first()
+    is_correct = grading.grade_answer(question, option_id, None)
+    answer = UserAnswer(user_id=user_id, question_id=question_id, selected_option_id=option_id, is_correct=is_correct)
+    db.add(answer)
+    review_scheduler.record_answer(db, user_id, question_id, is_correct)
+    db.commit()
+    db.refresh(answer)
+    return answer
+
+def legacy_complete_lesson(db, user_id, lesson_id):
+    progress = db.query(UserProgress).filter(UserProgress.user_id == user_id, UserProgress.lesson_id == lesson_id).first()
+    if progress:
+        progress.is_completed = True
+        if not progress.completed_at:
+            progress.completed_at = datetime.now()
+    else:
+        progress = UserProgress(user_id=user_id, lesson_id=lesson_id, is_completed=True, completed_at=datetime.now())
+        db.add(progress)
+    db.commit()
+    db.refresh(progress)
+    return progress
+
+
+def upsert_submit_answer(db, user_id, question_id, option_id):
+    return crud_user_answer.create_user_answer(db, UserAnswerCreate(question_id=question_id, selected_option_id=option_id), user_id)
+
+def upsert_complete_lesson(db, user_id, lesson_id):
+    return crud_user_progress.create_or_update_user_progress(db, user_id, lesson_id, is_completed=True)
+
+
+def setup(users: int):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    educator = User(username="educator", email="educator@example.com", hashed_password="x", is_educator=True)
+    db.add(educator)
+    db.flush()
+    course = Course(title="Benchmark course", educator_id=educator.id)
+    db.add(course)
+    db.flush()
+    lesson = Lesson(title="Benchmark lesson", content_type="text", course_id=course.id, order=1)
+    db.add(lesson)
+    db.flush()
+    quiz = Quiz(title="Benchmark quiz", lesson_id=lesson.id)
+    db.add(quiz)
+    db.flush()
+    question = Question(question_text="2 + 2?", quiz_id=quiz.id, question_type="MCQ")
+    db.add(question)
+    db.flush()
+    option = Option(option_text="4", is_correct=True, question_id=question.id)
+    db.add(option)
+    db.add_all(User(username=f"student{i}", email=f"student{i}@example.com", hashed_password="x") for i in range(users))
+    db.commit()
+    ids = (lesson.id, question.id, option.id, [row for row in db.execute(select(User.id).where(User.id != educator.id)).scalars()])
+    db.close()
+    return ids
+
+def reset():
+    with engine.begin() as connection:
+        for table in (UserAnswer, UserAnswerClaim, UserProgress, ReviewItem):
+            connection.execute(table.__table__.delete())
+
+def drop_unique_keys():
+    """For the legacy run: user_progress as it was before its unique key."""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE user_progress DROP CONSTRAINT uq_user_progress_user_lesson"))
+        return
+    # SQLite cannot drop a constraint: recreate the table from its columns alone
+    legacy = Table("user_progress", MetaData(), *[
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable,
+               server_default=column.server_default.arg if column.server_default is not None else None)
+        for column in UserProgress.__table__.columns
+    ])
+    legacy.drop(engine)
+    legacy.create(engine)
+
+def run(name, submit_answer, complete_lesson, lesson_id, question_id, option_id, user_ids):
+    latencies, statements, errors = [], [], []
+    lock = threading.Lock()
+
+    def one(work, *args):
+        db = SessionLocal()
+        _statements.count = 0
+        start = time.perf_counter()
+        try:
+            work(db, *args)
+        except Exception as e: # Unique violations and lock timeouts count as failed writes
+            with lock:
+                errors.append(type(e).__name__)
+        finally:
+            db.close()
+        with lock:
+            latencies.append((time.perf_counter() - start) * 1000)
+            statements.append(_statements.count)
+
+    def double_submit(user_id):
+        barrier = threading.Barrier(2)
+
+        def submit(work, *args):
+            barrier.wait()
+            one(work, *args)
+
+        with ThreadPoolExecutor(max_workers=2) as pair:
+            list(pair.map(lambda _: submit(submit_answer, user_id, question_id, option_id), range(2)))
+        barrier.reset()
+        with ThreadPoolExecutor(max_workers=2) as pair:
+            list(pair.map(lambda _: submit(complete_lesson, user_id, lesson_id), range(2)))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(double_submit, user_ids))
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as connection:
+        answers = connection.execute(select(func.count()).select_from(UserAnswer)).scalar()
+        progress = connection.execute(select(func.count()).select_from(UserProgress)).scalar()
+    writes = len(latencies)
+    latencies.sort()
+    print(
+        f"{name:<8}{writes / elapsed:>10.0f}{statistics.median(latencies):>9.2f}{latencies[int(writes * 0.95)]:>9.2f}"
+        f"{statistics.mean(statements):>8.1f}{answers - len(user_ids):>8}{progress - len(user_ids):>9}{len(errors):>8}"
+    )
+
+
+def main():
+    lesson_id, question_id, option_id, user_ids = setup(ARGS.users)
+    print(f"{engine.dialect.name}, {len(user_ids)} users, each submitting an answer and a completion twice at once")
+    print(f"{'path':<8}{'writes/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'stmts':>8}{'dup ans':>8}{'dup prog':>9}{'errors':>8}")
+    reset()
+    run("upsert", upsert_submit_answer, upsert_complete_lesson, lesson_id, question_id, option_id, user_ids)
+    reset()
+    drop_unique_keys()
+    run("legacy", legacy_submit_answer, legacy_complete_lesson, lesson_id, question_id, option_id, user_ids)
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# backend/benchmarks/write_statements.py
+"""
+Statements per write endpoint: drives every create/update endpoint once through the API
+(TestClient, throwaway SQLite database) and counts the SQL statements each request runs,
+authentication included.
+
+Run from backend/:  python -m benchmarks.write_statements
+"""
+import os
+import tempfile
+
+_tmpdir = tempfile.mkdtemp()
+# Settings are read at import time; provide harmless defaults so the benchmark runs without a .env
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmpdir, 'statements.db')}"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-with-enough-entropy")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+os.environ["USER_SHARDS"] = ""
+os.environ["DATABASE_REPLICA_URLS"] = ""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import Base, engine
+from app.main import app
+
+_count = [0]
+
+@event.listens_for(engine, "before_cursor_execute")
+def _on_statement(conn, cursor, statement, parameters, context, executemany):
+    _count[0] += 1
+
+client = TestClient(app)
+results = []
+
+def call(label, method, url, expected, **kwargs):
+    _count[0] = 0
+    response = client.request(method, url, **kwargs)
+    assert response.status_code == expected, (label, response.status_code, response.text)
+    results.append((label, _count[0]))
+    return response.json() if response.content else None
+
+def login(username, is_educator):
+    call(f"POST /users ({'educator' if is_educator else 'student'})", "POST", "/api/v1/users/", 201, json={
+        "username": username, "email": f"{username}@example.com", "password": "password123", "is_educator": is_educator,
+    })
+    token = client.post("/api/v1/token", data={"username": username, "password": "password123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def main():
+    Base.metadata.create_all(engine)
+    educator = login("educator", True)
+    student = login("student", False)
+
+    course = call("POST /courses", "POST", "/api/v1/courses/", 201, headers=educator,
+                  json={"title": "Benchmark course", "description": "Statements per write"})
+    call("PUT /courses/{id}", "PUT", f"/api/v1/courses/{course['id']}", 200, headers=educator,
+         json={"description": "Updated"})
+    lesson = call("POST /lessons", "POST", "/api/v1/lessons/", 201, headers=educator,
+                  json={"title": "First lesson", "content_type": "quiz", "course_id": course["id"], "order": 1})
+    call("PUT /lessons/{id}", "PUT", f"/api/v1/lessons/{lesson['id']}", 200, headers=educator,
+         json={"text_content": "Updated"})
+    quiz = call("POST /quizzes", "POST", "/api/v1/quizzes/", 201, headers=educator,
+                json={"title": "Quiz one", "lesson_id": lesson["id"]})
+    call("PUT /quizzes/{id}", "PUT", f"/api/v1/quizzes/{quiz['id']}", 200, headers=educator,
+         json={"description": "Updated"})
+    question = call("POST /quizzes/{id}/questions", "POST", f"/api/v1/quizzes/{quiz['id']}/questions/", 201, headers=educator,
+                    json={"question_text": "Which is right?", "quiz_id": quiz["id"], "question_type": "MCQ",
+                          "options": [{"option_text": "This", "is_correct": True}, {"option_text": "That"}]})
+    call("PUT /quizzes/questions/{id}", "PUT", f"/api/v1/quizzes/questions/{question['id']}", 200, headers=educator,
+         json={"question_text": "Which one is right?"})
+    option = call("POST /quizzes/questions/{id}/options", "POST", f"/api/v1/quizzes/questions/{question['id']}/options", 201,
+                  headers=educator, json={"option_text": "Neither", "question_id": question["id"]})
+    call("PUT /quizzes/options/{id}", "PUT", f"/api/v1/quizzes/options/{option['id']}", 200, headers=educator,
+         json={"option_text": "Neither of them"})
+    second = client.post("/api/v1/lessons/", headers=educator,
+                         json={"title": "Second lesson", "content_type": "text", "course_id": course["id"], "order": 2}).json()
+    call("POST /paths/prerequisites", "POST", "/api/v1/paths/prerequisites", 201, headers=educator,
+         json={"node_type": "lesson", "node_id": second["id"], "required_type": "lesson", "required_id": lesson["id"]})
+    call("PUT /users/me", "PUT", "/api/v1/users/me", 200, headers=student, json={"email": "student2@example.com"})
+    call("POST /progress/answers", "POST", "/api/v1/progress/answers/", 201, headers=student,
+         json={"question_id": question["id"], "selected_option_id": question["options"][0]["id"]})
+    call("POST /progress/lessons/{id}/complete", "POST", f"/api/v1/progress/lessons/{lesson['id']}/complete", 200, headers=student)
+
+    print(f"{'endpoint':<40}{'statements':>11}")
+    for label, statements in results:
+        print(f"{label:<40}{statements:>11}")
+    print(f"{'total':<40}{sum(statements for _, statements in results):>11}")
+    Base.metadata.drop_all(engine)
+
+
+if __name__ == "__main__":
+    main()
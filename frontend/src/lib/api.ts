@@ -2,6 +2,7 @@
 import axios from 'axios';
 import { store } from '../store'; // Import your Redux store
 import { logout } from '../store/slices/authSlice'; // Import the logout action
+import type { BatchResponse, CourseOut, CourseSummaryOut, LessonOut, QuizOut } from '../types/api';
 
 // Retrieve the API base URL from the frontend's environment variables
 // This variable is set in frontend/.env.local (e.g., http://localhost:8000/api/v1)
@@ -57,4 +58,41 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Batch lookups: many IDs in one request (one SQL `IN` query) instead of one request per ID.
+// The backend takes at most BATCH_MAX_IDS (100) IDs per request, so larger lists are split.
+// Results are ordered by ID; IDs that do not exist are left out.
+const MAX_IDS_PER_REQUEST = 100;
+
+async function getByIds<T>(path: string, ids: number[]): Promise<T[]> {
+  const unique = Array.from(new Set(ids));
+  const chunks: number[][] = [];
+  for (let i = 0; i < unique.length; i += MAX_IDS_PER_REQUEST) {
+    chunks.push(unique.slice(i, i + MAX_IDS_PER_REQUEST));
+  }
+  const responses = await Promise.all(
+    chunks.map((chunk) => apiClient.get<T[]>(path, { params: { ids: chunk.join(',') } }))
+  );
+  return responses.flatMap((response) => response.data);
+}
+
+export const getCoursesByIds = (ids: number[]) => getByIds<CourseOut>('/courses/', ids);
+export const getLessonsByIds = (ids: number[]) => getByIds<LessonOut>('/lessons/', ids);
+export const getQuizzesByIds = (ids: number[]) => getByIds<QuizOut>('/quizzes/', ids);
+
+// Runs several GET requests in one HTTP call (POST /batch), e.g. everything a dashboard needs.
+// Paths are relative to the API base, like the other calls: ['/courses/1', '/progress/me'].
+// Each request gets its own status code, so check `status` before using `body`.
+export async function batchGet(paths: string[]): Promise<BatchResponse[]> {
+  const response = await apiClient.post<{ responses: BatchResponse[] }>('/batch', {
+    requests: paths.map((path) => ({ path: `/api/v1${path}` })),
+  });
+  return response.data.responses;
+}
+
+// The learner's courses, most recent activity first, with completion, next lesson and quiz score.
+export async function getMyDashboard(): Promise<CourseSummaryOut[]> {
+  const response = await apiClient.get<CourseSummaryOut[]>('/progress/me/dashboard');
+  return response.data;
+}
+
 export default apiClient;
\ No newline at end of file
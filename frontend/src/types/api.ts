@@ -81,6 +81,21 @@ export interface UserProgressOut {
   lesson?: LessonOut; // Optional: Nested lesson details (to get lesson title, course info)
 }
 
+// Dashboard Schemas (from backend/app/schemas/user_progress.py CourseSummaryOut)
+export interface CourseSummaryOut {
+  course_id: number;
+  course_title: string;
+  lessons_completed: number;
+  lessons_total: number;
+  completion_percent: number;
+  next_lesson_id: number | null; // null once every lesson is completed
+  next_lesson_title: string | null;
+  questions_answered: number;
+  questions_correct: number;
+  quiz_score_percent: number | null; // null before the first answer
+  last_activity_at: string;
+}
+
 // User Answer Schemas (from backend/app/schemas/user_answer.py UserAnswerOut)
 export interface UserAnswerOut {
     id: number;
@@ -90,4 +105,10 @@ export interface UserAnswerOut {
     user_answer_text: string | null;
     is_correct: boolean | null;
     answered_at: string;
-}
\ No newline at end of file
+}
+
+// Batch Schemas (from backend/app/schemas/batch.py BatchOut)
+export interface BatchResponse<T = unknown> {
+  status: number; // The status code the request would have had on its own
+  body: T; // Its JSON body ({ detail: ... } for errors)
+}